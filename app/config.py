@@ -17,6 +17,106 @@ class Settings(BaseSettings):
     
     # API Keys (Load from .env)
     GEMINI_API_KEY: str | None = None
+    # Endpoint Gemini lain (mis. fake server load test, lihat scripts/load_test.py); None = API Google
+    GEMINI_API_ENDPOINT: str | None = None
+
+    # Prompt LLM (Feature Engineering)
+    # Statistik dihitung dari sampel baris, bukan seluruh dataset
+    PROMPT_SAMPLE_ROWS: int = 5000
+    # Batas estimasi token untuk prompt (kolom dipotong jika melebihi)
+    PROMPT_TOKEN_BUDGET: int = 6000
+
+    # Dry-run fitur LLM (estimasi biaya di sampel sebelum eksekusi penuh)
+    FEATURE_DRY_RUN_ROWS: int = 2000
+    FEATURE_TIME_BUDGET_S: float = 30.0
+    FEATURE_MEMORY_BUDGET_MB: float = 1024.0
+
+    # Sandbox eksekusi fitur LLM (pool worker terpisah dengan rlimit)
+    FEATURE_SANDBOX_ENABLED: bool = True
+    FEATURE_SANDBOX_WORKERS: int = 2
+    FEATURE_SANDBOX_CPU_S: int = 60
+    FEATURE_SANDBOX_MEMORY_MB: int = 4096
+    FEATURE_SANDBOX_TIMEOUT_S: float = 120.0
+
+    # Ingestion Excel
+    # 'auto' = calamine jika paket python-calamine terpasang, selain itu openpyxl read-only streaming
+    EXCEL_ENGINE: str = "auto"
+    # Dataset Excel dikonversi sekali saat upload ke cache kolumnar (DataFrame pickle)
+    INGESTION_CACHE_ENABLED: bool = True
+
+    # Mode Out-of-Core (dataset lebih besar dari RAM)
+    # 'auto' = aktif jika estimasi ukuran data > MEMORY_BUDGET_MB, 'on' / 'off' = paksa
+    OUT_OF_CORE_MODE: str = "auto"
+    MEMORY_BUDGET_MB: int = 2048
+    OUT_OF_CORE_TRAIN_SAMPLE_ROWS: int = 200000
+
+    # Paralelisme cleaning & selection
+    # PARALLEL_WORKERS = 0 -> semua core, 1 -> serial
+    PARALLEL_WORKERS: int = 0
+    PARALLEL_BACKEND: str = "thread" # 'thread' atau 'process' (shared memory)
+    # Frame lebih kecil dari ini (baris x kolom) diproses serial
+    PARALLEL_MIN_CELLS: int = 2000000
+
+    # Storage dataset & model (shared antar worker / node)
+    # 'local' = DATA_DIR / MODEL_DIR (bisa shared volume), 's3' = S3-compatible (MinIO, moto, AWS)
+    STORAGE_BACKEND: str = "local"
+    S3_BUCKET: str = "automl"
+    S3_PREFIX: str = ""
+    S3_ENDPOINT_URL: str | None = None # mis. http://localhost:9000 untuk MinIO / moto_server
+    # Cache lokal per node untuk file yang dibaca dari S3
+    STORAGE_CACHE_DIR: str = os.path.join(BASE_DIR, ".storage_cache")
+
+    # Cold start: PyCaret / Gemini SDK di-import saat pertama dipakai.
+    # True = pre-load di background thread setelah startup (worker tetap langsung siap menerima request)
+    WARM_UP_ON_STARTUP: bool = False
+
+    # Pool worker training pre-warmed (PyCaret sudah di-import di worker)
+    TRAINING_POOL_ENABLED: bool = True
+    TRAINING_POOL_WORKERS: int = 2
+    TRAINING_POOL_WARM_UP: bool = True # Start worker saat startup (di background)
+    # Worker didaur ulang setelah N job atau jika RSS > batas (0 = tanpa batas)
+    TRAINING_WORKER_MAX_JOBS: int = 20
+    TRAINING_WORKER_MAX_RSS_MB: int = 3072
+    TRAINING_TIMEOUT_S: float = 1800.0
+
+    # Engine training default: 'pycaret' atau 'fast' (sklearn/LightGBM langsung), bisa dipilih per request
+    TRAINING_ENGINE: str = "pycaret"
+    FAST_ENGINE_FOLDS: int = 5
+
+    # Adaptive CV (kedua engine): fold dikurangi untuk data besar, model yang kalah berhenti lebih awal
+    CV_FOLDS: int = 10 # Default fold engine PyCaret
+    ADAPTIVE_CV_ENABLED: bool = True
+    ADAPTIVE_CV_MIN_FOLDS: int = 3 # Fold minimal sebelum model boleh dihentikan
+    ADAPTIVE_CV_Z: float = 2.0 # Margin standard error untuk menyatakan model kalah
+    ADAPTIVE_CV_LARGE_ROWS: int = 50000 # >= ini: maksimal 5 fold
+    ADAPTIVE_CV_HUGE_ROWS: int = 500000 # >= ini: maksimal 3 fold
+    LIGHTGBM_EARLY_STOPPING_ROUNDS: int = 50
+
+    # Retrain incremental (engine 'fast'): lineage dataset disimpan di samping model,
+    # upload ulang berupa file lama + baris baru dilatih lanjut hanya dengan baris baru
+    INCREMENTAL_ENABLED: bool = True
+    INCREMENTAL_MIN_NEW_ROWS: int = 50 # Baris baru (setelah cleaning) minimal, di bawah ini retrain penuh
+    INCREMENTAL_MAX_APPEND_RATIO: float = 1.0 # Baris baru > rasio x baris lama -> retrain penuh
+    INCREMENTAL_MIN_ROUNDS: int = 10 # Minimal boosting round LightGBM tambahan
+    INCREMENTAL_REPLAY_ROWS: int = 5000 # Sampel baris train (ter-preprocess) disimpan di LogisticRegression untuk retrain incremental
+
+    # Admission control request berat (/train*, /features/apply) per proses API
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_CPU_SLOTS: int = 0 # 0 = jumlah core
+    ADMISSION_MEMORY_MB: int = 0 # 0 = 80% RAM fisik
+    ADMISSION_MAX_WAIT_S: float = 60.0 # Perkiraan tunggu lebih lama -> 429 + Retry-After
+    ADMISSION_MAX_QUEUE: int = 32
+    ADMISSION_AGING: float = 1.0 # Pengurang prioritas (detik estimasi) per detik menunggu
+
+    # Artifact model: 'none' (bisa di-mmap, dibagi antar worker), 'lz4' atau 'zlib' (file lebih kecil)
+    MODEL_ARTIFACT_COMPRESSION: str = "none"
+    MODEL_CACHE_SIZE: int = 8 # Jumlah model ter-load yang di-cache per proses
+
+    # Scoring online: model engine 'fast' dikompilasi ke operasi NumPy saat training
+    SCORING_COMPILE_ENABLED: bool = True
+    SCORING_MAX_BATCH: int = 64 # Maks baris per micro-batch
+    SCORING_MAX_WAIT_MS: float = 2.0 # Waktu tunggu request lain sebelum batch dieksekusi
+    SCORING_TIMEOUT_S: float = 30.0
 
     class Config:
         env_file = ".env"
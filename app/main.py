@@ -1,17 +1,24 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+import time
+_BOOT_START = time.perf_counter()
+
+import contextlib
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-import shutil
-import os
-import pandas as pd
+from fastapi.responses import JSONResponse
 import logging
+import math
+import threading
+from typing import Optional
 
 # Config & Schemas
 from app.config import settings
 from app.schemas import (
     UploadResponse, 
     TrainRequest, TrainResponse,
+    BatchTrainRequest, BatchTrainResponse, IncrementalTrainRequest,
     FeatureSuggestRequest, FeatureSuggestResponse,
-    FeatureApplyRequest, FeatureApplyResponse
+    FeatureApplyRequest, FeatureApplyResponse,
+    PredictRequest, PredictResponse, PredictBenchmarkRequest
 )
 
 # Services (The 7 Steps)
@@ -22,14 +29,36 @@ from app.services import (
     feature_eng, 
     modeling, 
     ensembling, 
-    evaluation
+    evaluation,
+    sandbox,
+    augmentation,
+    out_of_core,
+    statistics,
+    parallel,
+    storage,
+    lazy_imports,
+    training_pool,
+    artifacts,
+    scoring,
+    content_store,
+    frame_view,
+    incremental,
+    admission
 )
 
 # Setup Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("automl_api")
 
-app = FastAPI(title=settings.APP_NAME)
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_up_workers()
+    try:
+        yield
+    finally:
+        stop_workers()
+
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
 
 # Setup CORS
 app.add_middleware(
@@ -40,32 +69,143 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Waktu import modul app (sebelum startup hook)
+_IMPORT_SECONDS = time.perf_counter() - _BOOT_START
+_STARTUP_REPORT = {}
+
+def warm_up_workers():
+    hook_start = time.perf_counter()
+    # Pre-warm worker sandbox agar request fitur pertama tidak menunggu spawn proses
+    if settings.FEATURE_SANDBOX_ENABLED:
+        sandbox.warm_up()
+    # Worker training import PyCaret di prosesnya sendiri, startup API tidak menunggu
+    if settings.TRAINING_POOL_ENABLED and settings.TRAINING_POOL_WARM_UP:
+        training_pool.warm_up()
+
+    # Opsional: load PyCaret / Gemini di background, tidak menahan readiness worker
+    if settings.WARM_UP_ON_STARTUP:
+        threading.Thread(target=lazy_imports.warm_up, name="automl-warmup", daemon=True).start()
+
+    _STARTUP_REPORT.update({
+        "import_seconds": round(_IMPORT_SECONDS, 3),
+        "startup_hook_seconds": round(time.perf_counter() - hook_start, 3),
+        "total_seconds": round(time.perf_counter() - _BOOT_START, 3),
+    })
+    logger.info(
+        f"⏱️ Startup selesai dalam {_STARTUP_REPORT['total_seconds']:.2f}s "
+        f"(import {_STARTUP_REPORT['import_seconds']:.2f}s, hook {_STARTUP_REPORT['startup_hook_seconds']:.2f}s)"
+    )
+
+@app.exception_handler(admission.AdmissionRejected)
+def admission_rejected(request: Request, exc: admission.AdmissionRejected):
+    # Node penuh: client diminta mencoba lagi setelah perkiraan waktu tunggu
+    return JSONResponse(
+        status_code=429,
+        content={"detail": exc.reason, "expected_wait_s": round(exc.expected_wait_s, 1)},
+        headers={"Retry-After": str(max(1, math.ceil(exc.expected_wait_s)))},
+    )
+
+def stop_workers():
+    sandbox.shutdown()
+    parallel.shutdown()
+    training_pool.shutdown()
+
 @app.get("/")
 def read_root():
     return {"status": "ML Server Running", "version": "2.0 Pro"}
 
+@app.get("/startup-report")
+def startup_report():
+    """Waktu boot worker + modul berat yang sudah di-load (lazy) beserta durasi import-nya."""
+    return {**_STARTUP_REPORT, "lazy_modules": lazy_imports.loaded_modules()}
+
+@app.post("/warmup")
+def warmup():
+    """Pre-load PyCaret / Gemini SDK sekarang (mis. dipanggil readiness probe sebelum traffic training)."""
+    return {"modules": lazy_imports.warm_up()}
+
+@app.get("/models/{model_filename}/benchmark")
+def benchmark_model_artifact(model_filename: str, repeats: int = 5):
+    """Metadata artifact model + benchmark waktu load (artifact vs pickle biasa)."""
+    key = storage.safe_key(model_filename)
+    if not storage.model_store().exists(key):
+        raise HTTPException(404, "Model not found")
+    return {"meta": artifacts.read_meta(key), "benchmark": artifacts.benchmark_load(key, repeats)}
+
+@app.get("/admission")
+def admission_status():
+    """Job berat yang sedang jalan / antre, budget CPU + memori, dan kalibrasi estimasi durasi."""
+    return admission.status()
+
+@app.get("/datasets/{filename}/benchmark")
+def benchmark_dataset_ingestion(filename: str, sheet: Optional[str] = None):
+    """Benchmark load Excel: pd.read_excel default vs reader cepat vs cache kolumnar."""
+    file_path = _dataset_path(filename)
+    if not filename.lower().endswith(ingestion.EXCEL_EXTENSIONS):
+        raise HTTPException(400, "Benchmark ingestion hanya untuk file Excel")
+    try:
+        return ingestion.benchmark_excel(file_path, sheet)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+def _dataset_path(filename: str) -> str:
+    """
+    Path lokal dataset dari data storage (download ke cache jika backend S3).
+    """
+    try:
+        key = storage.safe_key(filename)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    # Upload baru content-addressed: nama file -> blob isi (lihat content_store)
+    key = content_store.resolve(key)["key"]
+    store = storage.data_store()
+    if not store.exists(key):
+        raise HTTPException(404, "File not found")
+    return store.local_path(key)
+
 # ==========================================
 # 1. UPLOAD & INGESTION
 # ==========================================
 @app.post("/upload", response_model=UploadResponse)
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(file: UploadFile = File(...), sheet: Optional[str] = Form(None)):
+    if not (file.filename or "").lower().endswith(ingestion.UPLOAD_EXTENSIONS):
+        raise HTTPException(400, f"Format file tidak didukung. Gunakan {', '.join(ingestion.UPLOAD_EXTENSIONS)}")
     try:
-        # Save file
-        file_path = os.path.join(settings.DATA_DIR, file.filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Save file content-addressed (hash sha256 dihitung sambil streaming, tulis atomik)
+        filename = storage.safe_key(file.filename)
+        store = storage.data_store()
+        upload = content_store.put_upload(filename, file.file, sheet=sheet)
+        file_path = store.local_path(upload["blob"])
+        
+        is_excel = filename.lower().endswith(ingestion.EXCEL_EXTENSIONS)
+        sheets = ingestion.list_sheets(file_path) if is_excel else None
         
-        # Step 1: Ingestion Service
-        df = ingestion.load_data(file_path)
+        # Isi identik sudah pernah di-upload (nama apa pun): profile + cache Excel dipakai ulang
+        profile = statistics.load_profile(filename) if upload["deduplicated"] else None
+        if profile is not None:
+            columns, row_count = list(profile["columns"]), profile["n_rows"]
+        else:
+            # Step 1: Ingestion Service (Excel: sheet pilihan, default sheet pertama)
+            df = ingestion.load_data(file_path, sheet=sheet)
+            # Excel dikonversi sekali ke cache kolumnar, request berikutnya tidak membaca workbook lagi
+            ingestion.build_cache(filename, df)
+            
+            # Profile dataset (statistics engine, satu pass) untuk dipakai ulang oleh prompt LLM
+            statistics.save_profile(filename, statistics.compute_stats(df))
+            columns, row_count = df.columns.tolist(), len(df)
         
         # Smart Target Suggestion (Ambil kolom terakhir sebagai default)
-        suggested_target = df.columns[-1] if len(df.columns) > 0 else None
+        suggested_target = columns[-1] if len(columns) > 0 else None
         
         return {
-            "filename": file.filename,
-            "columns": df.columns.tolist(),
+            "filename": filename,
+            "columns": columns,
             "suggested_target": suggested_target,
-            "row_count": len(df)
+            "row_count": row_count,
+            "sheets": sheets,
+            "sheet": (sheet or sheets[0]) if sheets else None,
+            "sha256": upload["sha256"],
+            "deduplicated": upload["deduplicated"]
         }
     except Exception as e:
         logger.error(f"Upload failed: {e}")
@@ -77,14 +217,23 @@ async def upload_file(file: UploadFile = File(...)):
 @app.post("/features/suggest", response_model=FeatureSuggestResponse)
 def suggest_features(request: FeatureSuggestRequest):
     """Meminta saran fitur baru ke LLM"""
-    file_path = os.path.join(settings.DATA_DIR, request.filename)
-    if not os.path.exists(file_path):
-        raise HTTPException(404, "File not found")
+    file_path = _dataset_path(request.filename)
+    filename = storage.safe_key(request.filename)
 
     try:
-        df = ingestion.load_data(file_path)
+        # Isi dataset + deskripsi sama (nama file / user mana pun) -> pakai saran LLM sebelumnya
+        cache_key = content_store.result_key(filename, "feature_plan", {"description": request.description})
+        cached = content_store.get_result(cache_key)
+        if cached is not None:
+            return {"plan": cached["plan"]}
+
+        df = ingestion.load_dataset(filename, file_path)
+        profile = statistics.load_profile(filename)
         # Step 4A: Call LLM
-        plan = feature_eng.generate_features_plan(df, request.description)
+        plan = feature_eng.generate_features_plan(df, request.description, profile=profile)
+        # Plan kosong = LLM gagal / balasan tidak valid, jangan di-cache
+        if plan:
+            content_store.put_result(cache_key, {"plan": plan})
         return {"plan": plan}
     except Exception as e:
         raise HTTPException(500, detail=str(e))
@@ -92,27 +241,31 @@ def suggest_features(request: FeatureSuggestRequest):
 @app.post("/features/apply", response_model=FeatureApplyResponse)
 def apply_features(request: FeatureApplyRequest):
     """Menerapkan saran fitur dan menyimpan dataset baru"""
-    file_path = os.path.join(settings.DATA_DIR, request.filename)
-    if not os.path.exists(file_path):
-        raise HTTPException(404, "File not found")
+    file_path = _dataset_path(request.filename)
+    filename = storage.safe_key(request.filename)
+    cost = admission.estimate_features_apply(admission.dataset_shape(filename, file_path), len(request.plan))
+
+    with admission.admit(cost):
+        return _apply_features(request, file_path, filename)
 
+def _apply_features(request: FeatureApplyRequest, file_path: str, filename: str) -> dict:
     try:
-        df = ingestion.load_data(file_path)
+        df = ingestion.load_dataset(filename, file_path)
         
         # Step 4B: Execute Code
         df_augmented, report = feature_eng.execute_feature_code(df, request.plan)
         
-        # Simpan file baru agar tidak menimpa original
-        new_filename = f"augmented_{request.filename}"
-        new_path = os.path.join(settings.DATA_DIR, new_filename)
-        df_augmented.to_csv(new_path, index=False)
+        # Simpan hanya kolom baru (base + delta), original tidak ditimpa
+        new_columns = [r['name'] for r in report if r['status'] == 'Success']
+        new_filename = augmentation.save_augmented(request.filename, df_augmented, new_columns, request.plan)
         
-        success_count = sum(1 for r in report if r['status'] == 'Success')
+        success_count = len(new_columns)
         
         return {
             "new_filename": new_filename,
             "new_columns": df_augmented.columns.tolist(),
-            "message": f"Berhasil menambah {success_count} fitur baru."
+            "message": f"Berhasil menambah {success_count} fitur baru.",
+            "report": report
         }
     except Exception as e:
         raise HTTPException(500, detail=str(e))
@@ -120,63 +273,326 @@ def apply_features(request: FeatureApplyRequest):
 # ==========================================
 # 5, 6, 7. TRAINING PIPELINE
 # ==========================================
+def _train_cache_key(filename: str, target: str, engine: Optional[str], cv_folds: Optional[int]) -> Optional[str]:
+    # Isi dataset + parameter sama sudah pernah dilatih (nama file / user mana pun) -> hasil sebelumnya
+    return content_store.result_key(filename, "train", {
+        "target": target,
+        "engine": engine or settings.TRAINING_ENGINE,
+        "cv_folds": cv_folds,
+    })
+
+def _model_tag(target: str, cache_key: Optional[str]) -> str:
+    # Nama artifact unik per (isi dataset, target, engine, cv_folds) = key cache hasil:
+    # training target lain / upload ulang isi berbeda tidak menimpa model yang ditunjuk cache
+    if cache_key is None:
+        return target
+    return f"{target}_{cache_key.rsplit('/', 1)[-1][:12]}"
+
+def _cached_training(cache_key: Optional[str]) -> Optional[dict]:
+    cached = content_store.get_result(cache_key)
+    if cached is None:
+        return None
+    models = storage.model_store()
+    model_filename = cached["model_filename"]
+    # Artifact yang ditimpa setelah hasil di-cache bukan lagi model hasil training ini
+    if not models.exists(model_filename) or models.mtime(model_filename) > storage.data_store().mtime(cache_key):
+        return None
+    return {**cached, "message": "Model identik sudah pernah dilatih, hasil diambil dari cache."}
+
+def _train_response(result: dict) -> dict:
+    """Hasil training_pool (status 'success') -> TrainResponse."""
+    task_type = result['task_type']
+    metrics = result['metrics']
+    main_score = metrics.get('Accuracy') if task_type == 'classification' else metrics.get('R2')
+
+    return {
+        "status": "success",
+        "task_type": task_type,
+        "accuracy_score": main_score or 0.0,
+        "metrics_detail": metrics,
+        "confusion_matrix": result.get('confusion_matrix'),
+        "prediction_sample": result.get('prediction_sample'),
+        "best_model_name": result['best_model_name'],
+        "model_filename": result['model_filename'],
+        "engine": result['engine'],
+        "training_seconds": result['training_seconds'],
+        "cv_report": result.get('cv_report'),
+        "compiled_scoring": result.get('compiled_scoring'),
+        "mode": result.get('mode', 'full'),
+        "rows_appended": result.get('rows_appended'),
+        "metrics_before": result.get('metrics_before'),
+        "incremental_report": result.get('incremental_report'),
+        "message": "Model berhasil dilatih dan dievaluasi."
+    }
+
+def _save_lineage(result: dict, filename: str, raw, clean_plan, columns, target: str,
+                  tag: Optional[str] = None, hashes=None) -> None:
+    """Lineage model engine 'fast' untuk /train/incremental (gagal simpan tidak menggagalkan training)."""
+    if not settings.INCREMENTAL_ENABLED or result.get('engine') != "fast":
+        return
+    try:
+        incremental.save_lineage(result['model_filename'], incremental.build_lineage(
+            filename, raw, clean_plan, list(columns), target, result['task_type'], tag=tag, hashes=hashes
+        ))
+    except Exception as e:
+        logger.warning(f"⚠️ Lineage {result['model_filename']} tidak tersimpan: {e}")
+
 @app.post("/train", response_model=TrainResponse)
 def train_pipeline(request: TrainRequest):
     """
     Menjalankan Full Pipeline:
     Clean -> Select -> Train (3 Models) -> Ensemble -> Evaluate
     """
-    file_path = os.path.join(settings.DATA_DIR, request.filename)
-    if not os.path.exists(file_path):
-        raise HTTPException(404, "File not found")
+    file_path = _dataset_path(request.filename)
+    filename = storage.safe_key(request.filename)
 
-    try:
-        logger.info(f"Starting pipeline for {request.filename}...")
-        
-        # --- [Step 1] Reload Data ---
-        df = ingestion.load_data(file_path)
-        
-        # --- [Step 2] Cleaning ---
-        df = cleaning.auto_clean(df)
-        
-        # --- [Step 3] Selection ---
-        df = selection.select_features(df, target=request.target_column)
-        
-        # --- [Step 5] Modeling ---
-        # Note: Step 4 dilewati di sini karena dianggap sudah dilakukan via API /features/apply
-        train_res = modeling.train_diverse_models(df, target=request.target_column)
+    cache_key = _train_cache_key(filename, request.target_column, request.engine, request.cv_folds)
+    cached = _cached_training(cache_key)
+    if cached is not None:
+        logger.info(f"♻️ Hasil training {request.filename} diambil dari cache (isi dataset identik).")
+        return cached
+
+    # Antre / 429 jika node penuh (estimasi dari profile dataset, lihat admission)
+    cost = admission.estimate_train(
+        admission.dataset_shape(filename, file_path), request.target_column,
+        request.engine or settings.TRAINING_ENGINE
+    )
+    with admission.admit(cost):
+        try:
+            logger.info(f"Starting pipeline for {request.filename}...")
         
-        if train_res['status'] != 'success':
-            raise ValueError(f"Training failed: {train_res.get('message')}")
+            raw = None
+            if out_of_core.should_use_out_of_core(file_path):
+                # --- [Step 1-3] Streaming per chunk, training pakai sampel representatif ---
+                df = out_of_core.prepare_training_frame(
+                    file_path, target=request.target_column, sheet=content_store.resolve(filename)["sheet"]
+                )
+            else:
+                # --- [Step 1] Reload Data ---
+                # Antar stage dioper sebagai view (mask baris + daftar kolom + nilai imputasi),
+                # frame dimaterialisasi sekali saat dikirim ke worker training
+                raw = ingestion.load_dataset(filename, file_path)
             
-        models_list = train_res['models_list']
-        task_type = train_res['task']
-        best_single_model_name = train_res['metrics_report'][0]['model_id']
-
-        # --- [Step 6] Ensembling ---
-        ensemble_res = ensembling.ensemble_models(models_list, task_type)
-        final_model = ensemble_res['final_model']
+                # --- [Step 2] Cleaning ---
+                # Plan exact (imputasi + batas IQR) disimpan di lineage retrain incremental
+                df, clean_plan = cleaning.auto_clean_with_plan(frame_view.FrameView(raw))
+            
+                # --- [Step 3] Selection ---
+                # Frekuensi nilai + co-moment korelasi: satu-satunya pass statistik, atas frame bersih
+                df = selection.select_features(
+                    df, target=request.target_column, stats=statistics.compute_stats(df)
+                )
         
-        # --- [Step 7] Evaluation ---
-        eval_report = evaluation.evaluate_model(final_model, task_type)
+            # --- [Step 5-7] Modeling -> Ensembling -> Evaluation (di worker training pre-warmed) ---
+            # Note: Step 4 dilewati di sini karena dianggap sudah dilakukan via API /features/apply
+            tag = _model_tag(request.target_column, cache_key)
+            result = training_pool.run_training(
+                df, request.target_column, request.filename,
+                engine=request.engine, cv_folds=request.cv_folds, model_tag=tag
+            )
         
-        # Prepare Response
-        metrics = eval_report.get('metrics', {})
-        main_score = metrics.get('Accuracy') if task_type == 'classification' else metrics.get('R2')
+            if result['status'] != 'success':
+                raise ValueError(result.get('message'))
         
-        return {
-            "status": "success",
-            "task_type": task_type,
-            "accuracy_score": main_score or 0.0,
-            "metrics_detail": metrics,
-            "confusion_matrix": eval_report.get('confusion_matrix'),
-            "prediction_sample": eval_report.get('prediction_sample'),
-            "best_model_name": "Ensemble (Voting)" if ensemble_res['status'] == 'success' else best_single_model_name,
-            "message": "Model berhasil dilatih dan dievaluasi."
-        }
+            # Prepare Response
+            response = _train_response(result)
+            content_store.put_result(cache_key, response)
+            if raw is not None:
+                _save_lineage(result, filename, raw, clean_plan, df.columns, request.target_column, tag=tag)
+            return response
+
+        except Exception as e:
+            logger.error(f"Pipeline Error: {e}")
+            import traceback
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/train/batch", response_model=BatchTrainResponse)
+def train_batch(request: BatchTrainRequest):
+    """
+    Multi-target dari satu dataset:
+    Load -> Clean -> statistik seleksi (sekali untuk semua target) -> Select per target
+    (hanya relevansi ke target yang berbeda) -> Train paralel di worker pool.
+    Hasil per target sama dengan /train untuk target tersebut (termasuk cache-nya).
+    """
+    file_path = _dataset_path(request.filename)
+    filename = storage.safe_key(request.filename)
+    targets = list(dict.fromkeys(request.target_columns))
+    if not targets:
+        raise HTTPException(400, "target_columns kosong")
+
+    cost = admission.estimate_train_batch(
+        admission.dataset_shape(filename, file_path), targets, request.engine or settings.TRAINING_ENGINE
+    )
+    with admission.admit(cost):
+        return _run_train_batch(request, file_path, filename, targets)
+
+def _run_train_batch(request: BatchTrainRequest, file_path: str, filename: str, targets: list) -> dict:
+    start = time.perf_counter()
+    shared_seconds = 0.0
+    try:
+        results, errors = {}, {}
+        cache_keys = {t: _train_cache_key(filename, t, request.engine, request.cv_folds) for t in targets}
+        for target in targets:
+            cached = _cached_training(cache_keys[target])
+            if cached is not None:
+                results[target] = cached
+        pending = [t for t in targets if t not in results]
+        logger.info(f"Starting batch pipeline for {request.filename}: {len(pending)}/{len(targets)} target dilatih...")
+
+        if pending:
+            if out_of_core.should_use_out_of_core(file_path):
+                # --- [Step 1-2] Streaming sekali, sampel bersih dipakai semua target ---
+                df, clean_stats = out_of_core.prepare_clean_sample(file_path, content_store.resolve(filename)["sheet"])
+                raw = None
+            else:
+                # --- [Step 1-2] Load + Cleaning (tidak bergantung target) ---
+                raw = ingestion.load_dataset(filename, file_path)
+                df, clean_plan = cleaning.auto_clean_with_plan(frame_view.FrameView(raw))
+                # Frekuensi nilai + co-moment korelasi antar fitur: satu pass untuk semua target
+                clean_stats = statistics.compute_stats(df)
+
+            # --- [Step 3] Selection per target ---
+            feature_sets = {}
+            for target in pending:
+                if target not in df.columns:
+                    errors[target] = f"Kolom target '{target}' tidak ditemukan"
+                elif isinstance(df, frame_view.FrameView):
+                    feature_sets[target] = list(selection.select_features(df, target=target, stats=clean_stats).columns)
+                else:
+                    feature_sets[target] = out_of_core.select_columns(list(df.columns), clean_stats, target)
+            shared_seconds = time.perf_counter() - start
+
+            # --- [Step 5-7] Semua target paralel, frame bersih dikirim sekali ke shared memory ---
+            tags = {target: _model_tag(target, cache_keys[target]) for target in feature_sets}
+            trained = training_pool.run_training_batch(
+                df, feature_sets, request.filename, engine=request.engine, cv_folds=request.cv_folds,
+                model_tags=tags
+            ) if feature_sets else {}
+            hashes = None # Hash baris lineage, dihitung sekali untuk semua target
+            for target, result in trained.items():
+                if result['status'] != 'success':
+                    errors[target] = result.get('message') or "Training gagal"
+                    continue
+                results[target] = _train_response(result)
+                content_store.put_result(cache_keys[target], results[target])
+                if raw is not None:
+                    if hashes is None:
+                        hashes = incremental.row_hashes(raw)
+                    _save_lineage(result, filename, raw, clean_plan, feature_sets[target], target,
+                                  tag=tags[target], hashes=hashes)
 
     except Exception as e:
-        logger.error(f"Pipeline Error: {e}")
+        logger.error(f"Batch Pipeline Error: {e}")
         import traceback
         traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not results:
+        raise HTTPException(status_code=500, detail="; ".join(f"{t}: {m}" for t, m in errors.items()))
+
+    return {
+        "status": "partial" if errors else "success",
+        "results": {t: results[t] for t in targets if t in results},
+        "errors": errors,
+        "shared_seconds": round(shared_seconds, 3),
+        "total_seconds": round(time.perf_counter() - start, 3),
+        "message": f"{len(results)}/{len(targets)} target berhasil dilatih.",
+    }
+
+@app.post("/train/incremental", response_model=TrainResponse)
+def train_incremental(request: IncrementalTrainRequest):
+    """
+    Retrain model engine 'fast' setelah dataset di-append (file lama + baris baru):
+    hanya baris baru yang diproses (statistik cleaning di-update, LightGBM lanjut boosting,
+    regresi linear di-update eksak, logistic warm-start dengan sampel replay baris lama),
+    evaluasi pada hold-out baris baru. Hasilnya artifact baru
+    (model_filename di response); model lama tidak ditimpa.
+    Bukan append (baris lama berubah, kolom beda, model tanpa lineage) -> retrain penuh
+    seperti /train, atau 409 jika full_retrain_fallback=False.
+    """
+    key = _model_key(request.model_filename)
+    file_path = _dataset_path(request.filename)
+    filename = storage.safe_key(request.filename)
+
+    lineage = incremental.read_lineage(key)
+    reason = "model tidak punya lineage (engine pycaret / dilatih sebelum lineage ada)"
+    if lineage is not None:
+        shape = admission.dataset_shape(filename, file_path)
+        appended = shape["rows"] - lineage["n_rows"] if shape["rows"] is not None else None
+        with admission.admit(admission.estimate_incremental(shape, appended)):
+            response, reason = _run_incremental(request, file_path, filename, key, lineage)
+        if response is not None:
+            return response
+
+    if not request.full_retrain_fallback:
+        raise HTTPException(409, f"Retrain incremental tidak bisa: {reason}")
+    target = lineage["target"] if lineage is not None else request.target_column
+    if not target:
+        raise HTTPException(400, f"Retrain incremental tidak bisa ({reason}) dan target_column tidak diberikan")
+
+    logger.info(f"🔁 Retrain penuh {request.filename}: {reason}")
+    response = train_pipeline(TrainRequest(
+        filename=request.filename, target_column=target,
+        engine="fast" if lineage is not None else None, cv_folds=request.cv_folds,
+    ))
+    return {**response, "mode": "full", "message": f"Retrain penuh: {reason}."}
+
+def _run_incremental(request: IncrementalTrainRequest, file_path: str, filename: str,
+                     key: str, lineage: dict):
+    """(response, None) jika retrain incremental berhasil, (None, alasan) jika harus retrain penuh."""
+    try:
+        df = ingestion.load_dataset(filename, file_path)
+        check = incremental.detect_append(lineage, df)
+        if not check["append"]:
+            return None, check["reason"]
+
+        logger.info(f"🔁 {request.filename}: {check['rows_appended']} baris baru, retrain incremental {key}...")
+        result = training_pool.run_incremental(
+            df.iloc[lineage["n_rows"]:], key, filename, lineage, check["row_hash"]
+        )
+        if result['status'] != 'success':
+            return None, result.get('reason') or result.get('message')
+        return {**_train_response(result),
+                "message": f"Model dilatih lanjut dengan {result['rows_appended']} baris baru."}, None
+    except Exception as e:
+        logger.error(f"Incremental Pipeline Error: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+# ==========================================
+# 8. SCORING (PREDIKSI ONLINE)
+# ==========================================
+def _model_key(model_filename: str) -> str:
+    try:
+        key = storage.safe_key(model_filename)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    if not storage.model_store().exists(key):
+        raise HTTPException(404, "Model not found")
+    return key
+
+@app.post("/predict", response_model=PredictResponse)
+def predict(request: PredictRequest):
+    """
+    Prediksi baris baru. Request bersamaan untuk model yang sama digabung per micro-batch;
+    model engine 'fast' memakai jalur terkompilasi (NumPy), lainnya predict_model.
+    """
+    key = _model_key(request.model_filename)
+    if not request.records:
+        raise HTTPException(400, "records kosong")
+    try:
+        return scoring.predict(key, request.records)
+    except Exception as e:
+        logger.error(f"Predict Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/predict/benchmark")
+def predict_benchmark(request: PredictBenchmarkRequest):
+    """Latensi p50/p99 prediksi satu baris: jalur compiled vs stock."""
+    key = _model_key(request.model_filename)
+    try:
+        return scoring.benchmark(key, request.records, request.n)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
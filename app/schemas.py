@@ -13,6 +13,10 @@ class UploadResponse(BaseModel):
     columns: List[str]
     suggested_target: Optional[str] = None
     row_count: int
+    sheets: Optional[List[str]] = None # Excel: semua sheet di workbook
+    sheet: Optional[str] = None # Excel: sheet yang dipakai sebagai dataset
+    sha256: Optional[str] = None # Hash isi file (dataset disimpan content-addressed)
+    deduplicated: bool = False # True jika isi identik sudah pernah di-upload
 
 # --- Feature Engineering ---
 class FeatureSuggestRequest(BaseModel):
@@ -30,6 +34,7 @@ class FeatureApplyResponse(BaseModel):
     new_filename: str
     new_columns: List[str]
     message: str
+    report: Optional[List[Dict[str, Any]]] = None # Status + verdict dry-run per fitur
 
 # --- Training ---
 class TrainRequest(BaseModel):
@@ -37,6 +42,8 @@ class TrainRequest(BaseModel):
     target_column: str
     task_type: Optional[str] = "auto" # 'classification', 'regression'
     model_choice: Optional[str] = "auto" # 'auto' or specific algorithm
+    engine: Optional[str] = None # 'pycaret' | 'fast' (default: settings.TRAINING_ENGINE)
+    cv_folds: Optional[int] = None # Jumlah fold CV untuk engine 'fast'
 
 class TrainResponse(BaseModel):
     status: str
@@ -46,4 +53,50 @@ class TrainResponse(BaseModel):
     confusion_matrix: Optional[List[List[int]]] = None # For classification
     prediction_sample: Optional[List[Dict[str, Any]]] = None # For regression
     best_model_name: str
-    message: str
\ No newline at end of file
+    model_filename: Optional[str] = None # Key artifact model di model storage
+    engine: Optional[str] = None
+    training_seconds: Optional[float] = None
+    cv_report: Optional[List[Dict[str, Any]]] = None # Per model: skor CV, fold terpakai, waktu dihemat
+    compiled_scoring: Optional[Dict[str, Any]] = None # Status kompilasi jalur scoring cepat
+    mode: Optional[str] = None # 'full' | 'incremental' (/train/incremental)
+    rows_appended: Optional[int] = None
+    metrics_before: Optional[Dict[str, float]] = None # Model lama pada hold-out baris baru
+    incremental_report: Optional[Dict[str, Any]] = None # Per model: metode update (init_model, warm start, ...)
+    message: str
+
+class IncrementalTrainRequest(BaseModel):
+    filename: str # Dataset baru (file lama + baris baru)
+    model_filename: str # Model yang dilanjutkan
+    target_column: Optional[str] = None # Hanya untuk retrain penuh jika model tidak punya lineage
+    cv_folds: Optional[int] = None # Untuk retrain penuh
+    full_retrain_fallback: bool = True # False: 409 jika bukan append
+class BatchTrainRequest(BaseModel):
+    filename: str
+    target_columns: List[str] # Beberapa target dari dataset yang sama
+    engine: Optional[str] = None # 'pycaret' | 'fast' (default: settings.TRAINING_ENGINE)
+    cv_folds: Optional[int] = None
+
+class BatchTrainResponse(BaseModel):
+    status: str # 'success' | 'partial' (sebagian target gagal)
+    results: Dict[str, TrainResponse] # Per target yang berhasil (urutan = target_columns)
+    errors: Dict[str, str] = {} # Per target yang gagal
+    shared_seconds: float # Ingestion + cleaning + statistik seleksi (sekali untuk semua target)
+    total_seconds: float
+    message: str
+# --- Scoring ---
+class PredictRequest(BaseModel):
+    model_filename: str
+    records: List[Dict[str, Any]] # Baris input mentah (kolom sama dengan saat training)
+
+class PredictResponse(BaseModel):
+    predictions: List[Any]
+    probabilities: Optional[List[List[float]]] = None # Klasifikasi (urutan = classes)
+    classes: Optional[List[Any]] = None
+    path: str # 'compiled' atau 'stock'
+    batch_rows: int # Jumlah baris di micro-batch tempat request ini dieksekusi
+    latency_ms: float
+
+class PredictBenchmarkRequest(BaseModel):
+    model_filename: str
+    records: Optional[List[Dict[str, Any]]] = None # Default: sampel hold-out saat training
+    n: int = 200
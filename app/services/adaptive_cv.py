@@ -0,0 +1,108 @@
+import math
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+
+# ==========================================
+# ADAPTIVE CROSS-VALIDATION (RACING)
+# ==========================================
+# Semua model dievaluasi fold demi fold secara bergiliran. Setelah minimal
+# ADAPTIVE_CV_MIN_FOLDS fold, model yang secara statistik kalah dari model
+# terbaik (paired test pada fold yang sama) berhenti di-CV. Jumlah fold juga
+# dikurangi untuk dataset besar (variansi antar fold sudah kecil).
+
+
+def choose_folds(n_rows: int, requested: int) -> int:
+    """
+    Jumlah fold CV berdasarkan ukuran data (tidak pernah lebih dari `requested`).
+    """
+    if not settings.ADAPTIVE_CV_ENABLED:
+        return requested
+    if n_rows >= settings.ADAPTIVE_CV_HUGE_ROWS:
+        return min(requested, 3)
+    if n_rows >= settings.ADAPTIVE_CV_LARGE_ROWS:
+        return min(requested, 5)
+    return requested
+
+
+def is_dominated(best_scores: List[float], scores: List[float], z: float) -> bool:
+    """
+    Paired test: model kalah jika rata-rata selisih skor (best - model) per fold
+    positif dengan margin z * standard error.
+    """
+    diff = np.asarray(best_scores) - np.asarray(scores)
+    if len(diff) < 2:
+        return False
+    se = diff.std(ddof=1) / math.sqrt(len(diff))
+    return diff.mean() - z * se > 0
+
+
+def race(model_ids: List[str], splits: Iterable[Tuple[np.ndarray, np.ndarray]], n_folds: int,
+         fit_and_score: Callable[[str, np.ndarray, np.ndarray], Tuple[float, Optional[int]]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Racing CV.
+
+    fit_and_score(model_id, train_idx, valid_idx) -> (skor fold, best iteration atau None).
+    Model yang gagal di salah satu fold dikeluarkan dari hasil.
+
+    Returns:
+        Dictionary model_id -> {score, fold_scores, cv_folds_used, cv_folds_planned,
+        cv_stopped_early, time_saved_s, params}.
+    """
+    state = {m: {"scores": [], "times": [], "best_iters": [], "active": True, "error": None} for m in model_ids}
+    min_folds = settings.ADAPTIVE_CV_MIN_FOLDS
+
+    for fold_no, (train_idx, valid_idx) in enumerate(splits, start=1):
+        active = [m for m in model_ids if state[m]["active"]]
+        for m in active:
+            start = time.perf_counter()
+            try:
+                score, best_iter = fit_and_score(m, train_idx, valid_idx)
+            except Exception as e:
+                state[m].update(active=False, error=str(e))
+                continue
+            state[m]["times"].append(time.perf_counter() - start)
+            state[m]["scores"].append(score)
+            if best_iter:
+                state[m]["best_iters"].append(best_iter)
+
+        active = [m for m in model_ids if state[m]["active"]]
+        if settings.ADAPTIVE_CV_ENABLED and fold_no >= min_folds and fold_no < n_folds and len(active) > 1:
+            best = max(active, key=lambda m: np.mean(state[m]["scores"]))
+            for m in active:
+                if m != best and is_dominated(state[best]["scores"], state[m]["scores"], settings.ADAPTIVE_CV_Z):
+                    state[m]["active"] = False
+
+    results = {}
+    for m in model_ids:
+        info = state[m]
+        if info["error"] is not None or not info["scores"]:
+            results[m] = {"error": info["error"] or "CV tidak menghasilkan skor"}
+            continue
+        used = len(info["scores"])
+        params = {}
+        if info["best_iters"]:
+            params["n_estimators"] = int(np.median(info["best_iters"]))
+        results[m] = {
+            "score": float(np.mean(info["scores"])),
+            "fold_scores": info["scores"],
+            "cv_folds_used": used,
+            "cv_folds_planned": n_folds,
+            "cv_stopped_early": used < n_folds,
+            # Estimasi: fold yang dilewati x rata-rata waktu per fold model tsb
+            "time_saved_s": round((n_folds - used) * float(np.mean(info["times"])), 3),
+            "params": params,
+        }
+    return results
+
+
+def cv_splits(task: str, y, n_folds: int, random_state: int):
+    """Stratified k-fold untuk klasifikasi, k-fold biasa untuk regresi (sama seperti PyCaret)."""
+    from sklearn.model_selection import KFold, StratifiedKFold
+
+    splitter_cls = StratifiedKFold if task == "classification" else KFold
+    splitter = splitter_cls(n_splits=n_folds, shuffle=True, random_state=random_state)
+    return splitter.split(np.zeros(len(y)), y)
@@ -0,0 +1,341 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.config import settings
+from app.services import storage
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+# ADMISSION CONTROL (BUDGET CPU / MEMORI PER PROSES API)
+# ==========================================
+# Setiap request berat (/train, /train/batch, /train/incremental, /features/apply)
+# diestimasi biayanya dari profile dataset (baris x kolom, task, jumlah model/target/fitur):
+# slot CPU, memori puncak dan durasi. Request yang muat di budget langsung jalan;
+# sisanya antre dengan prioritas job pendek (shortest job first + aging agar job
+# besar tidak kelaparan). Jika perkiraan tunggu > ADMISSION_MAX_WAIT_S -> 429 +
+# Retry-After. Estimasi durasi dikalibrasi dari waktu eksekusi request sebelumnya
+# (regresi linear durasi ~ unit kerja, bobot meluruh), disimpan di data storage.
+# Budget berlaku per proses API: dengan beberapa worker uvicorn per node, bagi
+# ADMISSION_CPU_SLOTS / ADMISSION_MEMORY_MB sesuai jumlah worker.
+
+CALIBRATION_KEY = "admission/calibration.json"
+CALIBRATION_DECAY = 0.9 # Bobot observasi lama per observasi baru
+CALIBRATION_MIN_SAMPLES = 3
+
+# Prior sebelum ada data kalibrasi: detik = base + rate x unit kerja
+# (unit = juta sel x model / target / fitur, lihat estimate_*)
+# (key kalibrasi tanpa prior sendiri memakai prior prefix-nya, mis. 'train:fast:regression' -> 'train:fast')
+PRIORS = {
+    "train:fast": (2.0, 3.0),
+    "train:pycaret": (15.0, 10.0),
+    "train_batch:fast": (2.0, 3.0),
+    "train_batch:pycaret": (15.0, 10.0),
+    "train_incremental:fast": (1.0, 3.0),
+    "features_apply": (0.5, 0.5),
+}
+DEFAULT_PRIOR = (5.0, 5.0)
+
+# Memori puncak per request = kelipatan ukuran dataset di memori
+MEMORY_FACTORS = {"train": 3.0, "train_batch": 3.0, "train_incremental": 2.0, "features_apply": 2.5}
+BYTES_PER_CELL = 16
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, expected_wait_s: float, reason: str):
+        super().__init__(reason)
+        self.expected_wait_s = expected_wait_s
+        self.reason = reason
+
+
+# ==========================================
+# ESTIMASI BIAYA
+# ==========================================
+def dataset_shape(filename: str, file_path: str) -> Dict[str, Any]:
+    """
+    Baris, kolom dan ukuran di memori (MB) dari profile upload; tanpa profile
+    (manifest augmented / file lama) diestimasi dari ukuran file.
+    """
+    from app.services import augmentation, ingestion, statistics
+
+    profile = statistics.load_profile(filename)
+    extra_cols = 0
+    if profile is None and augmentation.is_manifest(filename):
+        manifest = augmentation.read_manifest(file_path)
+        profile = statistics.load_profile(manifest["base"])
+        extra_cols = len(manifest["columns"])
+
+    if profile is not None:
+        rows, cols = profile["n_rows"], len(profile["columns"]) + extra_cols
+        return {"rows": rows, "cols": cols, "memory_mb": rows * cols * BYTES_PER_CELL / 2**20,
+                "columns": profile["columns"]}
+    memory_mb = ingestion.estimate_memory_mb(file_path)
+    return {"rows": None, "cols": None, "memory_mb": memory_mb, "columns": {},
+            "cells": memory_mb * 2**20 / BYTES_PER_CELL}
+
+
+def _cells_m(shape: Dict[str, Any]) -> float:
+    cells = shape.get("cells") or (shape["rows"] or 0) * (shape["cols"] or 0)
+    return cells / 1e6
+
+
+def _guess_task(shape: Dict[str, Any], target: str) -> str:
+    # Aturan modeling._detect_task_type dari ringkasan profile (unik hanya ada untuk non-numerik)
+    info = shape["columns"].get(target) or {}
+    if "unique" in info or info.get("dtype") == "bool":
+        return "classification"
+    return "regression"
+
+
+def _cost(kind: str, key: str, units: float, slots: int, memory_mb: float, **detail) -> Dict[str, Any]:
+    return {
+        "kind": kind,
+        "calibration_key": key,
+        "units": round(units, 4),
+        "cpu_slots": max(1, slots),
+        "memory_mb": round(memory_mb, 1),
+        "est_seconds": round(predict_seconds(key, units), 2),
+        **detail,
+    }
+
+
+def estimate_train(shape: Dict[str, Any], target: str, engine: str, n_models: int = 3) -> Dict[str, Any]:
+    task = _guess_task(shape, target)
+    return _cost("train", f"train:{engine}:{task}", _cells_m(shape) * n_models, 1,
+                 shape["memory_mb"] * MEMORY_FACTORS["train"], task=task, engine=engine)
+
+
+def estimate_train_batch(shape: Dict[str, Any], targets: List[str], engine: str, n_models: int = 3) -> Dict[str, Any]:
+    # Target dilatih paralel di pool: durasi ~ jumlah gelombang, slot CPU = worker terpakai
+    parallel = max(1, min(len(targets), settings.TRAINING_POOL_WORKERS))
+    units = _cells_m(shape) * n_models * len(targets) / parallel
+    memory = shape["memory_mb"] * (MEMORY_FACTORS["train_batch"] + 0.5 * (parallel - 1))
+    return _cost("train_batch", f"train_batch:{engine}", units, parallel, memory, targets=len(targets), engine=engine)
+
+
+def estimate_incremental(shape: Dict[str, Any], appended_rows: Optional[int], n_models: int = 3) -> Dict[str, Any]:
+    rows, cols = shape.get("rows") or 0, shape.get("cols") or 0
+    new_rows = appended_rows if appended_rows is not None and appended_rows > 0 else rows
+    return _cost("train_incremental", "train_incremental:fast", new_rows * cols / 1e6 * n_models, 1,
+                 shape["memory_mb"] * MEMORY_FACTORS["train_incremental"], rows_appended=new_rows)
+
+
+def estimate_features_apply(shape: Dict[str, Any], n_features: int) -> Dict[str, Any]:
+    return _cost("features_apply", "features_apply", _cells_m(shape) * max(1, n_features), 1,
+                 shape["memory_mb"] * MEMORY_FACTORS["features_apply"], features=n_features)
+
+
+# ==========================================
+# KALIBRASI (DURASI ~ UNIT KERJA)
+# ==========================================
+_CALIBRATION: Optional[Dict[str, Dict[str, float]]] = None
+_CALIBRATION_LOCK = threading.Lock()
+
+
+def _calibration() -> Dict[str, Dict[str, float]]:
+    global _CALIBRATION
+    if _CALIBRATION is None:
+        store = storage.data_store()
+        _CALIBRATION = storage.get_json(store, CALIBRATION_KEY) if store.exists(CALIBRATION_KEY) else {}
+    return _CALIBRATION
+
+
+def _prior(key: str):
+    while key:
+        if key in PRIORS:
+            return PRIORS[key]
+        key = key.rpartition(":")[0]
+    return DEFAULT_PRIOR
+
+
+def predict_seconds(key: str, units: float) -> float:
+    with _CALIBRATION_LOCK:
+        sums = _calibration().get(key)
+    base, rate = _prior(key)
+    if sums and sums["n"] >= CALIBRATION_MIN_SAMPLES:
+        # Weighted least squares: detik = a + b x unit (b >= 0)
+        w, su, ss, suu, sus = sums["w"], sums["su"], sums["ss"], sums["suu"], sums["sus"]
+        var = suu - su * su / w
+        rate = max(0.0, (sus - su * ss / w) / var) if var > 1e-12 else rate
+        base = max(0.0, (ss - rate * su) / w)
+    return base + rate * units
+
+
+def record(key: str, units: float, seconds: float) -> None:
+    """Simpan durasi aktual satu request untuk kalibrasi estimasi berikutnya."""
+    with _CALIBRATION_LOCK:
+        calibration = _calibration()
+        sums = calibration.get(key) or {"n": 0, "w": 0.0, "su": 0.0, "ss": 0.0, "suu": 0.0, "sus": 0.0}
+        for name in ("w", "su", "ss", "suu", "sus"):
+            sums[name] *= CALIBRATION_DECAY
+        sums["n"] += 1
+        sums["w"] += 1.0
+        sums["su"] += units
+        sums["ss"] += seconds
+        sums["suu"] += units * units
+        sums["sus"] += units * seconds
+        calibration[key] = sums
+        snapshot = dict(calibration)
+    try:
+        storage.put_json(storage.data_store(), CALIBRATION_KEY, snapshot)
+    except Exception as e:
+        logger.warning(f"⚠️ Kalibrasi admission tidak tersimpan: {e}")
+
+
+# ==========================================
+# SCHEDULER
+# ==========================================
+class _Ticket:
+    def __init__(self, cost: Dict[str, Any]):
+        self.cost = cost
+        self.enqueued = time.monotonic()
+        self.started: Optional[float] = None
+
+    def priority(self, now: float) -> float:
+        # Job pendek duluan; setiap detik menunggu mengurangi "ukuran" job (aging)
+        return self.cost["est_seconds"] - settings.ADMISSION_AGING * (now - self.enqueued)
+
+
+_COND = threading.Condition()
+_RUNNING: List[_Ticket] = []
+_QUEUE: List[_Ticket] = []
+
+
+def cpu_budget() -> int:
+    return settings.ADMISSION_CPU_SLOTS or os.cpu_count() or 1
+
+
+def memory_budget_mb() -> float:
+    if settings.ADMISSION_MEMORY_MB:
+        return float(settings.ADMISSION_MEMORY_MB)
+    try:
+        total = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 2**20
+    except (ValueError, OSError, AttributeError):
+        total = 8192.0
+    return 0.8 * total
+
+
+def _fits(cost: Dict[str, Any]) -> bool:
+    # Request lebih besar dari seluruh budget tetap bisa jalan, tapi sendirian
+    if not _RUNNING:
+        return True
+    slots = sum(t.cost["cpu_slots"] for t in _RUNNING) + cost["cpu_slots"]
+    memory = sum(t.cost["memory_mb"] for t in _RUNNING) + cost["memory_mb"]
+    return slots <= cpu_budget() and memory <= memory_budget_mb()
+
+
+def _expected_wait(ticket: _Ticket, now: float) -> float:
+    """
+    Perkiraan tunggu: sampai cukup job berjalan selesai agar request muat, ditambah
+    job antrean berprioritas lebih tinggi dibagi slot CPU.
+    """
+    wait = 0.0
+    if not _fits(ticket.cost):
+        running = sorted(_RUNNING, key=lambda t: t.cost["est_seconds"] - (now - t.started))
+        slots = cpu_budget() - ticket.cost["cpu_slots"]
+        memory = memory_budget_mb() - ticket.cost["memory_mb"]
+        used_slots = sum(t.cost["cpu_slots"] for t in running)
+        used_memory = sum(t.cost["memory_mb"] for t in running)
+        for t in running:
+            wait = max(0.0, t.cost["est_seconds"] - (now - t.started))
+            used_slots -= t.cost["cpu_slots"]
+            used_memory -= t.cost["memory_mb"]
+            if used_slots <= slots and used_memory <= memory:
+                break
+    mine = ticket.priority(now)
+    ahead = sum(t.cost["est_seconds"] for t in _QUEUE if t is not ticket and t.priority(now) < mine)
+    return wait + ahead / cpu_budget()
+
+
+def _start(ticket: _Ticket) -> None:
+    ticket.started = time.monotonic()
+    _RUNNING.append(ticket)
+
+
+def acquire(cost: Dict[str, Any]) -> _Ticket:
+    """
+    Tunggu sampai request boleh jalan. AdmissionRejected jika antrean penuh atau
+    perkiraan / waktu tunggu melebihi ADMISSION_MAX_WAIT_S.
+    """
+    ticket = _Ticket(cost)
+    with _COND:
+        if not _QUEUE and _fits(cost):
+            _start(ticket)
+            return ticket
+
+        now = time.monotonic()
+        wait = _expected_wait(ticket, now)
+        if len(_QUEUE) >= settings.ADMISSION_MAX_QUEUE:
+            raise AdmissionRejected(wait, "antrean penuh")
+        if wait > settings.ADMISSION_MAX_WAIT_S:
+            raise AdmissionRejected(wait, "perkiraan tunggu melebihi batas")
+
+        _QUEUE.append(ticket)
+        logger.info(f"⏳ Request {cost['kind']} antre (estimasi {cost['est_seconds']}s, tunggu ~{wait:.1f}s)")
+        deadline = now + settings.ADMISSION_MAX_WAIT_S
+        try:
+            while True:
+                now = time.monotonic()
+                head = min(_QUEUE, key=lambda t: t.priority(now))
+                if head is ticket and _fits(cost):
+                    _QUEUE.remove(ticket)
+                    _start(ticket)
+                    # Antrean berikutnya mungkin juga muat
+                    _COND.notify_all()
+                    return ticket
+                if now >= deadline:
+                    raise AdmissionRejected(_expected_wait(ticket, now), "waktu tunggu habis")
+                # Bangun berkala: prioritas (aging) berubah seiring waktu
+                _COND.wait(timeout=min(1.0, deadline - now))
+        except AdmissionRejected:
+            _QUEUE.remove(ticket)
+            _COND.notify_all()
+            raise
+
+
+def release(ticket: _Ticket, succeeded: bool) -> None:
+    with _COND:
+        _RUNNING.remove(ticket)
+        _COND.notify_all()
+    if succeeded:
+        record(ticket.cost["calibration_key"], ticket.cost["units"], time.monotonic() - ticket.started)
+
+
+@contextmanager
+def admit(cost: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    with admit(cost): ... -> jalan setelah diterima, durasi dicatat untuk kalibrasi
+    jika blok selesai tanpa exception.
+    """
+    if not settings.ADMISSION_ENABLED:
+        yield cost
+        return
+    ticket = acquire(cost)
+    succeeded = False
+    try:
+        yield cost
+        succeeded = True
+    finally:
+        release(ticket, succeeded)
+
+
+def status() -> Dict[str, Any]:
+    now = time.monotonic()
+    with _COND:
+        running = [{**t.cost, "elapsed_s": round(now - t.started, 2)} for t in _RUNNING]
+        queued = [{**t.cost, "waited_s": round(now - t.enqueued, 2)}
+                  for t in sorted(_QUEUE, key=lambda t: t.priority(now))]
+    with _CALIBRATION_LOCK:
+        calibrated = {k: v["n"] for k, v in _calibration().items()}
+    return {
+        "enabled": settings.ADMISSION_ENABLED,
+        "cpu_slots": cpu_budget(),
+        "memory_mb": round(memory_budget_mb(), 1),
+        "running": running,
+        "queued": queued,
+        "calibration_samples": calibrated,
+    }
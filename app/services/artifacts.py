@@ -0,0 +1,205 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import settings
+from app.services import storage
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+# ARTIFACT MODEL RINGKAS
+# ==========================================
+# Model disimpan dengan joblib (tetap bisa dibuka PyCaret load_model / joblib.load)
+# setelah state khusus training dibuang. Tanpa kompresi, array numpy besar
+# (struktur tree, koefisien) ditulis sebagai buffer mentah dan dibuka dengan
+# mmap_mode='r': load cepat dan halaman memori dibagi antar proses worker
+# lewat page cache. Kompresi (lz4 / zlib) opsional, menukar mmap dengan ukuran file.
+
+META_SUFFIX = ".meta.json"
+
+_CACHE: "OrderedDict[Tuple[str, float], Any]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+# ==========================================
+# STRIP STATE TRAINING
+# ==========================================
+def _strip(obj: Any, seen: set) -> None:
+    if id(obj) in seen:
+        return
+    seen.add(id(obj))
+
+    from sklearn.base import BaseEstimator, clone
+
+    if isinstance(obj, (list, tuple)):
+        for item in obj:
+            _strip(item, seen)
+        return
+    if not hasattr(obj, "__dict__"):
+        return
+
+    name = type(obj).__name__
+    # Voting/Stacking: `estimators` berisi salinan model input yang sudah di-fit,
+    # prediksi hanya memakai `estimators_` -> ganti dengan clone tanpa state fit
+    if name.startswith(("Voting", "Stacking")) and isinstance(getattr(obj, "estimators", None), list):
+        obj.estimators = [
+            (label, est if est == "drop" else clone(est)) for label, est in obj.estimators
+        ]
+    # Cache transformer joblib.Memory (folder sementara training)
+    if name == "Pipeline" and getattr(obj, "memory", None) is not None:
+        obj.memory = None
+    # LightGBM: riwayat evaluasi + dataset training di booster
+    if hasattr(obj, "_evals_result"):
+        obj._evals_result = None
+    booster = obj.__dict__.get("_Booster")
+    if booster is not None and hasattr(booster, "free_dataset"):
+        booster.free_dataset()
+
+    for value in list(obj.__dict__.values()):
+        if isinstance(value, (BaseEstimator, list, tuple)):
+            _strip(value, seen)
+        elif isinstance(value, dict):
+            for item in value.values():
+                _strip(item, seen)
+
+
+def strip_training_state(model: Any) -> Any:
+    """
+    Buang state yang hanya dibutuhkan saat training (in-place). Prediksi tidak berubah.
+    """
+    _strip(model, set())
+    return model
+
+
+# ==========================================
+# SAVE / LOAD
+# ==========================================
+def _compress_arg(compression: str):
+    """
+    'none' -> 0 (mmap-able), 'lz4' -> ('lz4', 3) jika paket lz4 ada (fallback zlib), 'zlib' -> ('zlib', 1).
+    """
+    if compression == "lz4":
+        try:
+            import lz4  # noqa: F401
+            return ("lz4", 3)
+        except ImportError:
+            logger.warning("⚠️ Paket lz4 tidak terpasang, fallback ke zlib level 1.")
+            return ("zlib", 1)
+    if compression == "zlib":
+        return ("zlib", 1)
+    return 0
+
+
+def save_artifact(model: Any, key: str, compression: Optional[str] = None,
+                  extra_meta: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Strip state training -> joblib.dump ke file sementara -> simpan atomik ke model storage.
+    Metadata (ukuran, kompresi, benchmark load, + extra_meta) disimpan di '{key}.meta.json'.
+    """
+    import joblib
+
+    compression = compression or settings.MODEL_ARTIFACT_COMPRESSION
+    store = storage.model_store()
+
+    strip_training_state(model)
+    with storage.temp_path(".pkl") as tmp:
+        start = time.perf_counter()
+        joblib.dump(model, tmp, compress=_compress_arg(compression))
+        dump_s = time.perf_counter() - start
+        load_s = _time_load(tmp, False)
+        mmap = False
+        if compression == "none":
+            # mmap hanya dipakai jika memang lebih cepat (model kecil: overhead mmap > unpickle)
+            mmap_s = _time_load(tmp, True)
+            mmap, load_s = mmap_s <= load_s, min(mmap_s, load_s)
+        meta = {
+            "format": "joblib",
+            "compression": compression,
+            "mmap": mmap,
+            "size_bytes": os.path.getsize(tmp),
+            "dump_seconds": round(dump_s, 4),
+            "load_seconds": round(load_s, 4),
+            **(extra_meta or {}),
+        }
+        store.put_file(key, tmp)
+    storage.put_json(store, key + META_SUFFIX, meta)
+    logger.info(f"💾 Artifact {key}: {meta['size_bytes'] / 1024:.0f} KB, load {meta['load_seconds'] * 1000:.1f} ms")
+    return meta
+
+
+def _time_load(path: str, mmap: bool) -> float:
+    import joblib
+    start = time.perf_counter()
+    joblib.load(path, mmap_mode="r" if mmap else None)
+    return time.perf_counter() - start
+
+
+def read_meta(key: str) -> Optional[Dict[str, Any]]:
+    store = storage.model_store()
+    if not store.exists(key + META_SUFFIX):
+        return None
+    return storage.get_json(store, key + META_SUFFIX)
+
+
+def load_artifact(key: str) -> Any:
+    """
+    Load model untuk serving. Artifact tanpa kompresi dibuka dengan mmap (array
+    dibagi antar proses). Hasil di-cache per proses selama file tidak berubah.
+    """
+    import joblib
+
+    store = storage.model_store()
+    path = store.local_path(key)
+    cache_key = (key, os.path.getmtime(path))
+
+    with _CACHE_LOCK:
+        if cache_key in _CACHE:
+            _CACHE.move_to_end(cache_key)
+            return _CACHE[cache_key]
+
+    meta = read_meta(key) or {}
+    # Artifact lama (tanpa metadata) / terkompresi: load biasa
+    model = joblib.load(path, mmap_mode="r" if meta.get("mmap") else None)
+
+    with _CACHE_LOCK:
+        _CACHE[cache_key] = model
+        # Versi lama dari key yang sama dibuang
+        for old in [k for k in _CACHE if k[0] == key and k != cache_key]:
+            del _CACHE[old]
+        while len(_CACHE) > settings.MODEL_CACHE_SIZE:
+            _CACHE.popitem(last=False)
+    return model
+
+
+def benchmark_load(key: str, repeats: int = 5) -> Dict[str, Any]:
+    """
+    Bandingkan waktu load artifact (format saat ini) vs pickle.load biasa dari objek yang sama.
+    """
+    import pickle
+
+    store = storage.model_store()
+    path = store.local_path(key)
+    meta = read_meta(key) or {}
+    mmap = bool(meta.get("mmap"))
+
+    artifact_times = [_time_load(path, mmap) for _ in range(repeats)]
+    import joblib
+    payload = pickle.dumps(joblib.load(path), protocol=pickle.HIGHEST_PROTOCOL)
+    pickle_times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        pickle.loads(payload)
+        pickle_times.append(time.perf_counter() - start)
+
+    return {
+        "key": key,
+        "artifact_size_bytes": os.path.getsize(path),
+        "pickle_size_bytes": len(payload),
+        "artifact_load_ms": round(1000 * min(artifact_times), 3),
+        "pickle_load_ms": round(1000 * min(pickle_times), 3),
+        "mmap": mmap,
+    }
@@ -0,0 +1,154 @@
+import json
+import os
+import posixpath
+import uuid
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Union
+
+from app.services import content_store, storage
+
+# Manifest dataset augmented (base + kolom delta). Hanya nama dengan prefix ini yang
+# dibaca sebagai manifest; manifest selalu ditulis server (upload .json ditolak)
+MANIFEST_PREFIX = "augmented_"
+MANIFEST_EXT = ".json"
+MANIFEST_VERSION = 1
+
+# Folder kolom delta (relatif terhadap root data storage)
+COLUMNS_DIRNAME = "columns"
+# Format kolom delta tanpa pickle: .npy (dtype numpy, allow_pickle=False) atau
+# .json (dtype lain: string, kategori, nullable)
+COLUMN_EXTENSIONS = (".npy", ".json")
+
+
+def is_manifest(filename: str) -> bool:
+    name = os.path.basename(filename).lower()
+    return name.startswith(MANIFEST_PREFIX) and name.endswith(MANIFEST_EXT)
+
+
+def read_manifest(manifest_path: str) -> Dict[str, Any]:
+    if not is_manifest(manifest_path):
+        raise ValueError(f"Bukan manifest augmented: '{os.path.basename(manifest_path)}'")
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Versi manifest tidak didukung: {manifest.get('version')}")
+    for col in manifest["columns"]:
+        _column_key(col["file"])
+    return manifest
+
+
+def _column_key(key: str) -> str:
+    """
+    Validasi key file kolom delta: harus di bawah COLUMNS_DIRNAME/, tanpa traversal,
+    dengan format yang tidak bisa menjalankan kode.
+    """
+    if not isinstance(key, str) or posixpath.normpath(key) != key \
+            or not key.startswith(f"{COLUMNS_DIRNAME}/") or not key.endswith(COLUMN_EXTENSIONS):
+        raise ValueError(f"File kolom tidak valid di manifest: '{key}'")
+    return key
+
+
+def _write_column(store, key_stem: str, series: pd.Series) -> str:
+    values = series.reset_index(drop=True)
+    if isinstance(values.dtype, np.dtype) and values.dtype.kind in "biufcmM":
+        key = f"{key_stem}.npy"
+        with storage.temp_path(".npy") as tmp:
+            np.save(tmp, values.to_numpy(), allow_pickle=False)
+            store.put_file(key, tmp)
+        return key
+    key = f"{key_stem}.json"
+    payload = values.astype(object).where(values.notna(), None).tolist()
+    storage.put_json(store, key, {"dtype": str(values.dtype), "values": payload})
+    return key
+
+
+def _read_column(store, key: str) -> pd.Series:
+    # File kolom immutable (nama unik), aman dibaca dari cache lokal
+    if key.endswith(".npy"):
+        return pd.Series(np.load(store.local_path(key), allow_pickle=False))
+    payload = storage.get_json(store, key)
+    return pd.Series(payload["values"], dtype=payload["dtype"])
+
+
+def load_augmented(manifest_path: str) -> pd.DataFrame:
+    """
+    Menyusun dataset augmented: dataset base + kolom-kolom delta dari manifest.
+    Kolom delta disimpan per file, jadi tidak ada duplikasi data base di disk.
+    """
+    from app.services import ingestion
+
+    store = storage.data_store()
+    manifest = read_manifest(manifest_path)
+    df = ingestion.load_dataset(manifest["base"])
+
+    new_cols = {}
+    for col in manifest["columns"]:
+        series = _read_column(store, _column_key(col["file"]))
+        if len(series) != len(df):
+            raise ValueError(
+                f"Kolom '{col['name']}' ({len(series)} baris) tidak sejajar dengan base ({len(df)} baris)"
+            )
+        new_cols[col["name"]] = pd.Series(series.to_numpy(), index=df.index, name=col["name"])
+
+    if new_cols:
+        overwritten = [c for c in new_cols if c in df.columns]
+        if overwritten:
+            df = df.drop(columns=overwritten)
+        df = pd.concat([df, pd.DataFrame(new_cols, index=df.index)], axis=1)
+
+    print(f"   🧩 Augmented: base '{manifest['base']}' + {len(new_cols)} kolom delta.")
+    return df
+
+
+def save_augmented(source_filename: str, df: pd.DataFrame, new_columns: List[str],
+                   plan: List[Union[Dict, object]] = None) -> str:
+    """
+    Simpan hasil feature engineering sebagai base + kolom delta (append-only).
+    Hanya kolom baru yang ditulis ke disk. Jika source sudah berupa manifest,
+    manifest lama diperluas (tidak ada lagi 'augmented_augmented_...').
+
+    Kolom ditulis ke key unik (tidak pernah ditimpa), manifest ditulis atomik
+    di bawah lock sehingga aman dipanggil dari beberapa worker sekaligus.
+
+    Returns:
+        Nama file manifest baru (key di data storage).
+    """
+    store = storage.data_store()
+
+    expressions = {}
+    for item in plan or []:
+        item_dict = item if isinstance(item, dict) else item.model_dump()
+        expressions[item_dict.get("name")] = item_dict.get("expression")
+
+    source = storage.safe_key(source_filename)
+    if is_manifest(source):
+        base = read_manifest(store.local_path(source))["base"]
+    else:
+        # Base dikunci ke isi saat ini: upload ulang nama yang sama tidak mengubah dataset augmented
+        base = content_store.pin(source)
+    base_stem, base_ext = os.path.splitext(base)
+
+    # Tulis kolom delta dulu (di luar lock, key unik per kolom)
+    written = []
+    for name in new_columns:
+        key = _write_column(store, f"{COLUMNS_DIRNAME}/{base_stem}/{uuid.uuid4().hex}", df[name])
+        written.append({"name": name, "file": key, "expression": expressions.get(name)})
+
+    # Ekstensi ikut di nama: data.csv dan data.xlsx tidak berbagi manifest
+    new_filename = f"{MANIFEST_PREFIX}{base_stem}_{base_ext.lstrip('.')}{MANIFEST_EXT}"
+    with store.lock(new_filename):
+        # Baca manifest di dalam lock agar kolom dari worker / request lain tidak hilang:
+        # manifest tujuan yang sudah ada (apply ulang ke base) + manifest sumber
+        columns = []
+        for key in dict.fromkeys([k for k in (new_filename, source) if is_manifest(k)]):
+            if store.exists(key):
+                for entry in read_manifest(store.local_path(key))["columns"]:
+                    columns = [c for c in columns if c["name"] != entry["name"]] + [entry]
+        for entry in written:
+            # Kolom dengan nama sama diganti entry baru
+            columns = [c for c in columns if c["name"] != entry["name"]]
+            columns.append(entry)
+
+        storage.put_json(store, new_filename, {"version": MANIFEST_VERSION, "base": base, "columns": columns})
+    return new_filename
@@ -1,61 +1,233 @@
+import functools
 import pandas as pd
 import numpy as np
+from typing import Any, Dict, List, Tuple, Union
 
-def auto_clean(df: pd.DataFrame) -> pd.DataFrame:
+from app.services import parallel
+from app.services.frame_view import FrameView
+
+# Parameter cleaning (dipakai juga oleh mode out-of-core)
+ROW_NULL_THRESHOLD = 0.5
+MIN_UNIQUE_FOR_OUTLIER = 10
+IQR_MULTIPLIER = 1.5
+
+def auto_clean(df: Union[pd.DataFrame, FrameView]) -> Union[pd.DataFrame, FrameView]:
     """
     Melakukan pembersihan data otomatis:
     1. Drop baris yang terlalu banyak kosong (>50%).
     2. Imputasi (Isi nilai kosong): Median untuk angka, Mode untuk teks.
     3. Hapus Outlier menggunakan metode IQR.
+
+    Median, mode dan quantile dihitung exact; filter IQR berurutan per kolom
+    (quantile kolom berikutnya dihitung dari baris yang tersisa), sama persis dengan
+    hasil cleaning sebelumnya. Plan berbasis sketch (build_clean_plan) hanya dipakai
+    mode out-of-core, di mana data tidak muat di memori.
+
+    Tiap langkah hanya mempersempit FrameView (mask baris + nilai imputasi), tidak
+    ada frame perantara. Input FrameView -> output FrameView (stage berikutnya yang
+    memutuskan kapan materialisasi); input DataFrame -> DataFrame (satu kali materialisasi).
+    """
+    return auto_clean_with_plan(df)[0]
+
+def auto_clean_with_plan(df: Union[pd.DataFrame, FrameView]) -> Tuple[Union[pd.DataFrame, FrameView], Dict[str, Any]]:
     """
-    initial_rows = len(df)
+    auto_clean + plan exact yang dipakainya (threshold, nilai imputasi, batas IQR per
+    kolom yang difilter). clean_chunk(df, plan) menghasilkan baris yang sama dengan
+    auto_clean(df); retrain incremental membersihkan baris baru dengan plan ini.
+    Tidak ada scan statistik tambahan: nilai plan adalah hasil langkah cleaning itu sendiri.
+    """
+    view = df if isinstance(df, FrameView) else FrameView(df)
+    initial_rows = len(view)
     print("🧹 Memulai Auto Cleaning...")
 
     # 1. DROP ROW JIKA KOSONG > 50%
     # Threshold: minimal 50% kolom harus terisi agar baris dipertahankan
-    threshold = int(0.5 * len(df.columns))
-    df = df.dropna(thresh=threshold)
-    print(f"   - Drop baris kosong parah: {initial_rows - len(df)} baris dihapus.")
+    threshold = int(ROW_NULL_THRESHOLD * len(view.columns))
+    view = view.select_rows(row_count_mask(view, threshold))
+    print(f"   - Drop baris kosong parah: {initial_rows - len(view)} baris dihapus.")
 
     # 2. IMPUTASI (MENGISI NILAI KOSONG)
-    for col in df.columns:
-        if df[col].isnull().sum() > 0:
-            # Jika Numerik (Angka) -> Isi dengan Median (Nilai tengah, lebih tahan outlier drpd Mean)
-            if pd.api.types.is_numeric_dtype(df[col]):
-                median_val = df[col].median()
-                df[col] = df[col].fillna(median_val)
-            
-            # Jika Kategorikal/Teks -> Isi dengan Mode (Paling sering muncul) atau "Unknown"
-            else:
-                if len(df[col].mode()) > 0:
-                    mode_val = df[col].mode()[0]
-                    df[col] = df[col].fillna(mode_val)
-                else:
-                    df[col] = df[col].fillna("Unknown")
-    
+    # Numerik -> Median (lebih tahan outlier drpd Mean), Teks -> Mode atau "Unknown"
+    fill_values = exact_fill_values(view)
+    view = view.fill(fill_values)
     print("   - Imputasi nilai kosong selesai.")
 
     # 3. HAPUS OUTLIER (Metode IQR)
-    # Hanya terapkan pada kolom numerik
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    rows_before_outlier = len(df)
+    # Hanya kolom numerik, kolom biner/kategori angka (nunique < 10) dilewati
+    rows_before_outlier = len(view)
+    keep, bounds = sequential_outlier_bounds(view)
+    view = view.select_rows(keep)
+
+    print(f"   - Hapus Outlier: {rows_before_outlier - len(view)} baris dihapus.")
+    print(f"✅ Cleaning Selesai. Data akhir: {len(view)} baris.")
+
+    plan = {"threshold": threshold, "fill_values": fill_values, "bounds": bounds}
+    return (view if isinstance(df, FrameView) else view.materialize()), plan
+
+def _fill_value_partition(df: Union[pd.DataFrame, FrameView], columns: List[str]) -> Dict[str, Any]:
+    fill_values = {}
+    for col in columns:
+        series = df[col]
+        if not series.isna().any():
+            continue
+        if pd.api.types.is_numeric_dtype(series):
+            fill_values[col] = series.median()
+        else:
+            mode_val = series.mode()
+            fill_values[col] = mode_val.iloc[0] if len(mode_val) > 0 else "Unknown"
+    return fill_values
+
+def exact_fill_values(df: Union[pd.DataFrame, FrameView]) -> Dict[str, Any]:
+    """
+    Nilai imputasi exact per kolom yang punya null: median (numerik) atau
+    mode pertama / "Unknown" (lainnya). Frame besar diproses paralel per blok kolom.
+    """
+    return parallel.map_columns(_fill_value_partition, df)
+
+def _quartiles(current: pd.Series) -> Tuple[float, float]:
+    q1, q3 = current.quantile([0.25, 0.75])
+    return q1, q3
+
+def _outlier_profile_partition(df: Union[pd.DataFrame, FrameView], columns: List[str],
+                               with_quartiles: bool) -> Dict[str, Tuple[int, Any]]:
+    # nunique kolom (+ quartile jika diminta) pada baris hasil imputasi, sebelum filter IQR
+    profile = {}
+    for col in columns:
+        series = df[col]
+        nunique = series.nunique()
+        quartiles = _quartiles(series) if with_quartiles and nunique >= MIN_UNIQUE_FOR_OUTLIER else None
+        profile[col] = (nunique, quartiles)
+    return profile
 
-    for col in numeric_cols:
+def sequential_outlier_bounds(df: Union[pd.DataFrame, FrameView]) -> Tuple[np.ndarray, Dict[str, Tuple[float, float]]]:
+    """
+    Filter IQR berurutan per kolom numerik: nunique dan quantile tiap kolom dihitung
+    dari baris yang lolos filter kolom sebelumnya (setara df = df[...] berulang),
+    tapi hanya satu mask boolean yang dipertahankan, bukan frame per langkah.
+
+    nunique semua kolom dihitung sekali di awal (paralel per blok kolom untuk frame
+    besar, bersama quartile-nya). Membuang r baris mengurangi nunique paling banyak r,
+    jadi nunique hanya dihitung ulang jika batas itu bisa jatuh di bawah ambang, dan
+    quartile awal dipakai selama belum ada baris terbuang. Hasil identik dengan jalur serial.
+
+    Returns:
+        Tuple (mask baris yang lolos, batas (lower, upper) per kolom yang difilter).
+    """
+    columns = list(df.select_dtypes(include=[np.number]).columns)
+    fn = functools.partial(_outlier_profile_partition, with_quartiles=parallel.should_parallelize(df))
+    profile = parallel.map_columns(fn, df, columns)
+
+    keep = np.ones(len(df), dtype=bool)
+    bounds = {}
+    for col in columns:
+        nunique, quartiles = profile[col]
         # Lewati kolom yang isinya biner (0/1) atau kategori angka (misal ID)
-        if df[col].nunique() < 10: 
+        if nunique < MIN_UNIQUE_FOR_OUTLIER:
+            continue
+        values = df[col]
+        removed = len(keep) - int(keep.sum())
+        if nunique - removed < MIN_UNIQUE_FOR_OUTLIER and values[keep].nunique() < MIN_UNIQUE_FOR_OUTLIER:
             continue
+        if quartiles is None or removed:
+            quartiles = _quartiles(values[keep])
 
-        Q1 = df[col].quantile(0.25)
-        Q3 = df[col].quantile(0.75)
-        IQR = Q3 - Q1
-        
-        lower_bound = Q1 - 1.5 * IQR
-        upper_bound = Q3 + 1.5 * IQR
-        
-        # Filter data
-        df = df[(df[col] >= lower_bound) & (df[col] <= upper_bound)]
-
-    print(f"   - Hapus Outlier: {rows_before_outlier - len(df)} baris dihapus.")
-    print(f"✅ Cleaning Selesai. Data akhir: {df.shape[0]} baris.")
-    
-    return df
\ No newline at end of file
+        q1, q3 = quartiles
+        iqr = q3 - q1
+        bounds[col] = (q1 - IQR_MULTIPLIER * iqr, q3 + IQR_MULTIPLIER * iqr)
+        in_range = (values >= bounds[col][0]) & (values <= bounds[col][1])
+        keep &= in_range.to_numpy(dtype=bool, na_value=False)
+    return keep, bounds
+
+def row_count_mask(df: Union[pd.DataFrame, FrameView], threshold: int) -> np.ndarray:
+    """
+    Mask baris dengan minimal `threshold` nilai non-null (setara dropna(thresh=...)),
+    dihitung per kolom tanpa membuat frame boolean penuh.
+    """
+    counts = np.zeros(len(df), dtype=np.int32)
+    for col in df.columns:
+        counts += df[col].notna().to_numpy()
+    return counts >= threshold
+
+def build_clean_plan(stats) -> Dict[str, Any]:
+    """
+    Menyusun parameter cleaning dari statistik engine (DatasetStats):
+    nilai imputasi per kolom dan batas IQR per kolom numerik (dihitung sekali).
+    Dipakai mode out-of-core (per chunk); in-memory memakai auto_clean yang exact.
+    """
+    fill_values = {}
+    bounds = {}
+    for col, col_stats in stats.columns.items():
+        if col_stats.nulls > 0:
+            if col_stats.is_numeric:
+                fill_values[col] = col_stats.quantiles.quantile(0.5)
+            else:
+                mode_val = col_stats.top.mode()
+                fill_values[col] = mode_val if mode_val is not None else "Unknown"
+
+        if col_stats.is_numeric and not col_stats.is_bool:
+            # nunique None = lebih banyak dari kapasitas sketch (pasti >= 10)
+            nunique = col_stats.top.nunique()
+            if nunique is not None and nunique < MIN_UNIQUE_FOR_OUTLIER:
+                continue
+            q1 = col_stats.quantiles.quantile(0.25)
+            q3 = col_stats.quantiles.quantile(0.75)
+            iqr = q3 - q1
+            bounds[col] = (q1 - IQR_MULTIPLIER * iqr, q3 + IQR_MULTIPLIER * iqr)
+
+    return {
+        "threshold": int(ROW_NULL_THRESHOLD * len(stats.columns)),
+        "fill_values": fill_values,
+        "bounds": bounds,
+    }
+
+def _fill_partition(df: pd.DataFrame, columns: List[str], fill_values: Dict[str, Any]) -> Dict[str, pd.Series]:
+    return {col: df[col].fillna(fill_values[col]) for col in columns}
+
+def apply_imputation(df: pd.DataFrame, plan: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Isi nilai kosong sesuai plan. Frame besar diproses paralel per blok kolom.
+    """
+    fill_values = {c: v for c, v in plan["fill_values"].items() if c in df.columns}
+    if not fill_values:
+        return df
+    if not parallel.should_parallelize(df):
+        return df.fillna(fill_values)
+
+    parts = parallel.partition_columns(list(fill_values), parallel.worker_count())
+    fn = functools.partial(_fill_partition, fill_values=fill_values)
+    filled = {}
+    for result in parallel.map_frame_partitions(fn, df, parts):
+        filled.update(result)
+    return df.assign(**filled)
+
+def _mask_partition(df: pd.DataFrame, rows: Tuple[int, int], bounds: Dict[str, Tuple[float, float]]) -> np.ndarray:
+    start, stop = rows
+    mask = np.ones(stop - start, dtype=bool)
+    for col, (lower, upper) in bounds.items():
+        if col in df.columns and pd.api.types.is_numeric_dtype(df.dtypes[col]):
+            values = df[col].to_numpy()[start:stop]
+            mask &= (values >= lower) & (values <= upper)
+    return mask
+
+def outlier_mask(df: pd.DataFrame, plan: Dict[str, Any]) -> np.ndarray:
+    """
+    Mask baris yang berada di dalam batas IQR untuk semua kolom numerik.
+    Frame besar diproses paralel per blok baris.
+    """
+    bounds = {c: b for c, b in plan["bounds"].items() if c in df.columns}
+    # FrameView: kolom dimaterialisasi utuh per akses, partisi baris tidak menghemat apa pun
+    if isinstance(df, FrameView) or not parallel.should_parallelize(df) or not bounds:
+        return _mask_partition(df, (0, len(df)), bounds)
+
+    parts = parallel.partition_rows(len(df), parallel.worker_count())
+    fn = functools.partial(_mask_partition, bounds=bounds)
+    masks = parallel.map_frame_partitions(fn, df, parts, by="rows", columns=list(bounds))
+    return np.concatenate(masks) if masks else np.ones(0, dtype=bool)
+
+def clean_chunk(chunk: pd.DataFrame, plan: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Menerapkan plan cleaning ke satu chunk (drop baris kosong, imputasi, filter outlier).
+    """
+    chunk = chunk.dropna(thresh=plan["threshold"])
+    chunk = apply_imputation(chunk, plan)
+    return chunk[outlier_mask(chunk, plan)]
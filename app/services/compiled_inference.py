@@ -0,0 +1,464 @@
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# COMPILED INFERENCE (NumPy murni)
+# ==========================================
+# Pipeline hasil engine 'fast' (datetime -> imputasi/scaling/one-hot/ordinal ->
+# linear / decision tree / LightGBM, atau AveragingEnsemble-nya) diterjemahkan
+# menjadi array konstanta + operasi NumPy di atas buffer fitur yang dialokasikan
+# sekali. Tanpa DataFrame, tanpa transform sklearn per step, tanpa validasi input.
+# Pipeline yang tidak dikenali (mis. pipeline PyCaret) -> ValueError, pemanggil
+# memakai jalur predict biasa.
+
+# Batas |x| dianggap nol oleh LightGBM (missing_type 'Zero')
+_LGB_ZERO_THRESHOLD = 1e-35
+_MISSING_TYPES = {"None": 0, "Zero": 1, "NaN": 2}
+_DATETIME_PARTS = ("year", "month", "day", "weekday")
+
+
+# ==========================================
+# COMPILE: PREPROCESSING
+# ==========================================
+def _compile_numeric(step, columns: List[str], positions: Dict[str, int]) -> Dict[str, Any]:
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import FunctionTransformer, StandardScaler
+
+    spec = {"idx": np.array([positions[c] for c in columns], dtype=np.int64), "fill": None, "mean": None, "scale": None}
+    steps = [] if step == "passthrough" else (list(step.named_steps.values()) if isinstance(step, Pipeline) else [step])
+    for s in steps:
+        # 'passthrough' tersimpan sebagai FunctionTransformer identitas setelah fit
+        if isinstance(s, FunctionTransformer) and s.func is None:
+            continue
+        if isinstance(s, SimpleImputer) and s.strategy in ("mean", "median", "constant"):
+            stats = np.asarray(s.statistics_, dtype=np.float64)
+            if np.isnan(stats).any():
+                raise ValueError("Kolom numerik kosong saat training (di-drop imputer)")
+            spec["fill"] = stats
+        elif isinstance(s, StandardScaler):
+            spec["mean"] = np.asarray(s.mean_, dtype=np.float64) if s.with_mean else np.zeros(len(columns))
+            spec["scale"] = np.asarray(s.scale_, dtype=np.float64) if s.with_std else np.ones(len(columns))
+        else:
+            raise ValueError(f"Step numerik tidak didukung: {type(s).__name__}")
+    spec["width"] = len(columns)
+    return spec
+
+
+def _compile_categorical(step, columns: List[str], positions: Dict[str, int]) -> Dict[str, Any]:
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder
+
+    steps = list(step.named_steps.values()) if isinstance(step, Pipeline) else [step]
+    if len(steps) != 2 or not isinstance(steps[0], SimpleImputer):
+        raise ValueError("Pipeline kategorikal harus SimpleImputer -> encoder")
+    imputer, encoder = steps
+    spec = {
+        "idx": np.array([positions[c] for c in columns], dtype=np.int64),
+        "fill": list(imputer.statistics_),
+    }
+
+    if isinstance(encoder, OrdinalEncoder):
+        unknown = encoder.unknown_value if encoder.handle_unknown == "use_encoded_value" else np.nan
+        spec.update(kind="ordinal", width=len(columns), unknown=[float(unknown)] * len(columns),
+                    lookup=[{v: float(i) for i, v in enumerate(cats)} for cats in encoder.categories_])
+        return spec
+
+    if not isinstance(encoder, OneHotEncoder) or encoder.drop is not None:
+        raise ValueError(f"Encoder tidak didukung: {type(encoder).__name__}")
+
+    # Posisi kolom output per kategori dibaca langsung dari encoder (urutan frequent/infrequent)
+    infrequent = getattr(encoder, "infrequent_categories_", [None] * len(columns))
+    lookup, unknown, offset = [], [], 0
+    for i, cats in enumerate(encoder.categories_):
+        rows = np.array([[encoder.categories_[j][0] for j in range(len(columns))] for _ in cats], dtype=object)
+        rows[:, i] = cats
+        out = encoder.transform(rows)
+        out = out.toarray() if hasattr(out, "toarray") else np.asarray(out)
+        width = len(cats) - (len(infrequent[i]) - 1 if infrequent[i] is not None else 0)
+        block = out[:, offset:offset + width]
+        lookup.append({v: int(offset + np.argmax(block[k])) for k, v in enumerate(cats)})
+        if infrequent[i] is not None and encoder.handle_unknown == "infrequent_if_exist":
+            unknown.append(int(offset + width - 1))
+        else:
+            unknown.append(-1)
+        offset += width
+    spec.update(kind="onehot", width=offset, lookup=lookup, unknown=unknown)
+    return spec
+
+
+# ==========================================
+# COMPILE: ESTIMATOR
+# ==========================================
+def _compile_linear(est) -> Dict[str, Any]:
+    coef = np.atleast_2d(np.asarray(est.coef_, dtype=np.float64))
+    intercept = np.atleast_1d(np.asarray(est.intercept_, dtype=np.float64))
+    if hasattr(est, "predict_proba"):
+        link = "logistic" if coef.shape[0] == 1 else "softmax"
+    else:
+        link = "identity"
+    return {"kind": "linear", "coef": coef.T.copy(), "intercept": intercept, "link": link}
+
+
+def _compile_sklearn_tree(est) -> Dict[str, Any]:
+    tree = est.tree_
+    value = np.asarray(tree.value[:, 0, :], dtype=np.float64)
+    if hasattr(est, "predict_proba"):
+        value = value / value.sum(axis=1, keepdims=True)
+    return {
+        "kind": "tree",
+        "left": np.asarray(tree.children_left, dtype=np.int64),
+        "right": np.asarray(tree.children_right, dtype=np.int64),
+        "feature": np.maximum(np.asarray(tree.feature, dtype=np.int64), 0),
+        "threshold": np.asarray(tree.threshold, dtype=np.float64),
+        "value": value,
+        "depth": int(tree.max_depth),
+    }
+
+
+def _compile_lightgbm(est) -> Dict[str, Any]:
+    """
+    Semua tree LightGBM digabung ke satu set array node (leaf = node dengan left == -1),
+    traversal dilakukan serentak untuk semua (baris x tree).
+    """
+    dump = est.booster_.dump_model()
+    objective = dump["objective"].split()
+    if objective[0] == "binary":
+        sigmoid = float(next((o.split(":")[1] for o in objective if o.startswith("sigmoid:")), 1.0))
+        link = ("logistic", sigmoid)
+    elif objective[0] == "multiclass":
+        link = ("softmax", 1.0)
+    elif objective[0] in ("regression", "regression_l1", "huber", "fair", "quantile", "mape"):
+        link = ("identity", 1.0)
+    else:
+        raise ValueError(f"Objective LightGBM tidak didukung: {objective[0]}")
+
+    feature, threshold, left, right, default_left, missing, value, roots = [], [], [], [], [], [], [], []
+    depth = 0
+
+    def add(node: Dict[str, Any], level: int) -> int:
+        nonlocal depth
+        idx = len(feature)
+        feature.append(0); threshold.append(0.0); left.append(-1); right.append(-1)
+        default_left.append(False); missing.append(0); value.append(0.0)
+        if "leaf_value" in node:
+            value[idx] = node["leaf_value"]
+            depth = max(depth, level)
+            return idx
+        if node["decision_type"] != "<=":
+            raise ValueError("Split kategorikal LightGBM tidak didukung")
+        feature[idx] = node["split_feature"]
+        threshold[idx] = node["threshold"]
+        default_left[idx] = node["default_left"]
+        missing[idx] = _MISSING_TYPES[node["missing_type"]]
+        left[idx] = add(node["left_child"], level + 1)
+        right[idx] = add(node["right_child"], level + 1)
+        return idx
+
+    for tree in dump["tree_info"]:
+        roots.append(add(tree["tree_structure"], 0))
+
+    return {
+        "kind": "lightgbm",
+        "feature": np.array(feature, dtype=np.int64),
+        "threshold": np.array(threshold, dtype=np.float64),
+        "left": np.array(left, dtype=np.int64),
+        "right": np.array(right, dtype=np.int64),
+        "default_left": np.array(default_left, dtype=bool),
+        "missing": np.array(missing, dtype=np.int8),
+        "value": np.array(value, dtype=np.float64),
+        "roots": np.array(roots, dtype=np.int64),
+        "n_classes": int(dump["num_tree_per_iteration"]),
+        "link": link[0],
+        "sigmoid": link[1],
+        "depth": depth,
+    }
+
+
+def _compile_estimator(est) -> Dict[str, Any]:
+    name = type(est).__name__
+    if name in ("LinearRegression", "LogisticRegression", "Ridge", "Lasso", "ElasticNet"):
+        return _compile_linear(est)
+    if name in ("DecisionTreeClassifier", "DecisionTreeRegressor"):
+        return _compile_sklearn_tree(est)
+    if name in ("LGBMClassifier", "LGBMRegressor"):
+        return _compile_lightgbm(est)
+    raise ValueError(f"Estimator tidak didukung: {name}")
+
+
+# ==========================================
+# EVALUASI ESTIMATOR
+# ==========================================
+def _softmax(z: np.ndarray) -> np.ndarray:
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+def _run_linear(spec, X: np.ndarray) -> np.ndarray:
+    z = X @ spec["coef"] + spec["intercept"]
+    if spec["link"] == "logistic":
+        p = 1.0 / (1.0 + np.exp(-z[:, 0]))
+        return np.column_stack([1.0 - p, p])
+    if spec["link"] == "softmax":
+        return _softmax(z)
+    return z[:, 0]
+
+
+def _run_tree(spec, X: np.ndarray) -> np.ndarray:
+    # sklearn membandingkan fitur dalam float32
+    X32 = X.astype(np.float32)
+    rows = np.arange(len(X))
+    node = np.zeros(len(X), dtype=np.int64)
+    left, right, feature, threshold = spec["left"], spec["right"], spec["feature"], spec["threshold"]
+    for _ in range(spec["depth"]):
+        go_left = X32[rows, feature[node]] <= threshold[node]
+        node = np.where(left[node] == -1, node, np.where(go_left, left[node], right[node]))
+    value = spec["value"][node]
+    return value if value.shape[1] > 1 else value[:, 0]
+
+
+def _run_lightgbm(spec, X: np.ndarray) -> np.ndarray:
+    n = len(X)
+    rows = np.arange(n)[:, None]
+    node = np.broadcast_to(spec["roots"], (n, len(spec["roots"]))).copy()
+    left, right, feature, threshold = spec["left"], spec["right"], spec["feature"], spec["threshold"]
+    missing, default_left = spec["missing"], spec["default_left"]
+    for _ in range(spec["depth"]):
+        x = X[rows, feature[node]]
+        is_nan = np.isnan(x)
+        mt = missing[node]
+        x = np.where(is_nan & (mt == 0), 0.0, x)
+        is_missing = ((mt == 2) & is_nan) | ((mt == 1) & (is_nan | (np.abs(x) <= _LGB_ZERO_THRESHOLD)))
+        go_left = np.where(is_missing, default_left[node], x <= threshold[node])
+        node = np.where(left[node] == -1, node, np.where(go_left, left[node], right[node]))
+
+    k = spec["n_classes"]
+    raw = spec["value"][node].reshape(n, -1, k).sum(axis=1)
+    if spec["link"] == "logistic":
+        p = 1.0 / (1.0 + np.exp(-spec["sigmoid"] * raw[:, 0]))
+        return np.column_stack([1.0 - p, p])
+    if spec["link"] == "softmax":
+        return _softmax(raw)
+    return raw[:, 0]
+
+
+_RUNNERS = {"linear": _run_linear, "tree": _run_tree, "lightgbm": _run_lightgbm}
+
+
+# ==========================================
+# MODEL TERKOMPILASI
+# ==========================================
+def _member_spec(pipeline, expanded_numeric: List[str], categorical: List[str]) -> Dict[str, Any]:
+    from sklearn.compose import ColumnTransformer
+
+    steps = pipeline.named_steps
+    ct = steps.get("preprocess")
+    if list(steps) != ["datetime", "preprocess", "model"] or not isinstance(ct, ColumnTransformer):
+        raise ValueError("Bukan pipeline engine 'fast'")
+
+    num_pos = {c: i for i, c in enumerate(expanded_numeric)}
+    cat_pos = {c: i for i, c in enumerate(categorical)}
+    blocks, offset = [], 0
+    for name, trans, cols in ct.transformers_:
+        if trans == "drop" or len(cols) == 0:
+            continue
+        if name == "num":
+            block = _compile_numeric(trans, list(cols), num_pos)
+        elif name == "cat":
+            block = _compile_categorical(trans, list(cols), cat_pos)
+        else:
+            raise ValueError(f"Transformer tidak dikenal: {name}")
+        block.update(name=name, offset=offset)
+        offset += block["width"]
+        blocks.append(block)
+    return {"blocks": blocks, "n_features": offset, "estimator": _compile_estimator(steps["model"])}
+
+
+class CompiledModel:
+    """
+    Model hasil kompilasi. predict_records / predict_frame menerima input mentah
+    (kolom sama dengan saat training) dan mengembalikan (prediksi, probabilitas atau None).
+    Tidak thread-safe (buffer fitur dipakai ulang): panggil lewat scoring.Scorer.
+    """
+
+    def __init__(self, task: str, raw_columns: List[str], numeric: List[str], datetimes: List[str],
+                 categorical: List[str], members: List[Dict[str, Any]], classes: Optional[np.ndarray],
+                 max_batch: int = 256):
+        self.task = task
+        self.raw_columns = raw_columns
+        self.numeric = numeric
+        self.datetimes = datetimes
+        self.categorical = categorical
+        self.members = members
+        self.classes = classes
+        self.max_batch = max_batch
+        self._buffers = None
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_buffers"] = None
+        return state
+
+    def _buffer(self, member_no: int, n: int) -> np.ndarray:
+        if self._buffers is None:
+            self._buffers = [np.empty((self.max_batch, m["n_features"])) for m in self.members]
+        if n > self.max_batch:
+            return np.empty((n, self.members[member_no]["n_features"]))
+        return self._buffers[member_no][:n]
+
+    # ---------- input mentah -> array ----------
+    def _expanded_numeric(self, numeric: np.ndarray, dates: Dict[str, Any]) -> np.ndarray:
+        if not self.datetimes:
+            return numeric
+        return np.column_stack([numeric] + [_date_parts(dates[c]) for c in self.datetimes])
+
+    def _from_records(self, records: Sequence[Dict[str, Any]]):
+        numeric = np.array([[_to_float(r.get(c)) for c in self.numeric] for r in records], dtype=np.float64)
+        numeric = numeric.reshape(len(records), len(self.numeric))
+        categorical = [[r.get(c) for c in self.categorical] for r in records]
+        dates = {c: [r.get(c) for r in records] for c in self.datetimes}
+        return self._expanded_numeric(numeric, dates), categorical
+
+    def _from_frame(self, df: pd.DataFrame):
+        numeric = df[self.numeric].to_numpy(dtype=np.float64, na_value=np.nan) if self.numeric else np.empty((len(df), 0))
+        categorical = df[self.categorical].to_numpy(dtype=object).tolist() if self.categorical else [[] for _ in range(len(df))]
+        dates = {c: df[c].to_numpy() for c in self.datetimes}
+        return self._expanded_numeric(numeric, dates), categorical
+
+    # ---------- preprocessing + estimator ----------
+    def _features(self, member_no: int, numeric: np.ndarray, categorical: List[List[Any]]) -> np.ndarray:
+        member = self.members[member_no]
+        n = len(numeric)
+        X = self._buffer(member_no, n)
+        for block in member["blocks"]:
+            lo, hi = block["offset"], block["offset"] + block["width"]
+            if block["name"] == "num":
+                values = numeric[:, block["idx"]]
+                if block["fill"] is not None:
+                    values = np.where(np.isnan(values), block["fill"], values)
+                if block["mean"] is not None:
+                    values = (values - block["mean"]) / block["scale"]
+                X[:, lo:hi] = values
+                continue
+
+            if block["kind"] == "onehot":
+                X[:, lo:hi] = 0.0
+            for j, col_idx in enumerate(block["idx"]):
+                lookup, unknown, fill = block["lookup"][j], block["unknown"][j], block["fill"][j]
+                for i in range(n):
+                    v = categorical[i][col_idx]
+                    if _is_missing(v):
+                        v = fill
+                    pos = lookup.get(v, unknown)
+                    if block["kind"] == "onehot":
+                        if pos >= 0:
+                            X[i, lo + pos] = 1.0
+                    else:
+                        X[i, lo + j] = pos
+        return X
+
+    def _predict_raw(self, numeric: np.ndarray, categorical: List[List[Any]]) -> np.ndarray:
+        outputs = []
+        for member_no, member in enumerate(self.members):
+            X = self._features(member_no, numeric, categorical)
+            outputs.append(_RUNNERS[member["estimator"]["kind"]](member["estimator"], X))
+        return outputs[0] if len(outputs) == 1 else np.mean(outputs, axis=0)
+
+    def _finish(self, out: np.ndarray):
+        if self.task == "classification":
+            return self.classes[np.argmax(out, axis=1)], out
+        return out, None
+
+    def predict_records(self, records: Sequence[Dict[str, Any]]):
+        return self._finish(self._predict_raw(*self._from_records(records)))
+
+    def predict_frame(self, df: pd.DataFrame):
+        return self._finish(self._predict_raw(*self._from_frame(df)))
+
+
+def _date_parts(values: Any) -> np.ndarray:
+    """
+    Tanggal -> (tahun, bulan, hari, hari dalam minggu) seperti fast_modeling._expand_datetimes,
+    dihitung dengan aritmetika datetime64 (tanpa DatetimeIndex). Tanggal invalid -> NaN.
+    """
+    try:
+        dt = np.asarray(values, dtype="datetime64[ns]")
+    except (TypeError, ValueError):
+        dt = pd.to_datetime(pd.Series(values, dtype=object), errors="coerce").to_numpy()
+    nat = np.isnat(dt)
+    days = dt.astype("datetime64[D]")
+    months = dt.astype("datetime64[M]")
+    years = dt.astype("datetime64[Y]")
+    parts = np.column_stack([
+        years.astype(np.int64) + 1970,
+        (months - years).astype(np.int64) + 1,
+        (days - months).astype(np.int64) + 1,
+        # 1970-01-01 = Kamis (weekday 3, Senin = 0)
+        (days.astype(np.int64) + 3) % 7,
+    ]).astype(np.float64)
+    parts[nat] = np.nan
+    return parts
+
+
+def _to_float(v: Any) -> float:
+    if v is None:
+        return math.nan
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _is_missing(v: Any) -> bool:
+    # SimpleImputer default (missing_values=np.nan) juga mengisi None / pd.NA
+    return v is None or v is pd.NA or (isinstance(v, float) and math.isnan(v))
+
+
+def compile_model(model: Any, task: str, max_batch: int = 256) -> CompiledModel:
+    """
+    Kompilasi pipeline engine 'fast' (atau AveragingEnsemble-nya).
+
+    Raises:
+        ValueError jika ada step / estimator yang tidak didukung.
+    """
+    from app.services.fast_modeling import AveragingEnsemble
+
+    pipelines = list(model.models) if isinstance(model, AveragingEnsemble) else [model]
+    first = pipelines[0]
+    if not hasattr(first, "named_steps") or "datetime" not in first.named_steps:
+        raise ValueError("Bukan pipeline engine 'fast'")
+
+    raw_columns = list(first.named_steps["datetime"].feature_names_in_)
+    expanded = list(first.named_steps["preprocess"].feature_names_in_)
+    datetimes = [c for c in raw_columns if c not in expanded and f"{c}_year" in expanded]
+    ct = first.named_steps["preprocess"]
+    cat_cols = [c for name, _, cols in ct.transformers_ if name == "cat" for c in cols]
+    numeric = [c for c in raw_columns if c not in datetimes and c not in cat_cols]
+    expanded_numeric = numeric + [f"{c}_{p}" for c in datetimes for p in _DATETIME_PARTS]
+
+    members = [_member_spec(p, expanded_numeric, cat_cols) for p in pipelines]
+
+    classes = np.asarray(model.classes_) if task == "classification" else None
+    return CompiledModel(task, raw_columns, numeric, datetimes, cat_cols, members, classes, max_batch)
+
+
+def verify(compiled: CompiledModel, model: Any, X_sample: pd.DataFrame, task: str) -> bool:
+    """
+    Prediksi hasil kompilasi harus identik (label) / sangat dekat (angka) dengan model asli.
+    """
+    if len(X_sample) == 0:
+        return False
+    pred, proba = compiled.predict_frame(X_sample)
+    expected = np.asarray(model.predict(X_sample))
+    if task == "classification":
+        if not np.array_equal(pred.astype(str), expected.astype(str)):
+            return False
+        if hasattr(model, "predict_proba"):
+            return np.allclose(proba, model.predict_proba(X_sample), rtol=1e-6, atol=1e-9)
+        return True
+    return np.allclose(pred, expected.astype(np.float64), rtol=1e-6, atol=1e-8)
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+from typing import Any, BinaryIO, Dict, Optional
+
+from app.services import storage
+
+# ==========================================
+# CONTENT-ADDRESSED DATASET
+# ==========================================
+# Isi file upload disimpan sekali di 'blobs/{sha256}{ext}' (hash dihitung sambil
+# streaming ke disk). Nama file dari user hanya referensi '{filename}.ref.json'
+# -> blob, sehingga upload dengan isi identik (nama apa pun) tidak disimpan ulang,
+# dan cache turunan (profile, cache Excel, hasil training, respons LLM) dikunci
+# pada hash isi, bukan nama file. File lama (tanpa ref) tetap dibaca langsung.
+
+BLOB_DIRNAME = "blobs"
+REF_SUFFIX = ".ref.json"
+RESULT_DIRNAME = "results"
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def _blob_key(digest: str, filename: str) -> str:
+    # Ekstensi asli dipertahankan: loader memilih parser berdasarkan ekstensi
+    return f"{BLOB_DIRNAME}/{digest}{os.path.splitext(filename)[1].lower()}"
+
+
+def put_upload(filename: str, stream: BinaryIO, sheet: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Simpan upload secara content-addressed dan arahkan `filename` ke blob-nya.
+    sheet: sheet Excel yang dipakai sebagai dataset (None = sheet pertama).
+
+    Returns:
+        Dictionary ref {sha256, blob, size, sheet, deduplicated}.
+    """
+    store = storage.data_store()
+    digest = hashlib.sha256()
+    size = 0
+    with storage.temp_path(os.path.splitext(filename)[1]) as tmp:
+        with open(tmp, "wb") as f:
+            while True:
+                chunk = stream.read(HASH_CHUNK_BYTES)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+        blob = _blob_key(digest.hexdigest(), filename)
+        # Blob immutable: isi sama -> key sama, cukup ditulis sekali
+        deduplicated = store.exists(blob)
+        if not deduplicated:
+            store.put_file(blob, tmp)
+
+    ref = {"sha256": digest.hexdigest(), "blob": blob, "size": size, "sheet": sheet}
+    storage.put_json(store, filename + REF_SUFFIX, ref)
+    return {**ref, "deduplicated": deduplicated}
+
+
+def read_ref(filename: str) -> Optional[Dict[str, Any]]:
+    store = storage.data_store()
+    if not store.exists(filename + REF_SUFFIX):
+        return None
+    return storage.get_json(store, filename + REF_SUFFIX)
+
+
+def resolve(filename: str) -> Dict[str, Any]:
+    """
+    Nama dataset -> lokasi isi di data storage.
+
+    Returns:
+        Dictionary {key, sha256, sheet, cache_id}. key = blob (atau nama file untuk
+        file lama / manifest augmented); cache_id = prefix key cache turunan
+        (blob + sheet Excel, karena isi sheet berbeda menghasilkan data berbeda).
+    """
+    ref = read_ref(filename)
+    if ref is None:
+        return {"key": filename, "sha256": None, "sheet": None, "cache_id": filename}
+    cache_id = ref["blob"] if not ref.get("sheet") else f"{ref['blob']}#{ref['sheet']}"
+    return {"key": ref["blob"], "sha256": ref["sha256"], "sheet": ref.get("sheet"), "cache_id": cache_id}
+
+
+def pin(filename: str) -> str:
+    """
+    Nama immutable untuk isi `filename` saat ini: ref kedua '{stem}.{hash}{ext}' yang
+    menunjuk blob + sheet yang sama. Dipakai turunan yang harus tetap merujuk isi ini
+    walaupun `filename` di-upload ulang (mis. base dataset augmented).
+    File lama tanpa ref dikembalikan apa adanya.
+    """
+    ref = read_ref(filename)
+    if ref is None:
+        return filename
+    stem, ext = os.path.splitext(filename)
+    digest = hashlib.sha256(resolve(filename)["cache_id"].encode("utf-8")).hexdigest()[:12]
+    if stem.endswith(f".{digest}"):
+        return filename
+    pinned = f"{stem}.{digest}{ext}"
+    store = storage.data_store()
+    if not store.exists(pinned + REF_SUFFIX):
+        storage.put_json(store, pinned + REF_SUFFIX, ref)
+    return pinned
+
+
+# ==========================================
+# CACHE HASIL (TRAINING / LLM)
+# ==========================================
+def result_key(filename: str, namespace: str, params: Dict[str, Any]) -> Optional[str]:
+    """
+    Key cache hasil untuk (isi dataset, parameter request). None jika dataset tidak
+    content-addressed (file lama, manifest augmented): hasilnya tidak di-cache.
+    """
+    resolved = resolve(filename)
+    if resolved["sha256"] is None:
+        return None
+    payload = json.dumps({"dataset": resolved["cache_id"], **params}, sort_keys=True, default=str)
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return f"{RESULT_DIRNAME}/{namespace}/{digest}.json"
+
+
+def get_result(key: Optional[str]) -> Optional[Dict[str, Any]]:
+    store = storage.data_store()
+    if key is None or not store.exists(key):
+        return None
+    return storage.get_json(store, key)
+
+
+def put_result(key: Optional[str], payload: Dict[str, Any]) -> None:
+    if key is not None:
+        storage.put_json(storage.data_store(), key, payload)
@@ -1,14 +1,13 @@
 import logging
 from typing import List, Any, Dict
-from pycaret.classification import blend_models as clf_blend
-from pycaret.regression import blend_models as reg_blend
-from pycaret.classification import pull as clf_pull
-from pycaret.regression import pull as reg_pull
+
+# PyCaret di-import saat ensembling pertama (lazy)
+from app.services import lazy_imports
 
 # Setup Logging
 logger = logging.getLogger(__name__)
 
-def ensemble_models(models_list: List[Any], task_type: str) -> Dict[str, Any]:
+def ensemble_models(models_list: List[Any], task_type: str, engine: str = "pycaret") -> Dict[str, Any]:
     """
     Step 6: Model Ensembling.
     Menggabungkan Top 3 Model dari Step 5 menggunakan teknik Voting/Blending.
@@ -16,6 +15,7 @@ def ensemble_models(models_list: List[Any], task_type: str) -> Dict[str, Any]:
     Args:
         models_list: List object model yang sudah dilatih di Step 5.
         task_type: "classification" atau "regression".
+        engine: "pycaret" (blend_models) atau "fast" (rata-rata model sklearn yang sudah di-fit).
         
     Returns:
         Dictionary berisi model hasil ensemble dan metrik performanya.
@@ -35,21 +35,28 @@ def ensemble_models(models_list: List[Any], task_type: str) -> Dict[str, Any]:
         final_model = None
         metrics = {}
 
-        if task_type == "classification":
+        if engine == "fast":
+            from app.services.fast_modeling import AveragingEnsemble
+            # Model sudah di-fit, blending tanpa training ulang (metrics dihitung di Step 7)
+            final_model = AveragingEnsemble(models_list, task_type)
+
+        elif task_type == "classification":
+            clf = lazy_imports.load("pycaret.classification")
             # Soft Voting: Mengambil rata-rata probabilitas prediksi
-            final_model = clf_blend(estimator_list=models_list, verbose=False)
+            final_model = clf.blend_models(estimator_list=models_list, verbose=False)
             
             # Ambil report akurasi blending
-            metrics_df = clf_pull()
+            metrics_df = clf.pull()
             # Biasanya baris 'Mean' atau baris pertama
             acc = metrics_df.iloc[0]['Accuracy']
             metrics = {"accuracy": acc, "auc": metrics_df.iloc[0]['AUC']}
             
         elif task_type == "regression":
+            reg = lazy_imports.load("pycaret.regression")
             # Blending: Rata-rata nilai prediksi
-            final_model = reg_blend(estimator_list=models_list, verbose=False)
+            final_model = reg.blend_models(estimator_list=models_list, verbose=False)
             
-            metrics_df = reg_pull()
+            metrics_df = reg.pull()
             r2 = metrics_df.iloc[0]['R2']
             metrics = {"r2": r2, "rmse": metrics_df.iloc[0]['RMSE']}
 
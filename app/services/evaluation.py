@@ -2,14 +2,9 @@ import logging
 import pandas as pd
 import numpy as np
 from typing import Any, Dict
-from sklearn.metrics import (
-    accuracy_score, precision_score, recall_score, f1_score, confusion_matrix,
-    r2_score, mean_squared_error, mean_absolute_error
-)
 
-# Import PyCaret
-from pycaret.classification import predict_model as clf_predict, get_config as clf_get_config
-from pycaret.regression import predict_model as reg_predict, get_config as reg_get_config
+# sklearn.metrics & PyCaret di-import saat evaluasi pertama (lazy)
+from app.services import lazy_imports
 
 logger = logging.getLogger(__name__)
 
@@ -17,22 +12,33 @@ def evaluate_model(model: Any, task_type: str, X_test=None, y_test=None) -> Dict
     """
     Step 7: Evaluation & Final Report.
     Menguji model final dan menghitung metrics secara manual menggunakan Scikit-Learn.
+    Jika X_test / y_test diberikan (engine 'fast'), prediksi memakai model.predict
+    langsung, bukan hold-out PyCaret.
     """
     logger.info("📊 Memulai Evaluasi Final (Manual Calculation)...")
     
     evaluation_report = {}
     
     try:
+        metrics_mod = lazy_imports.load("sklearn.metrics")
+
         # ==========================================
         # 1. PREDIKSI PADA TEST SET (Hold-out)
         # ==========================================
-        if task_type == "classification":
-            # Predict pada data hold-out PyCaret (data=None)
-            predictions = clf_predict(model, data=None, verbose=False)
-            
-            # Ambil Nama Kolom Target (Asli) & Prediksi
-            y_true_col = clf_get_config('target_param')
+        if X_test is not None:
+            y_true_col = y_test.name
             y_pred_col = 'prediction_label'
+            predictions = pd.DataFrame({y_true_col: y_test.to_numpy(), y_pred_col: model.predict(X_test)})
+
+        if task_type == "classification":
+            if X_test is None:
+                clf = lazy_imports.load("pycaret.classification")
+                # Predict pada data hold-out PyCaret (data=None)
+                predictions = clf.predict_model(model, data=None, verbose=False)
+                
+                # Ambil Nama Kolom Target (Asli) & Prediksi
+                y_true_col = clf.get_config('target_param')
+                y_pred_col = 'prediction_label'
             
             # Pastikan kolom ada
             if y_true_col not in predictions.columns or y_pred_col not in predictions.columns:
@@ -43,10 +49,10 @@ def evaluate_model(model: Any, task_type: str, X_test=None, y_test=None) -> Dict
             
             # Hitung Metrics Manual (Lebih Aman & Akurat)
             # average='weighted' menangani binary maupun multiclass dengan baik
-            acc = accuracy_score(y_true, y_pred)
-            prec = precision_score(y_true, y_pred, average='weighted', zero_division=0)
-            rec = recall_score(y_true, y_pred, average='weighted', zero_division=0)
-            f1 = f1_score(y_true, y_pred, average='weighted', zero_division=0)
+            acc = metrics_mod.accuracy_score(y_true, y_pred)
+            prec = metrics_mod.precision_score(y_true, y_pred, average='weighted', zero_division=0)
+            rec = metrics_mod.recall_score(y_true, y_pred, average='weighted', zero_division=0)
+            f1 = metrics_mod.f1_score(y_true, y_pred, average='weighted', zero_division=0)
             
             evaluation_report["metrics"] = {
                 "Accuracy": float(acc),
@@ -56,23 +62,25 @@ def evaluate_model(model: Any, task_type: str, X_test=None, y_test=None) -> Dict
             }
             
             # Confusion Matrix
-            cm = confusion_matrix(y_true, y_pred)
+            cm = metrics_mod.confusion_matrix(y_true, y_pred)
             evaluation_report["confusion_matrix"] = cm.tolist() 
             evaluation_report["classes"] = sorted(y_true.unique().tolist())
             
         elif task_type == "regression":
-            predictions = reg_predict(model, data=None, verbose=False)
-            
-            y_true_col = reg_get_config('target_param')
-            y_pred_col = 'prediction_label'
+            if X_test is None:
+                reg = lazy_imports.load("pycaret.regression")
+                predictions = reg.predict_model(model, data=None, verbose=False)
+                
+                y_true_col = reg.get_config('target_param')
+                y_pred_col = 'prediction_label'
             
             y_true = predictions[y_true_col]
             y_pred = predictions[y_pred_col]
             
             # Hitung Metrics Manual
-            r2 = r2_score(y_true, y_pred)
-            rmse = np.sqrt(mean_squared_error(y_true, y_pred))
-            mae = mean_absolute_error(y_true, y_pred)
+            r2 = metrics_mod.r2_score(y_true, y_pred)
+            rmse = np.sqrt(metrics_mod.mean_squared_error(y_true, y_pred))
+            mae = metrics_mod.mean_absolute_error(y_true, y_pred)
             
             evaluation_report["metrics"] = {
                 "R2": float(r2),
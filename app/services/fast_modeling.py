@@ -0,0 +1,373 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.config import settings
+from app.services import adaptive_cv, lazy_imports
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+# FAST ENGINE (sklearn / LightGBM langsung, tanpa PyCaret setup)
+# ==========================================
+# Keluarga model sama dengan engine PyCaret ('lr', 'dt', 'lightgbm'), preprocessing
+# ringkas (imputasi + one-hot/ordinal + scaling hanya untuk linear), k-fold CV
+# adaptif (lihat adaptive_cv) dan early stopping LightGBM. Kontrak output sama dengan
+# modeling.train_diverse_models, ditambah 'holdout' untuk Step 7.
+
+MODEL_IDS = ['lr', 'dt', 'lightgbm']
+
+# Sama dengan default PyCaret (train_size=0.7, session_id=123)
+TRAIN_SIZE = 0.7
+RANDOM_STATE = 123
+
+# Maksimum kategori one-hot per kolom, sisanya digabung sebagai 'infrequent' (one-hot tetap ringkas)
+MAX_CATEGORIES = 25
+LIGHTGBM_MAX_ROUNDS = 1000
+# Porsi fold train yang disisihkan untuk early stopping LightGBM saat CV
+EARLY_STOPPING_FRACTION = 0.15
+
+
+def _expand_datetimes(X: pd.DataFrame) -> pd.DataFrame:
+    """
+    Kolom datetime -> komponen numerik (tahun, bulan, hari, hari dalam minggu).
+    Stateless, jadi ikut di dalam pipeline model yang disimpan.
+    """
+    date_cols = [c for c in X.columns if pd.api.types.is_datetime64_any_dtype(X[c])]
+    if not date_cols:
+        return X
+    parts = {}
+    for col in date_cols:
+        dt = X[col].dt
+        parts[f"{col}_year"] = dt.year
+        parts[f"{col}_month"] = dt.month
+        parts[f"{col}_day"] = dt.day
+        parts[f"{col}_weekday"] = dt.weekday
+    return pd.concat([X.drop(columns=date_cols), pd.DataFrame(parts, index=X.index)], axis=1)
+
+
+def _split_columns(X: pd.DataFrame):
+    numeric = [c for c in X.columns if pd.api.types.is_numeric_dtype(X[c]) or pd.api.types.is_bool_dtype(X[c])]
+    categorical = [c for c in X.columns if c not in numeric]
+    return numeric, categorical
+
+
+def build_estimator(model_id: str, task: str, params: Optional[Dict[str, Any]] = None):
+    """
+    Estimator default per keluarga model (setara default PyCaret dengan session_id=123).
+    """
+    params = params or {}
+    if model_id == 'lr':
+        from sklearn.linear_model import LinearRegression, LogisticRegression
+        if task == "classification":
+            return LogisticRegression(max_iter=1000, random_state=RANDOM_STATE, **params)
+        return LinearRegression(**params)
+    if model_id == 'dt':
+        from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+        cls = DecisionTreeClassifier if task == "classification" else DecisionTreeRegressor
+        return cls(random_state=RANDOM_STATE, **params)
+    if model_id == 'lightgbm':
+        lgb = lazy_imports.load("lightgbm")
+        cls = lgb.LGBMClassifier if task == "classification" else lgb.LGBMRegressor
+        return cls(random_state=RANDOM_STATE, verbose=-1, **{"n_estimators": LIGHTGBM_MAX_ROUNDS, **params})
+    raise ValueError(f"Model '{model_id}' tidak didukung fast engine")
+
+
+def build_pipeline(model_id: str, task: str, X: pd.DataFrame, params: Optional[Dict[str, Any]] = None):
+    """
+    Pipeline sklearn: expand datetime -> preprocessing kolom -> estimator.
+    X dipakai hanya untuk menentukan kolom numerik / kategorikal.
+    """
+    from sklearn.compose import ColumnTransformer
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline, make_pipeline
+    from sklearn.preprocessing import FunctionTransformer, OneHotEncoder, OrdinalEncoder, StandardScaler
+
+    numeric, categorical = _split_columns(_expand_datetimes(X.head(50)))
+
+    if model_id == 'lightgbm':
+        # LightGBM menangani NaN numerik sendiri, kategori cukup ordinal
+        cat_step = make_pipeline(
+            SimpleImputer(strategy="most_frequent"),
+            OrdinalEncoder(handle_unknown="use_encoded_value", unknown_value=-1),
+        )
+        num_step = "passthrough"
+    else:
+        cat_step = make_pipeline(
+            SimpleImputer(strategy="most_frequent"),
+            OneHotEncoder(handle_unknown="infrequent_if_exist", max_categories=MAX_CATEGORIES),
+        )
+        num_step = SimpleImputer(strategy="median")
+        if model_id == 'lr':
+            num_step = make_pipeline(num_step, StandardScaler())
+
+    preprocess = ColumnTransformer(
+        [("num", num_step, numeric), ("cat", cat_step, categorical)],
+        sparse_threshold=0.0,
+    )
+
+    estimator = build_estimator(model_id, task, params)
+
+    return Pipeline([
+        ("datetime", FunctionTransformer(_expand_datetimes)),
+        ("preprocess", preprocess),
+        ("model", estimator),
+    ])
+
+
+def linear_sufficient_stats(Xt: np.ndarray, y) -> Dict[str, Any]:
+    """
+    X'X dan X'y (dengan kolom intercept) dari data yang sudah di-preprocess.
+    Disimpan di LinearRegression agar retrain incremental bisa menghitung ulang
+    least squares eksak dengan baris baru saja (lihat incremental.py).
+    """
+    A = np.column_stack([np.asarray(Xt, dtype=np.float64), np.ones(len(Xt))])
+    y = np.asarray(y, dtype=np.float64)
+    return {"xtx": A.T @ A, "xty": A.T @ y, "n": len(y)}
+
+
+def solve_linear(estimator, stats: Dict[str, Any]) -> None:
+    """Set coef_ / intercept_ LinearRegression dari sufficient statistics (least squares)."""
+    solution = np.linalg.lstsq(stats["xtx"], stats["xty"], rcond=None)[0]
+    estimator.coef_ = solution[:-1]
+    estimator.intercept_ = float(solution[-1])
+    estimator.sufficient_stats_ = stats
+
+
+def replay_sample(Xt: np.ndarray, y, n_rows: int, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Sampel acak seragam (maks INCREMENTAL_REPLAY_ROWS) dari baris train yang sudah
+    di-preprocess. Disimpan di LogisticRegression: tidak ada sufficient statistics
+    untuk logistic, retrain incremental memakai sampel ini (berbobot) + baris baru.
+    previous: sampel lama atas `previous['n']` baris -> sampel atas n lama + n_rows baru.
+    """
+    limit = settings.INCREMENTAL_REPLAY_ROWS
+    Xt = np.asarray(Xt, dtype=np.float64)
+    y = np.asarray(y)
+    rng = np.random.default_rng(RANDOM_STATE)
+    n_old = previous["n"] if previous is not None else 0
+    total = n_old + n_rows
+    # Kuota per kelompok sebanding jumlah baris yang diwakilinya
+    k_old = min(len(previous["y"]), round(limit * n_old / total)) if previous is not None else 0
+    k_new = min(len(y), limit - k_old)
+    keep_old = np.sort(rng.choice(len(previous["y"]), k_old, replace=False)) if k_old else np.arange(0)
+    keep_new = np.sort(rng.choice(len(y), k_new, replace=False))
+    parts_X, parts_y = [Xt[keep_new]], [y[keep_new]]
+    if k_old:
+        parts_X.insert(0, previous["X"][keep_old])
+        parts_y.insert(0, previous["y"][keep_old])
+    return {"X": np.concatenate(parts_X), "y": np.concatenate(parts_y), "n": total}
+
+
+def attach_incremental_state(model, model_id: str, task: str, X_train: pd.DataFrame, y_train) -> None:
+    """
+    State untuk retrain incremental di estimator pipeline hasil refit: sufficient
+    statistics (LinearRegression) atau sampel replay (LogisticRegression).
+    """
+    if model_id != 'lr':
+        return
+    Xt = model[:-1].transform(X_train)
+    estimator = model.named_steps["model"]
+    if task == "regression":
+        estimator.sufficient_stats_ = linear_sufficient_stats(Xt, y_train)
+    else:
+        estimator.replay_sample_ = replay_sample(Xt, y_train, len(y_train))
+
+
+def _score(task: str, y_true, y_pred) -> float:
+    from sklearn.metrics import accuracy_score, r2_score
+    return float(accuracy_score(y_true, y_pred) if task == "classification" else r2_score(y_true, y_pred))
+
+
+def fit_estimator(estimator, model_id: str, X_train, y_train, X_valid=None, y_valid=None,
+                  early_stopping_rounds: int = 0):
+    """
+    Fit estimator pada data yang sudah di-preprocess. Untuk LightGBM dengan data
+    validasi: early stopping pada data tsb (best_iteration_ tersedia setelahnya).
+    """
+    if model_id != 'lightgbm' or X_valid is None or not early_stopping_rounds:
+        return estimator.fit(X_train, y_train)
+
+    lgb = lazy_imports.load("lightgbm")
+    return estimator.fit(
+        X_train, y_train,
+        eval_set=[(X_valid, y_valid)],
+        callbacks=[lgb.early_stopping(early_stopping_rounds, verbose=False)],
+    )
+
+
+def _early_stopping_split(task: str, y: pd.Series):
+    """
+    Posisi (fit, early stopping) di dalam fold train, stratified untuk klasifikasi jika bisa.
+    """
+    from sklearn.model_selection import train_test_split
+
+    positions = np.arange(len(y))
+    stratify = y if task == "classification" and y.value_counts().min() >= 2 else None
+    try:
+        return train_test_split(positions, test_size=EARLY_STOPPING_FRACTION,
+                                random_state=RANDOM_STATE, stratify=stratify)
+    except ValueError:
+        # Kelas terlalu kecil untuk stratified split
+        return train_test_split(positions, test_size=EARLY_STOPPING_FRACTION, random_state=RANDOM_STATE)
+
+
+def _take_rows(X, positions):
+    return X.iloc[positions] if hasattr(X, "iloc") else X[positions]
+
+
+def fold_scorer(task: str, X: pd.DataFrame, y: pd.Series, early_stopping_rounds: int, pipeline: bool = True):
+    """
+    fit_and_score untuk adaptive_cv.race. pipeline=True: preprocessing ikut di-fit per fold
+    (fast engine); False: X sudah di-preprocess (data transform PyCaret).
+
+    Early stopping LightGBM memakai potongan fold train (EARLY_STOPPING_FRACTION), bukan
+    fold validasi: fold validasi hanya dipakai untuk skor sehingga skor CV tidak bias.
+    """
+    def fit_and_score(model_id, train_idx, valid_idx):
+        X_tr, X_va = X.iloc[train_idx], X.iloc[valid_idx]
+        y_tr, y_va = y.iloc[train_idx], y.iloc[valid_idx]
+        if pipeline:
+            model = build_pipeline(model_id, task, X)
+            head, estimator = model[:-1], model.named_steps["model"]
+            Xt_tr = head.fit_transform(X_tr, y_tr)
+            Xt_va = head.transform(X_va)
+        else:
+            model = estimator = build_estimator(model_id, task)
+            Xt_tr, Xt_va = X_tr, X_va
+        if model_id == "lightgbm" and early_stopping_rounds:
+            fit_pos, stop_pos = _early_stopping_split(task, y_tr)
+            fit_estimator(estimator, model_id, _take_rows(Xt_tr, fit_pos), y_tr.iloc[fit_pos],
+                          _take_rows(Xt_tr, stop_pos), y_tr.iloc[stop_pos], early_stopping_rounds)
+        else:
+            fit_estimator(estimator, model_id, Xt_tr, y_tr)
+        score = _score(task, y_va, estimator.predict(Xt_va))
+        return score, getattr(estimator, "best_iteration_", None)
+
+    return fit_and_score
+
+
+def effective_folds(task: str, y: pd.Series, folds: int) -> int:
+    if task == "classification":
+        # Stratified k-fold butuh minimal k sampel per kelas
+        folds = min(folds, int(y.value_counts().min()))
+    return max(2, min(folds, len(y)))
+
+
+def metrics_entry(m_id: str, metric_key: str, model: Any, cv: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "model_id": m_id,
+        metric_key: cv["score"],
+        "model_obj": model,
+        "cv_folds_used": cv["cv_folds_used"],
+        "cv_folds_planned": cv["cv_folds_planned"],
+        "cv_stopped_early": cv["cv_stopped_early"],
+        "time_saved_s": cv["time_saved_s"],
+        "params": cv["params"],
+    }
+
+
+def train_fast_models(df: pd.DataFrame, target: str, folds: Optional[int] = None,
+                      early_stopping_rounds: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Melatih 'lr', 'dt', 'lightgbm' tanpa PyCaret.
+    Metric per model = rata-rata skor CV di data train (Accuracy / R2), lalu model
+    di-refit pada seluruh data train. 30% data disisihkan sebagai hold-out Step 7.
+
+    Returns:
+        Dictionary dengan kontrak sama seperti modeling.train_diverse_models,
+        ditambah 'holdout' (X_test, y_test).
+    """
+    from sklearn.model_selection import train_test_split
+    from app.services.modeling import _detect_task_type
+
+    if early_stopping_rounds is None:
+        early_stopping_rounds = settings.LIGHTGBM_EARLY_STOPPING_ROUNDS
+
+    logger.info(f"⚡ Fast Engine: training untuk target {target}")
+    task = _detect_task_type(df, target)
+    metric_key = "accuracy" if task == "classification" else "r2"
+
+    try:
+        data = df.dropna(subset=[target])
+        X = data.drop(columns=[target])
+        y = data[target]
+        stratify = y if task == "classification" and y.value_counts().min() >= 2 else None
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, train_size=TRAIN_SIZE, random_state=RANDOM_STATE, stratify=stratify
+        )
+        requested = folds or settings.FAST_ENGINE_FOLDS
+        folds = effective_folds(task, y_train, adaptive_cv.choose_folds(len(y_train), requested))
+        print(f"   Training models: {MODEL_IDS} ({folds}-fold adaptive CV)...")
+
+        # Adaptive CV: model yang jelas kalah berhenti lebih awal
+        cv_results = adaptive_cv.race(
+            MODEL_IDS, adaptive_cv.cv_splits(task, y_train, folds, RANDOM_STATE), folds,
+            fold_scorer(task, X_train, y_train, early_stopping_rounds),
+        )
+
+        trained_models = []
+        model_metrics = []
+        for m_id in MODEL_IDS:
+            cv = cv_results[m_id]
+            if "error" in cv:
+                print(f"     ⚠️ Gagal train {m_id}: {cv['error']}")
+                continue
+            try:
+                # Refit di seluruh data train (n_estimators LightGBM = median best iteration)
+                model = build_pipeline(m_id, task, X_train, cv["params"])
+                model.fit(X_train, y_train)
+                attach_incremental_state(model, m_id, task, X_train, y_train)
+                trained_models.append(model)
+
+                print(f"     ✅ {m_id.upper()} Trained. {metric_key.upper()}: {cv['score']:.4f} "
+                      f"({cv['cv_folds_used']}/{folds} fold)")
+                model_metrics.append(metrics_entry(m_id, metric_key, model, cv))
+            except Exception as e:
+                print(f"     ⚠️ Gagal train {m_id}: {str(e)}")
+
+        if not model_metrics:
+            raise ValueError("Semua model gagal dilatih")
+
+        model_metrics.sort(key=lambda x: x[metric_key], reverse=True)
+        # models_list mengikuti urutan model terbaik (sama seperti metrics_report)
+        trained_models = [m["model_obj"] for m in model_metrics]
+        logger.info(f"🏁 Fast Engine Selesai. Best Model: {model_metrics[0]['model_id'].upper()} "
+                    f"({model_metrics[0][metric_key]:.4f})")
+
+        return {
+            "status": "success",
+            "task": task,
+            "models_list": trained_models,
+            "metrics_report": model_metrics,
+            "holdout": (X_test, y_test),
+        }
+
+    except Exception as e:
+        logger.error(f"Error pada fast engine: {e}")
+        import traceback
+        traceback.print_exc()
+        return {"status": "error", "message": str(e)}
+
+
+class AveragingEnsemble:
+    """
+    Ensemble model yang sudah di-fit: soft voting (rata-rata probabilitas) untuk
+    klasifikasi, rata-rata prediksi untuk regresi. Padanan blend_models PyCaret.
+    """
+
+    def __init__(self, models: List[Any], task: str):
+        self.models = models
+        self.task = task
+        if task == "classification":
+            self.classes_ = models[0].classes_
+
+    def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
+        return np.mean([m.predict_proba(X) for m in self.models], axis=0)
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        if self.task == "classification":
+            return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+        return np.mean([m.predict(X) for m in self.models], axis=0)
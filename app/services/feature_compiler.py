@@ -0,0 +1,427 @@
+import ast
+import functools
+import math
+import time
+import tracemalloc
+import pandas as pd
+import numpy as np
+from typing import Any, Dict, List, Tuple, Union
+
+# ==========================================
+# WHITELIST OPERASI
+# ==========================================
+# Nama global yang boleh dipakai di expression LLM
+ALLOWED_NAMES = {"df", "pd", "np", "True", "False", "None"}
+
+# Fungsi level modul yang boleh dipanggil: np.<fn> / pd.<fn>
+ALLOWED_NUMPY = {
+    "abs", "absolute", "log", "log1p", "log2", "log10", "exp", "expm1", "sqrt", "square",
+    "power", "sign", "floor", "ceil", "round", "rint", "clip", "where", "select",
+    "maximum", "minimum", "fmax", "fmin", "isnan", "isinf", "isfinite", "nan", "inf", "pi", "e",
+    "sin", "cos", "tan", "arctan", "arctan2", "tanh", "mean", "median", "std", "var", "sum",
+    "min", "max", "cumsum", "diff", "digitize", "histogram_bin_edges", "percentile",
+    "quantile", "nan_to_num", "divide", "multiply", "add", "subtract", "mod", "int64",
+    "float64", "int32", "float32", "bool_", "logical_and", "logical_or", "logical_not",
+}
+ALLOWED_PANDAS = {
+    "to_datetime", "to_numeric", "to_timedelta", "cut", "qcut", "isna", "isnull", "notna",
+    "notnull", "Timestamp", "Timedelta", "NA", "NaT", "factorize", "get_dummies",
+}
+
+# Method/atribut yang ditolak walaupun ada di API pandas/numpy (I/O & side-effect)
+DENIED_ATTRIBUTES = {
+    "eval", "query", "pipe", "plot", "hist", "boxplot", "style", "tofile", "dump", "dumps",
+    "to_clipboard", "to_csv", "to_excel", "to_feather", "to_hdf", "to_json", "to_parquet",
+    "to_pickle", "to_sql", "to_stata", "to_gbq", "to_html", "to_latex", "to_markdown",
+    "to_orc", "to_xml", "setflags", "resize", "itemset", "set_flags", "attrs", "flags",
+}
+
+
+# Method Series/DataFrame/accessor (.str, .dt, .cat) + ndarray yang boleh dipakai:
+# daftar eksplisit operasi vektor (math, string, tanggal), bukan seluruh API publik
+ALLOWED_METHODS = {
+    # Aritmetika & perbandingan
+    "add", "sub", "subtract", "mul", "multiply", "div", "divide", "truediv", "floordiv",
+    "mod", "pow", "radd", "rsub", "rmul", "rdiv", "rtruediv", "rfloordiv", "rmod", "rpow",
+    "abs", "round", "clip", "eq", "ne", "lt", "le", "gt", "ge", "between", "isin",
+    # Nilai kosong, tipe & seleksi nilai
+    "fillna", "ffill", "bfill", "isna", "isnull", "notna", "notnull", "dropna", "astype",
+    "where", "mask", "replace", "map", "apply", "values", "to_numpy", "copy",
+    # Agregasi (baris / kolom / grup / rolling)
+    "sum", "mean", "median", "min", "max", "std", "var", "count", "nunique", "prod",
+    "quantile", "any", "all", "cumsum", "cumprod", "cummax", "cummin", "diff", "shift",
+    "pct_change", "rank", "value_counts", "groupby", "transform", "agg", "aggregate",
+    "rolling", "expanding", "ewm", "size", "first", "last", "idxmax", "idxmin",
+    # String accessor (.str)
+    "str", "len", "lower", "upper", "title", "capitalize", "strip", "lstrip", "rstrip",
+    "contains", "startswith", "endswith", "split", "get", "slice", "extract", "find",
+    "zfill", "pad", "cat", "isdigit", "isnumeric", "isalpha", "isalnum", "isspace",
+    "islower", "isupper",
+    # Datetime accessor (.dt) & timedelta
+    "dt", "year", "month", "day", "hour", "minute", "second", "quarter", "week",
+    "weekday", "dayofweek", "day_of_week", "dayofyear", "day_of_year", "days_in_month",
+    "is_month_start", "is_month_end", "is_quarter_start", "is_quarter_end",
+    "is_year_start", "is_year_end", "is_leap_year", "date", "normalize", "floor", "ceil",
+    "days", "seconds", "total_seconds",
+    # Kategori (.cat)
+    "codes", "categories",
+}
+
+# Nama atribut DataFrame (df.<nama> dianggap kolom hanya jika bukan atribut DataFrame)
+DATAFRAME_ATTRIBUTES = {a for a in dir(pd.DataFrame) if not a.startswith("_")}
+
+# Method yang menerima nama fungsi sebagai string (mis. .agg('mean')):
+# string tersebut harus lolos whitelist yang sama dengan method biasa
+FUNCTION_ARG_METHODS = {"apply", "agg", "aggregate", "transform", "map", "pipe", "applymap"}
+
+# Node AST yang diizinkan (expression murni, tanpa statement)
+ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp,
+    ast.Call, ast.keyword, ast.Attribute, ast.Subscript, ast.Slice, ast.Name, ast.Load,
+    ast.Constant, ast.Tuple, ast.List, ast.Dict, ast.Lambda, ast.arguments, ast.arg,
+    ast.operator, ast.unaryop, ast.boolop, ast.cmpop,
+)
+
+
+def _extract_column(node: ast.AST) -> Union[str, None]:
+    """
+    Mengembalikan nama kolom jika node berbentuk df['col'] atau df.col.
+    """
+    if isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name) and node.value.id == "df":
+        if isinstance(node.slice, ast.Constant) and isinstance(node.slice.value, str):
+            return node.slice.value
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == "df":
+        if node.attr not in DATAFRAME_ATTRIBUTES and node.attr not in ALLOWED_METHODS:
+            return node.attr
+    return None
+
+
+def _function_names(call: ast.Call) -> List[str]:
+    """
+    Nama fungsi berupa string di argumen pertama / func= (mis. .agg('mean'),
+    .agg(['mean', 'max']), .agg({'col': 'sum'})). Dict di .map() adalah mapping nilai.
+    """
+    args = list(call.args[:1]) + [k.value for k in call.keywords if k.arg in ("func", "arg")]
+    names = []
+    for arg in args:
+        if isinstance(arg, (ast.List, ast.Tuple)):
+            items = arg.elts
+        elif isinstance(arg, ast.Dict) and call.func.attr != "map":
+            items = [v.elts if isinstance(v, (ast.List, ast.Tuple)) else [v] for v in arg.values]
+            items = [item for group in items for item in group]
+        else:
+            items = [arg]
+        names += [item.value for item in items if isinstance(item, ast.Constant) and isinstance(item.value, str)]
+    return names
+
+
+def _lambda_params(args: ast.arguments) -> List[str]:
+    params = args.posonlyargs + args.args + args.kwonlyargs
+    params += [a for a in (args.vararg, args.kwarg) if a is not None]
+    return [a.arg for a in params]
+
+
+def _name_scopes(node: ast.AST, allowed: frozenset, scopes: Dict[int, frozenset] = None) -> Dict[int, frozenset]:
+    """
+    Nama yang boleh dipakai di setiap node ast.Name (key: id node). Parameter lambda
+    hanya berlaku di body lambda itu sendiri, bukan di seluruh expression.
+    """
+    scopes = {} if scopes is None else scopes
+    if isinstance(node, ast.Name):
+        scopes[id(node)] = allowed
+    elif isinstance(node, ast.Lambda):
+        # Default argumen dievaluasi di scope luar
+        for default in node.args.defaults + [d for d in node.args.kw_defaults if d is not None]:
+            _name_scopes(default, allowed, scopes)
+        _name_scopes(node.body, allowed | frozenset(_lambda_params(node.args)), scopes)
+        return scopes
+    for child in ast.iter_child_nodes(node):
+        _name_scopes(child, allowed, scopes)
+    return scopes
+
+
+def _validate_tree(tree: ast.Expression) -> Tuple[str, ...]:
+    """
+    Validasi AST terhadap whitelist. Mengembalikan daftar kolom df yang direferensikan.
+    Raise ValueError jika ada operasi yang tidak diizinkan.
+    """
+    name_scopes = _name_scopes(tree, frozenset(ALLOWED_NAMES))
+    columns = []
+
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise ValueError(f"Operasi tidak diizinkan: {type(node).__name__}")
+
+        if isinstance(node, ast.Name) and node.id not in name_scopes[id(node)]:
+            raise ValueError(f"Nama tidak dikenal: '{node.id}'")
+
+        if isinstance(node, ast.Attribute):
+            if node.attr.startswith("_"):
+                raise ValueError(f"Atribut private tidak diizinkan: '{node.attr}'")
+            if node.attr in DENIED_ATTRIBUTES:
+                raise ValueError(f"Method tidak diizinkan: '.{node.attr}'")
+            owner = node.value.id if isinstance(node.value, ast.Name) else None
+            if owner == "np" and node.attr not in ALLOWED_NUMPY:
+                raise ValueError(f"Fungsi numpy tidak diizinkan: 'np.{node.attr}'")
+            if owner == "pd" and node.attr not in ALLOWED_PANDAS:
+                raise ValueError(f"Fungsi pandas tidak diizinkan: 'pd.{node.attr}'")
+            if owner not in ("np", "pd") and _extract_column(node) is None and node.attr not in ALLOWED_METHODS:
+                raise ValueError(f"Method tidak diizinkan: '.{node.attr}'")
+
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) \
+                and node.func.attr in FUNCTION_ARG_METHODS:
+            for name in _function_names(node):
+                if name in DENIED_ATTRIBUTES or name not in ALLOWED_METHODS:
+                    raise ValueError(f"Fungsi tidak diizinkan: '.{node.func.attr}(\'{name}\')'")
+
+        col = _extract_column(node)
+        if col is not None and col not in columns:
+            columns.append(col)
+
+    return tuple(columns)
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_expression(expression: str) -> Tuple[Any, Tuple[str, ...]]:
+    """
+    Parse expression menjadi AST (sekali), validasi whitelist, lalu compile.
+    Hasil di-cache sehingga plan yang sama tidak di-compile ulang (mis. saat prediksi).
+
+    Returns:
+        Tuple (code object, kolom yang direferensikan).
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Syntax error: {e.msg}")
+
+    columns = _validate_tree(tree)
+    code = compile(tree, "<feature>", "eval")
+    return code, columns
+
+
+def plan_item_to_dict(item: Union[Dict, object]) -> Dict:
+    # Handle Pydantic vs Dict
+    if hasattr(item, "model_dump"):
+        return item.model_dump()
+    if hasattr(item, "dict"):
+        return item.dict()
+    if isinstance(item, dict):
+        return item
+    return item.__dict__
+
+
+def compile_feature_plan(features_plan: List[Union[Dict, object]]) -> Dict[str, Any]:
+    """
+    Compile seluruh plan fitur LLM sekali jalan.
+    Fitur dikelompokkan ke 'levels': fitur di level yang sama saling independen
+    sehingga bisa dievaluasi dalam satu batch. Fitur yang memakai fitur baru
+    lainnya ditempatkan di level berikutnya.
+
+    Returns:
+        Dictionary berisi 'levels' (list of list item ter-compile) dan 'rejected'
+        (report untuk expression yang gagal validasi).
+    """
+    compiled = []
+    rejected = []
+
+    for item in features_plan:
+        item_dict = plan_item_to_dict(item)
+        col_name = item_dict.get("name", "Unknown_Feature")
+        expr = item_dict.get("expression", "")
+        if not expr:
+            continue
+        try:
+            code, columns = compile_expression(expr)
+            compiled.append({"name": col_name, "expression": expr, "code": code, "columns": columns})
+        except ValueError as e:
+            rejected.append({"name": col_name, "status": "Failed", "error": f"Kode ditolak: {e}"})
+
+    # Susun level dependensi (urutan plan dipertahankan di dalam level)
+    level_of = {}
+    levels: List[List[Dict]] = []
+    for feat in compiled:
+        deps = [level_of[c] for c in feat["columns"] if c in level_of and c != feat["name"]]
+        level = max(deps) + 1 if deps else 0
+        level_of[feat["name"]] = level
+        while len(levels) <= level:
+            levels.append([])
+        levels[level].append(feat)
+
+    return {"levels": levels, "rejected": rejected}
+
+
+def _to_series(result: Any, index: pd.Index) -> pd.Series:
+    """
+    Normalisasi hasil evaluasi (Series / ndarray / skalar) menjadi Series sejajar index df.
+    """
+    if isinstance(result, pd.DataFrame):
+        raise ValueError("Expression menghasilkan DataFrame, harus satu kolom")
+    if isinstance(result, pd.Series):
+        if len(result) != len(index):
+            raise ValueError(f"Panjang hasil ({len(result)}) tidak sama dengan data ({len(index)})")
+        return result
+    if isinstance(result, (np.ndarray, pd.api.extensions.ExtensionArray, list)):
+        if len(result) != len(index):
+            raise ValueError(f"Panjang hasil ({len(result)}) tidak sama dengan data ({len(index)})")
+        return pd.Series(result, index=index)
+    if np.isscalar(result):
+        return pd.Series(result, index=index)
+    raise ValueError(f"Tipe hasil tidak didukung: {type(result).__name__}")
+
+
+def _evaluate_feature(feat: Dict, frame: pd.DataFrame) -> pd.Series:
+    # df ditaruh di globals agar bisa diakses dari dalam lambda
+    safe_globals = {"__builtins__": {}, "pd": pd, "np": np, "df": frame}
+    result = eval(feat["code"], safe_globals)
+    return _to_series(result, frame.index)
+
+
+def concat_new_columns(frame: pd.DataFrame, new_cols: Dict[str, pd.Series]) -> pd.DataFrame:
+    # Kolom yang ditimpa dibuang dulu agar tidak ada nama kolom ganda
+    overwritten = [c for c in new_cols if c in frame.columns]
+    base = frame.drop(columns=overwritten) if overwritten else frame
+    return pd.concat([base, pd.DataFrame(new_cols, index=frame.index)], axis=1)
+
+
+def apply_compiled_plan(df: pd.DataFrame, compiled_plan: Dict[str, Any]) -> Tuple[pd.DataFrame, List[Dict]]:
+    """
+    Evaluasi plan ter-compile terhadap df.
+    Setiap level dievaluasi sebagai batch lalu seluruh kolom baru digabung
+    dengan satu kali pd.concat (bukan assign kolom satu per satu).
+
+    Fitur di dalam level tetap dievaluasi satu per satu: tanpa numexpr (tidak ada
+    di requirements), DataFrame.eval memakai engine python yang tidak lebih cepat
+    dari operasi vektor pandas yang sudah dipakai code ter-compile, dan semantiknya
+    berbeda (mis. '/' selalu truediv, 'and'/'or' jadi operasi elemen).
+    """
+    report = list(compiled_plan["rejected"])
+    current = df
+
+    for level in compiled_plan["levels"]:
+        new_cols = {}
+        for feat in level:
+            col_name = feat["name"]
+            try:
+                new_cols[col_name] = _evaluate_feature(feat, current)
+                print(f"   ✅ Created: {col_name}")
+                report.append({"name": col_name, "status": "Success"})
+            except Exception as e:
+                print(f"   ⚠️ Failed: {col_name} - {str(e)}")
+                report.append({"name": col_name, "status": "Failed", "error": str(e)})
+
+        if new_cols:
+            current = concat_new_columns(current, new_cols)
+
+    return current, report
+
+
+# ==========================================
+# DRY-RUN (Estimasi biaya pada sampel)
+# ==========================================
+def _measure(feat: Dict, frame: pd.DataFrame) -> Tuple[pd.Series, float, int]:
+    """
+    Evaluasi satu fitur sambil mengukur waktu (detik) dan peak alokasi memori (bytes).
+    """
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    base_mem, _ = tracemalloc.get_traced_memory()
+    t0 = time.perf_counter()
+    try:
+        series = _evaluate_feature(feat, frame)
+    finally:
+        elapsed = time.perf_counter() - t0
+        _, peak_mem = tracemalloc.get_traced_memory()
+        if started_here:
+            tracemalloc.stop()
+    return series, elapsed, max(0, peak_mem - base_mem)
+
+
+def dry_run_feature_plan(
+    df: pd.DataFrame,
+    compiled_plan: Dict[str, Any],
+    sample_rows: int,
+    time_budget_s: float,
+    memory_budget_mb: float,
+) -> Tuple[Dict[str, Any], Dict[str, Dict]]:
+    """
+    Menjalankan plan ter-compile pada sampel kecil sebelum eksekusi penuh.
+    Setiap fitur dievaluasi pada 2 ukuran sampel (n/2 dan n) untuk memperkirakan
+    eksponen skala (linear vs kuadratik, mis. apply baris-per-baris), lalu biaya
+    diekstrapolasi ke jumlah baris penuh.
+
+    Verdict per fitur:
+    - 'ok'       : estimasi di bawah budget.
+    - 'flagged'  : masih di bawah budget, tapi skala superlinear atau > 50% budget.
+    - 'rejected' : estimasi waktu/memori melebihi budget, atau gagal di sampel.
+
+    Returns:
+        Tuple (plan baru tanpa fitur 'rejected', dict verdict per nama fitur).
+    """
+    total_rows = len(df)
+    n = min(sample_rows, total_rows)
+    sample = df.sample(n=n, random_state=42) if n < total_rows else df
+    half = sample.iloc[: max(1, n // 2)]
+    memory_budget = memory_budget_mb * 1024 * 1024
+
+    verdicts = {}
+    kept_levels = []
+    for level in compiled_plan["levels"]:
+        kept = []
+        new_full, new_half = {}, {}
+        for feat in level:
+            name = feat["name"]
+            try:
+                s_half, t_half, _ = _measure(feat, half)
+                s_full, t_full, mem = _measure(feat, sample)
+            except Exception as e:
+                verdicts[name] = {"verdict": "rejected", "reason": f"Gagal pada sampel: {e}"}
+                continue
+
+            # Eksponen skala dari 2 titik ukur (dibatasi 1..2 agar stabil terhadap noise)
+            exponent = 1.0
+            if t_half > 1e-4 and len(half) < n:
+                exponent = math.log(t_full / t_half) / math.log(n / len(half))
+                exponent = min(max(exponent, 1.0), 2.0)
+
+            scale = total_rows / n
+            est_time = t_full * scale ** exponent
+            est_mem = mem * scale
+            verdict = {
+                "sample_rows": n,
+                "sample_time_s": round(t_full, 6),
+                "scaling_exponent": round(exponent, 2),
+                "estimated_time_s": round(est_time, 3),
+                "estimated_memory_mb": round(est_mem / (1024 * 1024), 2),
+            }
+
+            if est_time > time_budget_s or est_mem > memory_budget:
+                verdict["verdict"] = "rejected"
+                verdict["reason"] = "Estimasi biaya melebihi budget"
+            elif exponent > 1.5 or est_time > 0.5 * time_budget_s or est_mem > 0.5 * memory_budget:
+                verdict["verdict"] = "flagged"
+                verdict["reason"] = "Biaya tinggi / skala superlinear"
+            else:
+                verdict["verdict"] = "ok"
+            verdicts[name] = verdict
+
+            if verdict["verdict"] != "rejected":
+                kept.append(feat)
+                new_full[name], new_half[name] = s_full, s_half
+
+        # Fitur level berikutnya dievaluasi terhadap sampel yang sudah berisi fitur lolos
+        if new_full:
+            sample = concat_new_columns(sample, new_full)
+            half = concat_new_columns(half, new_half)
+        if kept:
+            kept_levels.append(kept)
+
+    rejected = list(compiled_plan["rejected"])
+    for name, verdict in verdicts.items():
+        if verdict["verdict"] == "rejected":
+            print(f"   ⛔ Dry-run menolak: {name} - {verdict['reason']}")
+            rejected.append({"name": name, "status": "Failed", "error": f"Dry-run: {verdict['reason']}"})
+
+    return {"levels": kept_levels, "rejected": rejected}, verdicts
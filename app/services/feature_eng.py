@@ -3,12 +3,17 @@ import numpy as np  # [FIX 1] Import Numpy
 import json
 import os
 from dotenv import load_dotenv
-import google.generativeai as genai
 import traceback
-from typing import List, Union, Dict 
+from typing import List, Union, Dict, Optional
 
 # Import prompt template
-from app.services.prompts import generate_feature_engineering_prompt
+from app.services.prompts import build_feature_engineering_prompt
+from app.config import settings
+from app.services.feature_compiler import (
+    compile_feature_plan, apply_compiled_plan, dry_run_feature_plan,
+    concat_new_columns, plan_item_to_dict
+)
+from app.services import sandbox, lazy_imports
 
 # 1. LOAD ENVIRONMENT VARIABLES
 load_dotenv() 
@@ -18,8 +23,19 @@ API_KEY = os.getenv("GEMINI_API_KEY")
 
 if not API_KEY:
     print("⚠️ WARNING: GEMINI_API_KEY tidak ditemukan di .env! Fitur AI tidak akan berjalan.")
-else:
-    genai.configure(api_key=API_KEY)
+
+def _get_genai():
+    """
+    SDK Gemini di-import & dikonfigurasi saat request LLM pertama (bukan saat boot worker).
+    """
+    genai = lazy_imports.load("google.generativeai")
+    if settings.GEMINI_API_ENDPOINT:
+        # Endpoint non-Google (http://...) hanya didukung transport REST
+        genai.configure(api_key=API_KEY, transport="rest",
+                        client_options={"api_endpoint": settings.GEMINI_API_ENDPOINT})
+    else:
+        genai.configure(api_key=API_KEY)
+    return genai
 
 def get_llm_response(prompt_text: str) -> str:
     """
@@ -29,6 +45,7 @@ def get_llm_response(prompt_text: str) -> str:
         raise ValueError("API Key belum disetting.")
 
     try:
+        genai = _get_genai()
         # [FIX 2] Gunakan model yang stabil, cepat, dan murah untuk task ini
         # gemini-1.5-flash sangat direkomendasikan untuk tugas coding sederhana/JSON
         model = genai.GenerativeModel('gemini-2.5-flash') 
@@ -42,9 +59,11 @@ def get_llm_response(prompt_text: str) -> str:
         print(f"❌ Error saat memanggil Gemini: {e}")
         return "[]"
 
-def generate_features_plan(df: pd.DataFrame, description: str = "Dataset User") -> List[Dict]:
+def generate_features_plan(df: pd.DataFrame, description: str = "Dataset User",
+                           profile: Optional[Dict] = None) -> List[Dict]:
     """
     Step A: Mengirim data ke LLM dan meminta saran fitur.
+    profile: statistik kolom dari upload (statistics engine), agar prompt tidak menghitung ulang.
     """
     print("🤖 AI Feature Engineer sedang berpikir...")
     
@@ -52,8 +71,15 @@ def generate_features_plan(df: pd.DataFrame, description: str = "Dataset User")
     # Ini penting agar Prompt tahu fitur apa yang relevan dibuat
     target_col = df.columns[-1] if not df.empty else None
     
-    # Generate Prompt dengan Target Context
-    prompt_text = generate_feature_engineering_prompt(description, df, target_col=target_col)
+    # Generate Prompt dengan Target Context (statistik dari sampel, dibatasi token budget)
+    prompt_info = build_feature_engineering_prompt(
+        description, df, target_col=target_col,
+        profile=profile["columns"] if profile else None
+    )
+    prompt_text = prompt_info["prompt"]
+    print(f"   📝 Prompt: ~{prompt_info['estimated_tokens']} token, "
+          f"{len(prompt_info['columns_included'])} kolom "
+          f"({len(prompt_info['columns_truncated'])} dipotong).")
     
     # Call LLM
     try:
@@ -91,54 +117,41 @@ def execute_feature_code(df: pd.DataFrame, features_plan: List[Union[Dict, objec
     """
     Step B: EXECUTOR TOOL.
     Menjalankan kode saran dari LLM ke DataFrame asli secara aman.
+    Expression divalidasi lewat whitelist AST (lihat feature_compiler), bukan cek substring.
     """
     if not features_plan:
         print("   ⚠️ Tidak ada rencana fitur untuk dieksekusi.")
         return df, []
 
     print(f"⚙️ Menerapkan {len(features_plan)} fitur baru...")
-    
-    # [FIX 5] Tambahkan 'np' (NumPy) ke safe_locals agar rumus matematika jalan
-    safe_locals = {'df': df, 'pd': pd, 'np': np} 
-    
-    report = []
-    
-    for item in features_plan:
-        # Handle Pydantic vs Dict
-        if hasattr(item, 'model_dump'):
-            item_dict = item.model_dump()
-        elif hasattr(item, 'dict'):
-            item_dict = item.dict()
-        elif isinstance(item, dict):
-            item_dict = item
-        else:
-            item_dict = item.__dict__
 
-        col_name = item_dict.get('name', 'Unknown_Feature')
-        expr = item_dict.get('expression', '')
-        
-        if not expr:
-            continue
-            
-        try:
-            # Security Check Basic
-            if "import" in expr or "os." in expr or "sys." in expr or "open(" in expr:
-                raise ValueError("Kode ditolak (Unsafe/Berbahaya)")
+    dry_run = {
+        "sample_rows": settings.FEATURE_DRY_RUN_ROWS,
+        "time_budget_s": settings.FEATURE_TIME_BUDGET_S,
+        "memory_budget_mb": settings.FEATURE_MEMORY_BUDGET_MB,
+    }
 
-            # Eksekusi Kode
-            full_code = f"df['{col_name}'] = {expr}"
-            
-            # Exec menggunakan safe_locals yang sudah ada numpy
-            exec(full_code, {}, safe_locals)
-            
-            # Ambil hasil
-            df[col_name] = safe_locals['df'][col_name]
-            
-            print(f"   ✅ Created: {col_name}")
-            report.append({"name": col_name, "status": "Success"})
-            
-        except Exception as e:
-            print(f"   ⚠️ Failed: {col_name} - {str(e)}")
-            report.append({"name": col_name, "status": "Failed", "error": str(e)})
-            
-    return df, report
\ No newline at end of file
+    if settings.FEATURE_SANDBOX_ENABLED:
+        # Eksekusi di worker terpisah (rlimit CPU/memori), proses API tetap aman
+        plan_items = [plan_item_to_dict(item) for item in features_plan]
+        result = sandbox.run_feature_plan(df, plan_items, dry_run)
+        report, verdicts = result["report"], result["verdicts"]
+        if result["columns"]:
+            new_cols = {name: pd.Series(values, index=df.index) for name, values in result["columns"].items()}
+            df = concat_new_columns(df, new_cols)
+    else:
+        # Parse + validasi whitelist AST + compile (di-cache per expression),
+        # lalu evaluasi per batch dan gabungkan kolom baru sekaligus
+        compiled_plan = compile_feature_plan(features_plan)
+        for rejected in compiled_plan["rejected"]:
+            print(f"   ⚠️ Failed: {rejected['name']} - {rejected['error']}")
+
+        # Dry-run di sampel: tolak expression yang terlalu lambat / boros memori
+        compiled_plan, verdicts = dry_run_feature_plan(df, compiled_plan, **dry_run)
+        df, report = apply_compiled_plan(df, compiled_plan)
+
+    # Sertakan verdict dry-run di report
+    for entry in report:
+        if entry["name"] in verdicts:
+            entry["dry_run"] = verdicts[entry["name"]]
+    return df, report
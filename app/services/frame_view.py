@@ -0,0 +1,136 @@
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# FRAME VIEW (seleksi tanpa materialisasi)
+# ==========================================
+# Antar stage pipeline (cleaning -> selection -> training) yang dioper adalah
+# frame sumber + seleksi baris (indeks posisi) + daftar kolom + nilai imputasi.
+# Kolom hanya dimaterialisasi satu per satu saat dibaca (view[col]), frame utuh
+# sekali di akhir (materialize / export ke shared memory). API mengikuti subset
+# DataFrame yang dipakai stage (columns, index, drop, select_dtypes, iloc[a:b]).
+
+
+class _ILoc:
+    def __init__(self, view: "FrameView"):
+        self._view = view
+
+    def __getitem__(self, key: slice) -> "FrameView":
+        if not isinstance(key, slice):
+            raise TypeError("FrameView.iloc hanya mendukung slice baris")
+        return self._view._with(rows=self._view._positions()[key])
+
+
+class FrameView:
+    """
+    View read-only atas DataFrame sumber. Operasi seleksi mengembalikan view baru
+    (hanya menyimpan indeks baris / nama kolom), data sumber tidak pernah disalin.
+    """
+
+    def __init__(self, df: pd.DataFrame, rows: Optional[np.ndarray] = None,
+                 columns: Optional[List[Any]] = None, fill_values: Optional[Dict[Any, Any]] = None):
+        self._df = df
+        self._rows = rows
+        self._columns = list(df.columns) if columns is None else list(columns)
+        self._fill = dict(fill_values or {})
+
+    def _with(self, **changes) -> "FrameView":
+        state = {"rows": self._rows, "columns": self._columns, "fill_values": self._fill}
+        state.update(changes)
+        return FrameView(self._df, **state)
+
+    def _positions(self) -> np.ndarray:
+        return np.arange(len(self._df)) if self._rows is None else self._rows
+
+    # ---------- metadata ----------
+    @property
+    def columns(self) -> pd.Index:
+        return pd.Index(self._columns)
+
+    @property
+    def index(self) -> pd.Index:
+        return self._df.index if self._rows is None else self._df.index.take(self._rows)
+
+    @property
+    def dtypes(self) -> pd.Series:
+        return self._df.dtypes[self._columns]
+
+    @property
+    def shape(self):
+        return (len(self), len(self._columns))
+
+    @property
+    def size(self) -> int:
+        return len(self) * len(self._columns)
+
+    @property
+    def iloc(self) -> _ILoc:
+        return _ILoc(self)
+
+    def __len__(self) -> int:
+        return len(self._df) if self._rows is None else len(self._rows)
+
+    # ---------- seleksi ----------
+    def select_rows(self, mask: np.ndarray) -> "FrameView":
+        """Pertahankan baris dengan mask True (mask sepanjang view)."""
+        mask = np.asarray(mask, dtype=bool)
+        if mask.all():
+            return self
+        rows = np.flatnonzero(mask) if self._rows is None else self._rows[mask]
+        return self._with(rows=rows)
+
+    def drop(self, columns: Iterable[Any], errors: str = "raise") -> "FrameView":
+        columns = set(columns)
+        missing = columns - set(self._columns)
+        if missing and errors == "raise":
+            raise KeyError(f"Kolom tidak ada: {sorted(map(str, missing))}")
+        return self._with(columns=[c for c in self._columns if c not in columns])
+
+    def select_dtypes(self, include: Any = None, exclude: Any = None) -> "FrameView":
+        # Dtype kolom tidak berubah oleh seleksi baris / imputasi nilai
+        empty = self._df.iloc[:0][self._columns].select_dtypes(include=include, exclude=exclude)
+        return self._with(columns=list(empty.columns))
+
+    def fill(self, fill_values: Dict[Any, Any]) -> "FrameView":
+        """Imputasi (fillna per kolom) diterapkan saat kolom dibaca."""
+        fill = dict(self._fill)
+        fill.update({c: v for c, v in fill_values.items() if c in self._columns})
+        return self._with(fill_values=fill)
+
+    # ---------- materialisasi ----------
+    def _column(self, col: Any) -> pd.Series:
+        if col not in self._columns:
+            raise KeyError(col)
+        series = self._df[col]
+        if self._rows is not None:
+            series = series.take(self._rows)
+        if col in self._fill:
+            series = series.fillna(self._fill[col])
+        return series
+
+    def __getitem__(self, key: Union[Any, List[Any]]) -> Union[pd.Series, pd.DataFrame, "FrameView"]:
+        """view[col] -> Series (satu kolom dimaterialisasi), view[[cols]] -> FrameView."""
+        if isinstance(key, (list, pd.Index)):
+            missing = [c for c in key if c not in self._columns]
+            if missing:
+                raise KeyError(missing)
+            return self._with(columns=list(key))
+        return self._column(key)
+
+    def materialize(self) -> pd.DataFrame:
+        """
+        DataFrame hasil seleksi. Satu kali take untuk semua kolom, imputasi hanya
+        menyalin kolom yang punya nilai isi.
+        """
+        df = self._df[self._columns]
+        if self._rows is not None:
+            df = df.take(self._rows)
+        if self._fill:
+            df = df.fillna(self._fill)
+        return df
+
+
+def materialize(frame: Union[pd.DataFrame, FrameView]) -> pd.DataFrame:
+    return frame.materialize() if isinstance(frame, FrameView) else frame
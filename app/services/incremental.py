@@ -0,0 +1,305 @@
+import hashlib
+import logging
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.config import settings
+from app.services import content_store, storage
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+# RETRAIN INCREMENTAL (DATASET DI-APPEND)
+# ==========================================
+# Saat training engine 'fast', lineage disimpan di samping artifact model: jumlah
+# baris + hash baris dataset, plan cleaning exact dan kolom terpilih. Upload ulang
+# berupa file lama + baris baru terdeteksi dari hash prefix baris, lalu hanya baris
+# baru yang diproses: baris baru dibersihkan dengan plan cleaning training penuh
+# (nilai imputasi + batas IQR exact yang sama, tidak dihitung ulang dengan baris
+# baru; retrain penuh menghitung ulang batas atas seluruh baris), LightGBM
+# melanjutkan boosting (init_model), regresi linear di-update eksak (sufficient
+# statistics), logistic di-warm-start pada sampel replay baris lama + baris baru,
+# dan evaluasi memakai hold-out baris baru.
+# Preprocessing (imputer/encoder/scaler) dan seleksi fitur tetap milik model lama.
+
+LINEAGE_SUFFIX = ".lineage.json"
+LINEAGE_VERSION = 2
+
+
+class IncrementalError(ValueError):
+    """Retrain incremental tidak bisa dilakukan (caller fallback ke retrain penuh)."""
+
+
+# ==========================================
+# LINEAGE
+# ==========================================
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """
+    Hash per baris (uint64). Numerik dinormalisasi ke float64 dan datetime ke ns,
+    sehingga kolom int yang menjadi float karena baris baru berisi NaN tetap cocok.
+    """
+    normalized = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            series = series.astype("datetime64[ns]")
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            series = series.astype(np.float64)
+        normalized[col] = series
+    frame = pd.DataFrame(normalized, index=df.index, copy=False)
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def _digest(hashes: np.ndarray) -> str:
+    return hashlib.sha256(np.ascontiguousarray(hashes).tobytes()).hexdigest()
+
+
+def build_lineage(dataset_filename: str, raw: pd.DataFrame, clean_plan: Dict[str, Any],
+                  columns: List[str], target: str, task: str, tag: Optional[str] = None,
+                  hashes: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """
+    raw: dataset mentah yang dilatih; clean_plan: plan cleaning exact
+    (cleaning.auto_clean_with_plan); columns: kolom terpilih (fitur + target).
+    """
+    if hashes is None:
+        hashes = row_hashes(raw)
+    return {
+        "version": LINEAGE_VERSION,
+        "dataset": dataset_filename,
+        "sha256": content_store.resolve(dataset_filename)["sha256"],
+        "raw_columns": [str(c) for c in raw.columns],
+        "n_rows": len(raw),
+        "row_hash": _digest(hashes),
+        "clean_plan": clean_plan,
+        "columns": list(columns),
+        "target": target,
+        "task": task,
+        "tag": tag,
+    }
+
+
+def _encode_value(value: Any) -> Any:
+    # Nilai imputasi -> JSON (tanggal/durasi ditandai agar tipenya kembali saat dibaca)
+    if isinstance(value, pd.Timestamp):
+        return {"timestamp": value.isoformat()}
+    if isinstance(value, pd.Timedelta):
+        return {"timedelta": value.isoformat()}
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "timestamp" in value:
+        return pd.Timestamp(value["timestamp"])
+    if isinstance(value, dict) and "timedelta" in value:
+        return pd.Timedelta(value["timedelta"])
+    return value
+
+
+def _encode_plan(plan: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "threshold": int(plan["threshold"]),
+        "fill_values": {str(c): _encode_value(v) for c, v in plan["fill_values"].items()},
+        "bounds": {str(c): [float(lower), float(upper)] for c, (lower, upper) in plan["bounds"].items()},
+    }
+
+
+def _decode_plan(payload: Dict[str, Any]) -> Dict[str, Any]:
+    fill_values = {c: _decode_value(v) for c, v in payload["fill_values"].items()}
+    return {
+        "threshold": payload["threshold"],
+        # Median kolom yang seluruhnya kosong (NaN) tidak mengisi apa pun
+        "fill_values": {c: v for c, v in fill_values.items() if v is not None},
+        "bounds": {c: tuple(b) for c, b in payload["bounds"].items()},
+    }
+
+
+def save_lineage(model_key: str, lineage: Dict[str, Any]) -> None:
+    """
+    Lineage disimpan sebagai JSON di samping artifact (tanpa pickle): ringkasan
+    dataset + plan cleaning exact, bukan statistik lengkap.
+    """
+    payload = {**lineage, "clean_plan": _encode_plan(lineage["clean_plan"])}
+    storage.put_json(storage.model_store(), model_key + LINEAGE_SUFFIX, payload)
+
+
+def read_lineage(model_key: str) -> Optional[Dict[str, Any]]:
+    store = storage.model_store()
+    if not store.exists(model_key + LINEAGE_SUFFIX):
+        return None
+    lineage = storage.get_json(store, model_key + LINEAGE_SUFFIX)
+    if lineage.get("version") != LINEAGE_VERSION:
+        return None
+    return {**lineage, "clean_plan": _decode_plan(lineage["clean_plan"])}
+
+
+def detect_append(lineage: Dict[str, Any], df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Apakah df = dataset lineage + baris baru di akhir (kolom sama, baris lama identik)?
+
+    Returns:
+        Dictionary {append, reason, rows_appended, row_hash (hash df lengkap)}.
+    """
+    n_old = lineage["n_rows"]
+    result = {"append": False, "reason": None, "rows_appended": len(df) - n_old, "row_hash": None}
+    if [str(c) for c in df.columns] != lineage["raw_columns"]:
+        result["reason"] = "kolom dataset berbeda dengan saat training"
+    elif len(df) <= n_old:
+        result["reason"] = "tidak ada baris baru"
+    elif len(df) - n_old > settings.INCREMENTAL_MAX_APPEND_RATIO * n_old:
+        result["reason"] = f"baris baru ({len(df) - n_old}) > {settings.INCREMENTAL_MAX_APPEND_RATIO}x baris lama"
+    else:
+        hashes = row_hashes(df)
+        if _digest(hashes[:n_old]) != lineage["row_hash"]:
+            result["reason"] = "baris lama berubah (bukan append)"
+        else:
+            result["append"] = True
+            result["row_hash"] = _digest(hashes)
+    return result
+
+
+# ==========================================
+# RETRAIN
+# ==========================================
+def _update_member(pipeline: Any, X: pd.DataFrame, y: pd.Series, n_old: int) -> Dict[str, Any]:
+    """
+    Lanjutkan training estimator di pipeline (in-place) dengan baris baru.
+    Preprocessing lama dipakai apa adanya agar ruang fitur model tidak berubah.
+    """
+    from sklearn.base import clone
+
+    estimator = pipeline.named_steps["model"]
+    name = type(estimator).__name__
+    if name.startswith("DecisionTree"):
+        return {"model_id": "dt", "method": "unchanged", "reason": "decision tree tidak bisa dilanjutkan"}
+
+    Xt = pipeline[:-1].transform(X)
+    if name.startswith("LGBM"):
+        # Round tambahan sebanding porsi baris baru terhadap histori
+        from app.services.fast_modeling import LIGHTGBM_MAX_ROUNDS
+
+        trees = estimator.booster_.current_iteration()
+        rounds = min(max(settings.INCREMENTAL_MIN_ROUNDS, math.ceil(trees * len(X) / n_old)), LIGHTGBM_MAX_ROUNDS)
+        updated = clone(estimator).set_params(n_estimators=rounds)
+        updated.fit(Xt, y, init_model=estimator.booster_)
+        pipeline.steps[-1] = ("model", updated)
+        return {"model_id": "lightgbm", "method": "init_model", "rounds_added": rounds,
+                "total_rounds": updated.booster_.current_iteration()}
+    if name == "LogisticRegression":
+        from app.services.fast_modeling import replay_sample
+
+        sample = getattr(estimator, "replay_sample_", None)
+        if sample is None:
+            return {"model_id": "lr", "method": "unchanged", "reason": "model lama tanpa sampel replay"}
+        # Fit hanya pada baris baru = melupakan histori. Baris lama diwakili sampel replay
+        # berbobot n_lama / ukuran sampel, optimasi dimulai dari koefisien lama
+        X_all = np.vstack([sample["X"], np.asarray(Xt, dtype=np.float64)])
+        y_all = np.concatenate([sample["y"], np.asarray(y)])
+        weights = np.concatenate([np.full(len(sample["y"]), sample["n"] / len(sample["y"])), np.ones(len(y))])
+        estimator.set_params(warm_start=True)
+        estimator.fit(X_all, y_all, sample_weight=weights)
+        estimator.set_params(warm_start=False)
+        estimator.replay_sample_ = replay_sample(Xt, y, len(y), previous=sample)
+        return {"model_id": "lr", "method": "warm_start_replay", "rows_replayed": len(sample["y"]),
+                "rows_total": int(estimator.replay_sample_["n"]), "n_iter": int(np.max(estimator.n_iter_))}
+    if name == "LinearRegression":
+        from app.services.fast_modeling import linear_sufficient_stats, solve_linear
+
+        previous = getattr(estimator, "sufficient_stats_", None)
+        if previous is None:
+            return {"model_id": "lr", "method": "unchanged", "reason": "model lama tanpa sufficient statistics"}
+        new = linear_sufficient_stats(Xt, y)
+        # Least squares eksak atas baris train lama + baru tanpa membaca baris lama
+        solve_linear(estimator, {k: previous[k] + new[k] for k in ("xtx", "xty", "n")})
+        return {"model_id": "lr", "method": "least_squares_update", "rows_total": int(estimator.sufficient_stats_["n"])}
+    raise IncrementalError(f"Estimator '{name}' tidak mendukung retrain incremental")
+
+
+def retrain(new_rows: pd.DataFrame, model_key: str, dataset_filename: str,
+            lineage: Dict[str, Any], row_hash: str) -> Dict[str, Any]:
+    """
+    Retrain incremental model engine 'fast' dengan baris yang di-append saja.
+    Dipanggil di worker training (lihat training_pool.run_incremental).
+
+    Returns:
+        Dictionary hasil (kontrak run_training_job + metrics_before, rows_appended,
+        incremental_report), atau status 'not_incremental' + reason -> retrain penuh.
+    """
+    import joblib
+    from sklearn.model_selection import train_test_split
+    from app.services import cleaning, evaluation, fast_modeling, modeling, scoring
+
+    start = time.perf_counter()
+    target, task = lineage["target"], lineage["task"]
+    try:
+        # --- Cleaning: plan exact training penuh terakhir (baris lama tidak di-scan ulang) ---
+        cleaned = cleaning.clean_chunk(new_rows, lineage["clean_plan"])
+
+        data = cleaned[lineage["columns"]].dropna(subset=[target])
+        if len(data) < settings.INCREMENTAL_MIN_NEW_ROWS:
+            raise IncrementalError(f"baris baru setelah cleaning terlalu sedikit ({len(data)})")
+        X, y = data.drop(columns=[target]), data[target]
+
+        # Artifact di-load tanpa mmap: objek baru yang boleh dimodifikasi
+        model = joblib.load(storage.model_store().local_path(model_key))
+        if task == "classification":
+            known, seen = set(model.classes_), set(y.unique())
+            if seen != known:
+                raise IncrementalError(f"kelas target di baris baru berbeda ({sorted(map(str, seen ^ known))})")
+
+        # Hold-out baris baru untuk evaluasi (aturan split sama dengan fast engine)
+        stratify = y if task == "classification" and y.value_counts().min() >= 2 else None
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, train_size=fast_modeling.TRAIN_SIZE, random_state=fast_modeling.RANDOM_STATE, stratify=stratify
+        )
+        if task == "classification" and set(y_train.unique()) != set(model.classes_):
+            raise IncrementalError("tidak semua kelas target ada di porsi train baris baru")
+
+        before = evaluation.evaluate_model(model, task, X_test, y_test)
+
+        members = model.models if isinstance(model, fast_modeling.AveragingEnsemble) else [model]
+        report = [_update_member(pipeline, X_train, y_train, lineage["n_rows"]) for pipeline in members]
+    except IncrementalError as e:
+        return {"status": "not_incremental", "reason": str(e)}
+
+    eval_report = evaluation.evaluate_model(model, task, X_test, y_test)
+    # Artifact baru per isi dataset hasil append: model lama (dan hasil /train yang
+    # di-cache untuknya) tidak ditimpa
+    tag = f"{target}_{row_hash[:12]}"
+    model_filename = modeling.save_final_model(model, task, dataset_filename, engine="fast", tag=tag)
+    compiled_scoring = scoring.compile_and_save(model, task, model_filename, X_test)
+
+    save_lineage(model_filename, {
+        **lineage,
+        "dataset": dataset_filename,
+        "sha256": content_store.resolve(dataset_filename)["sha256"],
+        "n_rows": lineage["n_rows"] + len(new_rows),
+        "row_hash": row_hash,
+        "tag": tag,
+    })
+    logger.info(f"🔁 Retrain incremental {model_filename}: +{len(new_rows)} baris "
+                f"({time.perf_counter() - start:.2f}s)")
+
+    return {
+        "status": "success",
+        "mode": "incremental",
+        "task_type": task,
+        "metrics": eval_report.get("metrics", {}),
+        "metrics_before": before.get("metrics", {}),
+        "confusion_matrix": eval_report.get("confusion_matrix"),
+        "prediction_sample": eval_report.get("prediction_sample"),
+        "best_model_name": "Ensemble (Voting)" if len(members) > 1 else report[0]["model_id"],
+        "model_filename": model_filename,
+        "engine": "fast",
+        "training_seconds": round(time.perf_counter() - start, 3),
+        "compiled_scoring": compiled_scoring,
+        "rows_appended": len(new_rows),
+        "incremental_report": {"rows_used": len(X_train), "rows_evaluated": len(X_test), "models": report},
+    }
@@ -1,16 +1,138 @@
+import codecs
 import pandas as pd
 import os
+import time
+from typing import Any, Dict, Iterator, List, Optional
 
-def load_data(file_path: str) -> pd.DataFrame:
+from app.config import settings
+
+# Faktor kasar ukuran DataFrame di memori dibanding ukuran file CSV di disk
+CSV_MEMORY_FACTOR = 3.0
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xls')
+# Format yang boleh di-upload (manifest .json hanya ditulis server)
+UPLOAD_EXTENSIONS = ('.csv',) + EXCEL_EXTENSIONS
+# Ukuran blok saat memeriksa encoding CSV
+ENCODING_PROBE_BYTES = 1024 * 1024
+# Cache kolumnar dataset Excel di data storage: '{filename}.cache.pkl'
+CACHE_SUFFIX = ".cache.pkl"
+
+def _detect_date_columns(df: pd.DataFrame) -> List[str]:
+    """
+    Coba deteksi kolom tanggal otomatis dari sampel nilai kolom object.
+    """
+    date_cols = []
+    for col in df.columns:
+        if df[col].dtype == 'object':
+            try:
+                # Coba convert sampel (tidak semua baris agar cepat)
+                pd.to_datetime(df[col].dropna().iloc[:10], errors='raise')
+                date_cols.append(col)
+            except (ValueError, TypeError):
+                pass # Bukan tanggal, lanjut
+    return date_cols
+
+# ==========================================
+# EXCEL
+# ==========================================
+def _excel_engine(file_path: str) -> str:
+    """
+    'calamine' (reader Rust, jauh lebih cepat) jika terpasang, 'openpyxl' (read-only
+    streaming) untuk .xlsx, selain itu default pandas (xlrd untuk .xls).
+    """
+    engine = settings.EXCEL_ENGINE
+    if engine == "auto":
+        try:
+            import python_calamine  # noqa: F401
+            return "calamine"
+        except ImportError:
+            engine = "openpyxl"
+    if engine == "openpyxl" and file_path.lower().endswith('.xls'):
+        return "default"
+    return engine
+
+
+def list_sheets(file_path: str) -> List[str]:
+    """Nama sheet workbook (urutan sesuai file)."""
+    engine = "calamine" if _excel_engine(file_path) == "calamine" else None
+    return list(pd.ExcelFile(file_path, engine=engine).sheet_names)
+
+
+def _unique_columns(header) -> List[str]:
+    # Sama dengan pandas: header kosong -> 'Unnamed: i', duplikat -> 'nama.1', 'nama.2', ...
+    names, seen = [], {}
+    for i, h in enumerate(header):
+        name = f"Unnamed: {i}" if h is None else str(h)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _read_xlsx_streaming(file_path: str, sheet: Optional[str]) -> pd.DataFrame:
+    """
+    openpyxl read-only + values_only: baris dibaca sebagai tuple nilai, tanpa objek Cell
+    per sel dan tanpa konversi per sel ala pd.read_excel.
+    """
+    import openpyxl
+
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet] if sheet is not None else wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+        width = len(header)
+        data = [r if len(r) == width else (tuple(r) + (None,) * width)[:width] for r in rows]
+    finally:
+        wb.close()
+
+    # Baris kosong di akhir sheet (format sel tanpa nilai) dibuang seperti pd.read_excel
+    while data and all(v is None for v in data[-1]):
+        data.pop()
+    return pd.DataFrame.from_records(data, columns=_unique_columns(header))
+
+
+def read_excel(file_path: str, sheet: Optional[str] = None) -> pd.DataFrame:
+    """
+    Membaca satu sheet workbook (default: sheet pertama) dengan reader tercepat yang tersedia.
+    """
+    if sheet is not None:
+        sheets = list_sheets(file_path)
+        if sheet not in sheets:
+            raise ValueError(f"Sheet '{sheet}' tidak ada. Sheet tersedia: {sheets}")
+
+    engine = _excel_engine(file_path)
+    if engine == "openpyxl":
+        return _read_xlsx_streaming(file_path, sheet)
+    sheet_name = 0 if sheet is None else sheet
+    if engine == "calamine":
+        return pd.read_excel(file_path, sheet_name=sheet_name, engine="calamine")
+    return pd.read_excel(file_path, sheet_name=sheet_name)
+
+
+# ==========================================
+# LOAD
+# ==========================================
+def load_data(file_path: str, sheet: Optional[str] = None) -> pd.DataFrame:
     """
     Membaca file CSV atau Excel dan mengembalikannya sebagai Pandas DataFrame.
-    Menangani berbagai error encoding dan format.
+    Menangani berbagai error encoding dan format. `sheet` hanya untuk Excel (default: sheet pertama).
     """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File tidak ditemukan di path: {file_path}")
 
     file_ext = os.path.splitext(file_path)[1].lower()
 
+    # === HANDLING AUGMENTED (Manifest: base + kolom delta) ===
+    from app.services import augmentation
+    if augmentation.is_manifest(file_path):
+        return augmentation.load_augmented(file_path)
+
     try:
         # === HANDLING CSV ===
         if file_ext == '.csv':
@@ -23,26 +145,155 @@ def load_data(file_path: str) -> pd.DataFrame:
                 df = pd.read_csv(file_path, encoding='latin1')
         
         # === HANDLING EXCEL ===
-        elif file_ext in ['.xlsx', '.xls']:
-            df = pd.read_excel(file_path)
+        elif file_ext in EXCEL_EXTENSIONS:
+            df = read_excel(file_path, sheet)
         
         else:
             raise ValueError(f"Format file '{file_ext}' tidak didukung. Harap gunakan .csv atau .xlsx")
 
         # === OPTIONAL: AUTO DATE PARSING ===
-        # Coba deteksi kolom tanggal otomatis
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                try:
-                    # Coba convert sampel (tidak semua baris agar cepat)
-                    pd.to_datetime(df[col].dropna().iloc[:10], errors='raise')
-                    # Jika sukses, convert seluruh kolom
-                    df[col] = pd.to_datetime(df[col], errors='coerce')
-                except (ValueError, TypeError):
-                    pass # Bukan tanggal, lanjut
+        for col in _detect_date_columns(df):
+            df[col] = pd.to_datetime(df[col], errors='coerce')
 
         print(f"✅ Berhasil load data: {df.shape[0]} baris, {df.shape[1]} kolom.")
         return df
 
     except Exception as e:
-        raise ValueError(f"Gagal membaca file: {str(e)}")
\ No newline at end of file
+        raise ValueError(f"Gagal membaca file: {str(e)}")
+
+def cache_key(filename: str) -> str:
+    """Key cache kolumnar, dikunci pada isi dataset + sheet (lihat content_store.resolve)."""
+    from app.services import content_store
+    return f"{content_store.resolve(filename)['cache_id']}{CACHE_SUFFIX}"
+
+
+def build_cache(filename: str, df: pd.DataFrame) -> Optional[str]:
+    """
+    Simpan hasil load dataset Excel (sheet terpilih, tipe kolom sudah final) sebagai
+    cache kolumnar di data storage. Dipanggil sekali saat upload.
+
+    Returns:
+        Key cache, atau None jika bukan Excel / cache nonaktif.
+    """
+    from app.services import storage
+
+    if not settings.INGESTION_CACHE_ENABLED or not filename.lower().endswith(EXCEL_EXTENSIONS):
+        return None
+    store = storage.data_store()
+    key = cache_key(filename)
+    with storage.temp_path(CACHE_SUFFIX) as tmp:
+        df.to_pickle(tmp)
+        store.put_file(key, tmp)
+    return key
+
+
+def load_dataset(filename: str, file_path: Optional[str] = None) -> pd.DataFrame:
+    """
+    Load dataset dari data storage (nama file di-resolve ke blob isinya). Excel dibaca
+    dari cache kolumnar jika ada dan lebih baru dari file aslinya (berisi sheet yang
+    dipilih saat upload); selain itu load_data.
+    """
+    from app.services import storage
+
+    from app.services import content_store
+
+    store = storage.data_store()
+    resolved = content_store.resolve(filename)
+    if settings.INGESTION_CACHE_ENABLED and filename.lower().endswith(EXCEL_EXTENSIONS):
+        key = f"{resolved['cache_id']}{CACHE_SUFFIX}"
+        if store.exists(key) and store.mtime(key) >= store.mtime(resolved["key"]):
+            df = pd.read_pickle(store.local_path(key))
+            print(f"✅ Berhasil load data (cache): {df.shape[0]} baris, {df.shape[1]} kolom.")
+            return df
+    return load_data(file_path or store.local_path(resolved["key"]), sheet=resolved["sheet"])
+
+
+def benchmark_excel(file_path: str, sheet: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Waktu baca satu sheet: pd.read_excel default (jalur lama) vs reader cepat vs cache kolumnar.
+    """
+    from app.services import storage
+
+    sheet_name = 0 if sheet is None else sheet
+    report: Dict[str, Any] = {"engine": _excel_engine(file_path)}
+
+    start = time.perf_counter()
+    df = pd.read_excel(file_path, sheet_name=sheet_name)
+    report["read_excel_default_s"] = round(time.perf_counter() - start, 3)
+
+    start = time.perf_counter()
+    read_excel(file_path, sheet)
+    report["fast_reader_s"] = round(time.perf_counter() - start, 3)
+
+    with storage.temp_path(CACHE_SUFFIX) as tmp:
+        df.to_pickle(tmp)
+        start = time.perf_counter()
+        pd.read_pickle(tmp)
+        report["columnar_cache_s"] = round(time.perf_counter() - start, 3)
+
+    report["rows"], report["columns"] = df.shape
+    report["speedup_fast_reader"] = round(report["read_excel_default_s"] / max(report["fast_reader_s"], 1e-6), 1)
+    report["speedup_cache"] = round(report["read_excel_default_s"] / max(report["columnar_cache_s"], 1e-6), 1)
+    return report
+
+
+def estimate_memory_mb(file_path: str) -> float:
+    """
+    Estimasi ukuran dataset di memori (MB) tanpa membaca seluruh file.
+    """
+    size_mb = os.path.getsize(file_path) / (1024 * 1024)
+    file_ext = os.path.splitext(file_path)[1].lower()
+    if file_ext == '.csv':
+        return size_mb * CSV_MEMORY_FACTOR
+    # Excel terkompresi (zip), ukuran di memori jauh lebih besar dari file
+    return size_mb * CSV_MEMORY_FACTOR * 4
+
+
+def csv_encoding(file_path: str) -> str:
+    """
+    Encoding CSV untuk dibaca per chunk: 'utf-8' jika seluruh file valid UTF-8,
+    selain itu 'latin1'. Seluruh file diperiksa di awal (streaming, memori konstan)
+    karena byte non-UTF-8 bisa muncul setelah chunk pertama sudah diproses.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    with open(file_path, 'rb') as f:
+        try:
+            for block in iter(lambda: f.read(ENCODING_PROBE_BYTES), b''):
+                decoder.decode(block)
+            decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            return 'latin1'
+    return 'utf-8'
+
+
+def iter_chunks(file_path: str, chunk_rows: int, sheet: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Membaca file per chunk (CSV) agar memori tidak tergantung ukuran file.
+    Kolom tanggal dideteksi dari chunk pertama lalu diterapkan ke semua chunk.
+    Format lain (Excel) tidak bisa di-stream, jadi dibaca utuh sebagai satu chunk
+    (`sheet`: sheet yang dipilih saat upload, default sheet pertama).
+    """
+    file_ext = os.path.splitext(file_path)[1].lower()
+    if file_ext != '.csv':
+        yield load_data(file_path, sheet=sheet)
+        return
+
+    encoding = csv_encoding(file_path)
+    if encoding != 'utf-8':
+        print(f"⚠️ Warning: Gagal baca {file_path} dengan UTF-8, mencoba Latin-1...")
+    reader = pd.read_csv(file_path, encoding=encoding, chunksize=chunk_rows)
+    first = next(reader, None)
+    if first is None:
+        return
+
+    date_cols = _detect_date_columns(first)
+    for chunk in _chain_first(first, reader):
+        for col in date_cols:
+            chunk[col] = pd.to_datetime(chunk[col], errors='coerce')
+        yield chunk
+
+
+def _chain_first(first: pd.DataFrame, reader) -> Iterator[pd.DataFrame]:
+    yield first
+    for chunk in reader:
+        yield chunk
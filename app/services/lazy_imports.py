@@ -0,0 +1,58 @@
+import importlib
+import logging
+import threading
+import time
+from types import ModuleType
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+# LAZY IMPORT DEPENDENCY BERAT
+# ==========================================
+# PyCaret, Gemini SDK dan sklearn.metrics baru di-import saat pertama dipakai,
+# sehingga worker yang hanya melayani /upload boot cepat dan hemat memori.
+
+# Modul berat yang di-load lewat warm-up (urutan = urutan import)
+HEAVY_MODULES = [
+    "sklearn.metrics",
+    "pycaret.classification",
+    "pycaret.regression",
+    "google.generativeai",
+]
+
+_LOAD_TIMES: Dict[str, float] = {}
+_LOCK = threading.Lock()
+
+
+def load(module_name: str) -> ModuleType:
+    """
+    Import modul saat pertama dipakai dan catat durasinya (untuk startup report).
+    """
+    with _LOCK:
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        if module_name not in _LOAD_TIMES:
+            _LOAD_TIMES[module_name] = time.perf_counter() - start
+            logger.info(f"📦 Lazy import '{module_name}': {_LOAD_TIMES[module_name]:.2f}s")
+        return module
+
+
+def warm_up(modules: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Pre-load modul berat (dipanggil dari endpoint /warmup atau hook startup).
+    Modul yang tidak terpasang dilaporkan, tidak menggagalkan warm-up.
+    """
+    report = {}
+    for name in modules or HEAVY_MODULES:
+        try:
+            load(name)
+            report[name] = {"status": "loaded", "seconds": round(_LOAD_TIMES[name], 3)}
+        except ImportError as e:
+            report[name] = {"status": "unavailable", "error": str(e)}
+    return report
+
+
+def loaded_modules() -> Dict[str, float]:
+    """Durasi import (detik) per modul yang sudah di-load (tanpa lock, tidak menunggu warm-up)."""
+    return {name: round(seconds, 3) for name, seconds in list(_LOAD_TIMES.items())}
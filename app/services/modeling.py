@@ -1,35 +1,65 @@
 import pandas as pd
 import os
+import re
 import logging
-from typing import List, Dict, Any
-
-# Import PyCaret Modules
-# Kita import di dalam fungsi atau global, tapi global lebih bersih
-from pycaret.classification import (
-    setup as clf_setup, 
-    create_model as clf_create, 
-    pull as clf_pull, 
-    save_model as clf_save,
-    get_config as clf_get_config,
-    models as clf_models_list
-)
-from pycaret.regression import (
-    setup as reg_setup, 
-    create_model as reg_create, 
-    pull as reg_pull, 
-    save_model as reg_save,
-    get_config as reg_get_config,
-    models as reg_models_list
-)
+from typing import List, Dict, Any, Optional
+
+from app.config import settings
+from app.services import storage, lazy_imports, adaptive_cv
 
 # Setup Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Direktori untuk menyimpan model sementara (jika perlu)
-MODEL_SAVE_DIR = "models"
+# Sama dengan random_state engine 'fast' agar split & model bisa dibandingkan
+SESSION_ID = 123
+
+# Direktori model lokal (backend 'local'); backend lain lewat storage.model_store()
+MODEL_SAVE_DIR = settings.MODEL_DIR
 os.makedirs(MODEL_SAVE_DIR, exist_ok=True)
 
+def _pycaret(task: str):
+    """
+    Modul PyCaret ('pycaret.classification' / 'pycaret.regression'), di-import saat pertama dipakai.
+    """
+    return lazy_imports.load(f"pycaret.{task}")
+
+def model_key(dataset_filename: str, task: str, tag: Optional[str] = None) -> str:
+    """
+    Nama artifact model: '{stem dataset}_{task}_auto.pkl', atau
+    '{stem dataset}_{tag}_{task}_auto.pkl'. API memberi tag target + digest isi
+    dataset & parameter training, sehingga artifact tidak saling menimpa.
+    """
+    stem = os.path.splitext(storage.safe_key(dataset_filename))[0]
+    if tag:
+        stem = f"{stem}_{re.sub(r'[^A-Za-z0-9_.-]+', '_', tag)}"
+    return f"{stem}_{task}_auto.pkl"
+
+def save_final_model(model: Any, task: str, dataset_filename: str, engine: str = "pycaret",
+                     tag: Optional[str] = None) -> str:
+    """
+    Simpan model final sebagai artifact ringkas (lihat artifacts.save_artifact):
+    state training dibuang, array besar bisa di-mmap saat serving.
+    Engine 'pycaret': pipeline preprocessing + model dirangkai lewat save_model PyCaret dulu.
+
+    Returns:
+        Key artifact model di model storage.
+    """
+    import joblib
+    from app.services import artifacts
+
+    key = model_key(dataset_filename, task, tag)
+    if engine == "fast":
+        artifact = model
+    else:
+        with storage.temp_path(".pkl") as tmp_pkl:
+            # save_model PyCaret menambahkan ekstensi '.pkl' sendiri
+            _pycaret(task).save_model(model, tmp_pkl[:-len(".pkl")], verbose=False)
+            artifact = joblib.load(tmp_pkl)
+    # engine + task dibaca scoring untuk memilih jalur prediksi
+    artifacts.save_artifact(artifact, key, extra_meta={"engine": engine, "task": task})
+    return key
+
 def _detect_task_type(df: pd.DataFrame, target: str) -> str:
     """
     Mendeteksi apakah ini tugas Klasifikasi atau Regresi secara otomatis.
@@ -44,6 +74,42 @@ def _detect_task_type(df: pd.DataFrame, target: str) -> str:
     
     return "regression"
 
+def _train_adaptive(pc, task: str, model_ids: List[str], folds: int):
+    """
+    Adaptive CV untuk engine PyCaret: racing CV (fold demi fold, model yang kalah
+    berhenti lebih awal, LightGBM dengan early stopping) pada data train hasil
+    transform PyCaret, lalu tiap model di-fit sekali di seluruh data train lewat
+    create_model(cross_validation=False) agar tetap kompatibel dengan blend_models.
+    """
+    from app.services import fast_modeling
+
+    metric_key = "accuracy" if task == "classification" else "r2"
+    X = pc.get_config('X_train_transformed')
+    y = pc.get_config('y_train_transformed')
+    folds = fast_modeling.effective_folds(task, y, folds)
+
+    cv_results = adaptive_cv.race(
+        model_ids, adaptive_cv.cv_splits(task, y, folds, SESSION_ID), folds,
+        fast_modeling.fold_scorer(task, X, y, settings.LIGHTGBM_EARLY_STOPPING_ROUNDS, pipeline=False),
+    )
+
+    trained_models = []
+    model_metrics = []
+    for m_id in model_ids:
+        cv = cv_results[m_id]
+        if "error" in cv:
+            print(f"     ⚠️ Gagal train {m_id}: {cv['error']}")
+            continue
+        try:
+            model = pc.create_model(m_id, cross_validation=False, verbose=False, **cv["params"])
+            trained_models.append(model)
+            print(f"     ✅ {m_id.upper()} Trained. {metric_key.capitalize()}: {cv['score']:.4f} "
+                  f"({cv['cv_folds_used']}/{folds} fold, hemat {cv['time_saved_s']:.2f}s)")
+            model_metrics.append(fast_modeling.metrics_entry(m_id, metric_key, model, cv))
+        except Exception as e:
+            print(f"     ⚠️ Gagal train {m_id}: {str(e)}")
+    return trained_models, model_metrics
+
 def train_diverse_models(df: pd.DataFrame, target: str) -> Dict[str, Any]:
     """
     Melatih 3 model dari keluarga algoritma yang berbeda:
@@ -60,6 +126,9 @@ def train_diverse_models(df: pd.DataFrame, target: str) -> Dict[str, Any]:
     task = _detect_task_type(df, target)
     logger.info(f"   Task Type Detected: {task.upper()}")
 
+    # Fold CV lebih sedikit untuk dataset besar (dipakai juga oleh blend_models)
+    folds = adaptive_cv.choose_folds(len(df), settings.CV_FOLDS)
+
     trained_models = []
     model_metrics = []
 
@@ -68,9 +137,10 @@ def train_diverse_models(df: pd.DataFrame, target: str) -> Dict[str, Any]:
         # LOGIC CLASSIFICATION
         # ==========================================
         if task == "classification":
+            clf = _pycaret(task)
             # Setup Environment
             # fix_imbalance=True bagus untuk data tidak seimbang
-            clf_setup(data=df, target=target, session_id=123, verbose=False)
+            clf.setup(data=df, target=target, session_id=SESSION_ID, fold=folds, verbose=False)
             
             # Definisi 3 Model Diversifikasi
             # 'lr' = Logistic Regression
@@ -80,30 +150,35 @@ def train_diverse_models(df: pd.DataFrame, target: str) -> Dict[str, Any]:
             
             print(f"   Training models: {model_ids}...")
             
-            for m_id in model_ids:
-                try:
-                    # Train Model
-                    model = clf_create(m_id, verbose=False)
-                    trained_models.append(model)
+            if settings.ADAPTIVE_CV_ENABLED:
+                trained_models, model_metrics = _train_adaptive(clf, task, model_ids, folds)
+            else:
+                # Full k-fold CV PyCaret (perilaku lama)
+                for m_id in model_ids:
+                    try:
+                        # Train Model
+                        model = clf.create_model(m_id, verbose=False)
+                        trained_models.append(model)
                     
-                    # Ambil Metrics (Akurasi, AUC, dll)
-                    metrics_df = clf_pull()
-                    acc = metrics_df.iloc[0]['Accuracy']
-                    print(f"     ✅ {m_id.upper()} Trained. Acc: {acc:.4f}")
+                        # Ambil Metrics (Akurasi, AUC, dll)
+                        metrics_df = clf.pull()
+                        acc = metrics_df.iloc[0]['Accuracy']
+                        print(f"     ✅ {m_id.upper()} Trained. Acc: {acc:.4f}")
                     
-                    model_metrics.append({
-                        "model_id": m_id,
-                        "accuracy": acc,
-                        "model_obj": model
-                    })
-                except Exception as e:
-                    print(f"     ⚠️ Gagal train {m_id}: {str(e)}")
+                        model_metrics.append({
+                            "model_id": m_id,
+                            "accuracy": acc,
+                            "model_obj": model
+                        })
+                    except Exception as e:
+                        print(f"     ⚠️ Gagal train {m_id}: {str(e)}")
 
         # ==========================================
         # LOGIC REGRESSION
         # ==========================================
         elif task == "regression":
-            reg_setup(data=df, target=target, session_id=123, verbose=False)
+            reg = _pycaret(task)
+            reg.setup(data=df, target=target, session_id=SESSION_ID, fold=folds, verbose=False)
             
             # 'lr' = Linear Regression
             # 'dt' = Decision Tree Regressor
@@ -112,22 +187,26 @@ def train_diverse_models(df: pd.DataFrame, target: str) -> Dict[str, Any]:
             
             print(f"   Training models: {model_ids}...")
             
-            for m_id in model_ids:
-                try:
-                    model = reg_create(m_id, verbose=False)
-                    trained_models.append(model)
+            if settings.ADAPTIVE_CV_ENABLED:
+                trained_models, model_metrics = _train_adaptive(reg, task, model_ids, folds)
+            else:
+                # Full k-fold CV PyCaret (perilaku lama)
+                for m_id in model_ids:
+                    try:
+                        model = reg.create_model(m_id, verbose=False)
+                        trained_models.append(model)
                     
-                    metrics_df = reg_pull()
-                    r2 = metrics_df.iloc[0]['R2']
-                    print(f"     ✅ {m_id.upper()} Trained. R2: {r2:.4f}")
+                        metrics_df = reg.pull()
+                        r2 = metrics_df.iloc[0]['R2']
+                        print(f"     ✅ {m_id.upper()} Trained. R2: {r2:.4f}")
                     
-                    model_metrics.append({
-                        "model_id": m_id,
-                        "r2": r2,
-                        "model_obj": model
-                    })
-                except Exception as e:
-                    print(f"     ⚠️ Gagal train {m_id}: {str(e)}")
+                        model_metrics.append({
+                            "model_id": m_id,
+                            "r2": r2,
+                            "model_obj": model
+                        })
+                    except Exception as e:
+                        print(f"     ⚠️ Gagal train {m_id}: {str(e)}")
 
         else:
             raise ValueError("Unknown task type")
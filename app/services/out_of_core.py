@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Tuple
+
+from app.config import settings
+from app.services import ingestion, cleaning, selection
+from app.services.statistics import DatasetStats
+
+# Porsi budget memori untuk satu chunk dan untuk sampel training
+CHUNK_BUDGET_FRACTION = 0.25
+SAMPLE_BUDGET_FRACTION = 0.25
+
+# Nama kolom sementara untuk prioritas reservoir sampling
+_SAMPLE_KEY = "__sample_key__"
+
+
+def should_use_out_of_core(file_path: str) -> bool:
+    """
+    Mode out-of-core aktif jika dipaksa ('on'), atau ('auto') jika estimasi
+    ukuran dataset di memori melebihi MEMORY_BUDGET_MB.
+    """
+    mode = settings.OUT_OF_CORE_MODE
+    if mode == "on":
+        return True
+    if mode == "off":
+        return False
+    return ingestion.estimate_memory_mb(file_path) > settings.MEMORY_BUDGET_MB
+
+
+def _bytes_per_row(file_path: str, sheet: Optional[str] = None) -> float:
+    peek = next(ingestion.iter_chunks(file_path, 1000, sheet))
+    if len(peek) == 0:
+        return 1.0
+    return max(1.0, peek.memory_usage(deep=True).sum() / len(peek))
+
+
+def _update_sample(sample: Optional[pd.DataFrame], chunk: pd.DataFrame, size: int,
+                   rng: np.random.Generator) -> pd.DataFrame:
+    """
+    Reservoir sampling per chunk: setiap baris diberi prioritas acak,
+    simpan `size` baris dengan prioritas terkecil (sampel seragam seluruh file).
+    """
+    chunk = chunk.assign(**{_SAMPLE_KEY: rng.random(len(chunk))})
+    combined = chunk if sample is None else pd.concat([sample, chunk])
+    if len(combined) > size:
+        combined = combined.nsmallest(size, _SAMPLE_KEY)
+    return combined
+
+
+def prepare_training_frame(file_path: str, target: str, correlation_threshold: float = 0.95,
+                           sheet: Optional[str] = None) -> pd.DataFrame:
+    """
+    Pipeline Ingestion -> Cleaning -> Selection untuk dataset lebih besar dari RAM.
+    Hasil: sampel representatif dengan kolom terpilih, siap untuk training.
+    sheet: sheet Excel yang dipilih saat upload (content_store.resolve).
+    """
+    sample, clean_stats = prepare_clean_sample(file_path, sheet)
+    keep = select_columns(list(sample.columns), clean_stats, target, correlation_threshold)
+    print(f"✅ Out-of-Core Selesai. Sampel training: {sample.shape[0]} baris, {len(keep)} kolom.")
+    return sample[keep]
+
+
+def prepare_clean_sample(file_path: str, sheet: Optional[str] = None) -> Tuple[pd.DataFrame, DatasetStats]:
+    """
+    Bagian pipeline out-of-core yang tidak bergantung pada target (dipakai bersama
+    oleh training multi-target).
+
+    Pass 1: statistik mentah streaming (median, mode, IQR) -> plan cleaning.
+    Pass 2: cleaning per chunk + statistik seleksi streaming (statistics engine:
+            frekuensi nilai, co-moment korelasi) + reservoir sample baris bersih.
+    Peak memori dibatasi oleh MEMORY_BUDGET_MB, bukan ukuran file.
+
+    Returns:
+        Tuple (sampel baris bersih semua kolom, statistik seluruh baris bersih).
+    """
+    budget_bytes = settings.MEMORY_BUDGET_MB * 1024 * 1024
+    row_bytes = _bytes_per_row(file_path, sheet)
+    chunk_rows = max(1000, int(budget_bytes * CHUNK_BUDGET_FRACTION / row_bytes))
+    sample_rows = max(1000, min(
+        settings.OUT_OF_CORE_TRAIN_SAMPLE_ROWS,
+        int(budget_bytes * SAMPLE_BUDGET_FRACTION / row_bytes),
+    ))
+    print(f"💽 Mode Out-of-Core: chunk {chunk_rows} baris, sampel training {sample_rows} baris.")
+
+    # ==========================================
+    # PASS 1: Statistik mentah -> plan cleaning
+    # ==========================================
+    raw_stats = DatasetStats()
+    for chunk in ingestion.iter_chunks(file_path, chunk_rows, sheet):
+        raw_stats.update(chunk)
+    clean_plan = cleaning.build_clean_plan(raw_stats)
+    print(f"   - Pass 1 selesai: {raw_stats.n_rows} baris, {len(raw_stats.columns)} kolom.")
+
+    # ==========================================
+    # PASS 2: Clean per chunk + statistik seleksi + sampel
+    # ==========================================
+    clean_stats = DatasetStats()
+    rng = np.random.default_rng(42)
+    sample = None
+
+    for chunk in ingestion.iter_chunks(file_path, chunk_rows, sheet):
+        cleaned = cleaning.clean_chunk(chunk, clean_plan)
+        if len(cleaned) == 0:
+            continue
+        # Satu update = frekuensi nilai + co-moment korelasi
+        clean_stats.update(cleaned)
+        sample = _update_sample(sample, cleaned, sample_rows, rng)
+
+    if sample is None:
+        raise ValueError("Tidak ada baris tersisa setelah cleaning.")
+    sample = sample.sort_index().drop(columns=[_SAMPLE_KEY])
+    print(f"   - Pass 2 selesai: {clean_stats.n_rows} baris bersih "
+          f"({raw_stats.n_rows - clean_stats.n_rows} dihapus).")
+    return sample, clean_stats
+
+
+def select_columns(columns: List[str], clean_stats: DatasetStats, target: str,
+                   correlation_threshold: float = 0.95) -> List[str]:
+    """
+    Seleksi dari statistik streaming (aturan sama dengan select_features).
+
+    Returns:
+        Kolom yang dipertahankan (fitur + target).
+    """
+    features = [c for c in columns if c != target]
+    top_freq = {c: clean_stats.columns[c].top.top_frequency() for c in features}
+    constant_cols = selection.find_quasi_constant_features(top_freq)
+    if constant_cols:
+        print(f"   - Drop Quasi-Constant Features (>99% sama): {constant_cols}")
+
+    corr = clean_stats.correlation().abs()
+    numeric_cols = [c for c in clean_stats.numeric_columns() if c in corr.index]
+    numeric_features = [
+        c for c in clean_stats.numeric_columns(include_bool=False)
+        if c in corr.index and c != target and c not in constant_cols
+    ]
+
+    target_corr = {}
+    low_corr_features = []
+    if target in numeric_cols:
+        target_corr = corr[target].loc[numeric_features]
+        low_corr_features = selection.find_low_relevance_features(target_corr)
+        if low_corr_features:
+            print(f"   - Drop Low Relevance Features (Corr to Target < 0.01): {low_corr_features}")
+            target_corr = target_corr.drop(labels=low_corr_features)
+            numeric_features = [c for c in numeric_features if c not in low_corr_features]
+
+    redundant = selection.find_redundant_features(
+        corr.loc[numeric_features, numeric_features], target_corr, correlation_threshold
+    )
+    if redundant:
+        print(f"   - Drop Redundant Features (Smart Drop): {list(redundant)}")
+
+    dropped = set(constant_cols) | set(low_corr_features) | redundant
+    keep = [c for c in features if c not in dropped]
+    if target in columns:
+        keep.append(target)
+    return keep
@@ -0,0 +1,140 @@
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from app.config import settings
+from app.services.shared_frame import close_shared, export_frame, import_frame, subset_meta
+
+# ==========================================
+# BACKEND PARALEL (cleaning & selection)
+# ==========================================
+# Frame dipartisi per kolom (imputasi, statistik kolom) atau per baris (mask),
+# tiap partisi diproses di pool thread/proses, lalu hasil digabung sesuai urutan
+# partisi sehingga output identik dengan jalur serial.
+
+_THREAD_POOL = None
+_PROCESS_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def worker_count() -> int:
+    """
+    PARALLEL_WORKERS = 0 berarti pakai semua core.
+    """
+    workers = settings.PARALLEL_WORKERS
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def should_parallelize(df: pd.DataFrame) -> bool:
+    """
+    Paralel hanya jika worker > 1 dan frame cukup besar (overhead pool tidak sepadan untuk data kecil).
+    """
+    return worker_count() > 1 and df.size >= settings.PARALLEL_MIN_CELLS
+
+
+def partition_columns(columns: Sequence[str], n_parts: int) -> List[List[str]]:
+    """
+    Blok kolom berurutan (contiguous) agar penggabungan hasil menjaga urutan kolom asli.
+    """
+    columns = list(columns)
+    if not columns:
+        return []
+    n_parts = max(1, min(n_parts, len(columns)))
+    size = math.ceil(len(columns) / n_parts)
+    return [columns[i:i + size] for i in range(0, len(columns), size)]
+
+
+def partition_rows(n_rows: int, n_parts: int) -> List[Tuple[int, int]]:
+    n_parts = max(1, min(n_parts, n_rows))
+    size = math.ceil(n_rows / n_parts) if n_rows else 0
+    return [(i, min(i + size, n_rows)) for i in range(0, n_rows, size)] if size else []
+
+
+def _thread_pool() -> ThreadPoolExecutor:
+    global _THREAD_POOL
+    with _POOL_LOCK:
+        if _THREAD_POOL is None:
+            _THREAD_POOL = ThreadPoolExecutor(max_workers=worker_count(), thread_name_prefix="automl-par")
+        return _THREAD_POOL
+
+
+def _process_pool() -> ProcessPoolExecutor:
+    global _PROCESS_POOL
+    with _POOL_LOCK:
+        if _PROCESS_POOL is None:
+            _PROCESS_POOL = ProcessPoolExecutor(
+                max_workers=worker_count(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _PROCESS_POOL
+
+
+def _run_on_shared_frame(fn: Callable, meta: dict, part: Any) -> Any:
+    df, shm = import_frame(meta)
+    try:
+        return fn(df, part)
+    finally:
+        del df
+        close_shared(shm)
+
+
+def map_frame_partitions(fn: Callable, df: pd.DataFrame, partitions: List[Any], by: str = "columns",
+                         columns: Optional[List[str]] = None) -> List[Any]:
+    """
+    Jalankan fn(frame, partisi) untuk setiap partisi, hasil dikembalikan sesuai urutan partisi.
+
+    fn harus fungsi level modul (bisa di-pickle untuk backend 'process').
+    by='columns': partisi = list nama kolom (worker proses hanya menerima kolom tsb).
+    by='rows'   : partisi = (start, stop).
+    `columns` membatasi kolom yang disalin ke shared memory (backend 'process').
+
+    Backend 'process' mengirim kolom numerik lewat shared memory (tanpa pickling).
+    """
+    if settings.PARALLEL_BACKEND == "process":
+        shm, meta = export_frame(df if columns is None else df[columns])
+        try:
+            pool = _process_pool()
+            futures = [
+                pool.submit(_run_on_shared_frame, fn, subset_meta(meta, part) if by == "columns" else meta, part)
+                for part in partitions
+            ]
+            return [f.result() for f in futures]
+        finally:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+    pool = _thread_pool()
+    return list(pool.map(lambda part: fn(df, part), partitions))
+
+
+def map_columns(fn: Callable, df: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    Jalankan fn(frame, kolom) -> {kolom: hasil} per blok kolom dan gabungkan hasilnya
+    sesuai urutan kolom. Frame kecil (lihat should_parallelize) diproses serial dengan
+    fn yang sama, sehingga hasil kedua jalur identik.
+    """
+    columns = list(df.columns if columns is None else columns)
+    if not columns:
+        return {}
+    if not should_parallelize(df):
+        return fn(df, columns)
+
+    merged = {}
+    for result in map_frame_partitions(fn, df, partition_columns(columns, worker_count()), columns=columns):
+        merged.update(result)
+    return {col: merged[col] for col in columns if col in merged}
+
+
+def shutdown() -> None:
+    global _THREAD_POOL, _PROCESS_POOL
+    with _POOL_LOCK:
+        pools = [p for p in (_THREAD_POOL, _PROCESS_POOL) if p is not None]
+        _THREAD_POOL = _PROCESS_POOL = None
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -1,24 +1,108 @@
 import pandas as pd
+import numpy as np
+from typing import Any, Dict, List, Optional
 
-def generate_feature_engineering_prompt(dataset_description: str, df: pd.DataFrame, target_col: str = None) -> str:
+from app.config import settings
+
+# Estimasi kasar: 1 token ~ 4 karakter (cukup untuk budgeting, tanpa tokenizer)
+CHARS_PER_TOKEN = 4
+
+# Jumlah baris contoh yang ditampilkan ke LLM
+SAMPLE_PREVIEW_ROWS = 5
+
+
+def estimate_tokens(text: str) -> int:
     """
-    Membuat prompt terstruktur untuk LLM Agent dengan perlindungan Data Leakage.
+    Estimasi jumlah token sebuah teks (heuristik karakter / 4).
+    """
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def _sample_rows(df: pd.DataFrame, sample_rows: int) -> pd.DataFrame:
+    """
+    Ambil sampel baris terbatas agar statistik prompt O(sample), bukan O(N).
+    """
+    if len(df) <= sample_rows:
+        return df
+    return df.sample(n=sample_rows, random_state=42)
+
+
+def _rank_columns(sample: pd.DataFrame, target_col: Optional[str]) -> List[str]:
+    """
+    Urutkan kolom berdasarkan kegunaannya untuk LLM:
+    1. Kolom numerik dengan korelasi absolut tertinggi ke target (jika target numerik).
+    2. Kolom lain berdasarkan kelengkapan data (non-null ratio).
+    Target sendiri tidak ikut diranking (selalu disertakan).
+    """
+    candidates = [c for c in sample.columns if c != target_col]
+    scores = {}
+
+    target_corr = {}
+    if target_col in sample.columns and pd.api.types.is_numeric_dtype(sample[target_col]):
+        numeric = sample[candidates].select_dtypes(include=[np.number])
+        if not numeric.empty:
+            target_corr = numeric.corrwith(sample[target_col]).abs().fillna(0).to_dict()
+
+    for col in candidates:
+        completeness = 1.0 - sample[col].isnull().mean() if len(sample) else 0.0
+        # Korelasi lebih diutamakan, kelengkapan sebagai tie-breaker
+        scores[col] = target_corr.get(col, 0.0) + 0.01 * completeness
+
+    # sorted() stabil -> urutan asli dipertahankan untuk skor yang sama
+    return sorted(candidates, key=lambda c: scores[c], reverse=True)
+
+
+def _format_number(value: Any) -> str:
+    try:
+        return f"{float(value):.4g}"
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _column_summary(sample: pd.DataFrame, col: str, profile: Optional[Dict] = None) -> str:
+    """
+    Ringkasan satu baris per kolom (gabungan schema + statistik).
+    Jika profile (statistik dari upload) tersedia, nilai di situ dipakai apa adanya.
     """
-    # 1. Ambil Schema
-    schema_info = df.dtypes.to_string()
-    
-    # 2. Ambil Statistik Singkat (Agar LLM tahu distribusi data, bukan cuma sampel)
-    # Ini membantu LLM tahu ada nilai negatif atau tidak, range nilai, dll.
-    stats_info = df.describe().to_string()
-    
-    # 3. Ambil Sample CSV
-    csv_sample = df.head(5).to_csv(index=False)
-    
+    if profile and col in profile:
+        stats = profile[col]
+        parts = [f"{k}={_format_number(v)}" for k, v in stats.items() if k != "dtype"]
+        dtype = stats.get("dtype", str(sample[col].dtype) if col in sample.columns else "unknown")
+        return f"- {col} ({dtype}): " + ", ".join(parts)
+
+    series = sample[col]
+    null_pct = series.isnull().mean() * 100 if len(series) else 0.0
+    parts = [f"null={null_pct:.1f}%"]
+
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        clean = series.dropna()
+        if len(clean):
+            parts += [
+                f"min={_format_number(clean.min())}",
+                f"mean={_format_number(clean.mean())}",
+                f"std={_format_number(clean.std())}",
+                f"max={_format_number(clean.max())}",
+            ]
+    elif pd.api.types.is_datetime64_any_dtype(series):
+        clean = series.dropna()
+        if len(clean):
+            parts += [f"min={clean.min()}", f"max={clean.max()}"]
+    else:
+        counts = series.value_counts()
+        parts.append(f"unique={len(counts)}")
+        if len(counts):
+            parts.append(f"top={str(counts.index[0])[:30]!r}")
+
+    return f"- {col} ({series.dtype}): " + ", ".join(parts)
+
+
+def _render_prompt(dataset_description: str, target_col: Optional[str], column_info: str,
+                   csv_sample: str, truncated_note: str) -> str:
     # 4. Tentukan Pesan Target (Penting untuk konteks prediksi)
     target_context = ""
     if target_col:
         target_context = f"The TARGET variable we want to predict is: '{target_col}'."
-    
+
     prompt = f"""
 ### ROLE
 You are an expert Data Scientist and Feature Engineering Agent. Your goal is to create new, highly predictive features from the provided dataset to improve the accuracy of a Machine Learning model.
@@ -26,11 +110,9 @@ You are an expert Data Scientist and Feature Engineering Agent. Your goal is to
 ### CONTEXT
 1. **Dataset Description**: {dataset_description}
 2. **Target Variable**: {target_context}
-3. **Schema Info**:
-{schema_info}
-4. **Data Statistics**:
-{stats_info}
-5. **Data Sample (First 5 rows)**:
+3. **Schema & Statistics (per column, computed from a row sample)**:
+{column_info}{truncated_note}
+4. **Data Sample (First {SAMPLE_PREVIEW_ROWS} rows)**:
 {csv_sample}
 
 ### INSTRUCTION
@@ -43,6 +125,7 @@ For each feature, write a valid **Pandas Python Expression** that can be execute
 3. **NO DATA LEAKAGE**: You MUST NOT use the target column ('{target_col}') inside the 'expression'. The target is what we want to predict, it cannot be part of the input features.
 4. **Robustness**: Handle "division by zero" using `+ 1e-6` or `np.where`. Handle log of negative numbers if necessary.
 5. **Format**: Output MUST be a valid JSON list. Do not include markdown formatting (```json).
+6. **Columns**: Only use columns listed in the Schema section above.
 
 ### OUTPUT FORMAT EXAMPLE
 [
@@ -60,4 +143,83 @@ For each feature, write a valid **Pandas Python Expression** that can be execute
 
 ### YOUR RESPONSE (JSON ONLY):
 """
-    return prompt
\ No newline at end of file
+    return prompt
+
+
+def build_feature_engineering_prompt(
+    dataset_description: str,
+    df: pd.DataFrame,
+    target_col: str = None,
+    profile: Optional[Dict] = None,
+    sample_rows: int = None,
+    token_budget: int = None,
+) -> Dict[str, Any]:
+    """
+    Membuat prompt LLM dengan biaya terbatas (O(sample)):
+    1. Statistik dihitung dari sampel baris (atau diambil dari profile upload).
+    2. Kolom diranking lalu dipotong agar estimasi token tidak melebihi budget.
+
+    Returns:
+        Dictionary berisi 'prompt', 'estimated_tokens', 'columns_included',
+        dan 'columns_truncated'.
+    """
+    sample_rows = sample_rows or settings.PROMPT_SAMPLE_ROWS
+    token_budget = token_budget or settings.PROMPT_TOKEN_BUDGET
+
+    # 1. Sampel baris (statistik tidak butuh scan penuh)
+    sample = _sample_rows(df, sample_rows)
+    preview = df.head(SAMPLE_PREVIEW_ROWS)
+
+    # 2. Ranking kolom (target selalu disertakan paling awal)
+    ranked = _rank_columns(sample, target_col)
+    if target_col in df.columns:
+        ranked = [target_col] + ranked
+
+    # 3. Biaya dasar template (tanpa kolom apapun)
+    base_tokens = estimate_tokens(_render_prompt(dataset_description, target_col, "", "", ""))
+
+    included = []
+    summary_lines = []
+    used_tokens = base_tokens
+    for col in ranked:
+        line = _column_summary(sample, col, profile)
+        # Biaya kolom = baris ringkasan + nilai kolom di CSV sample
+        preview_cost = estimate_tokens(col + "," + ",".join(map(str, preview[col].tolist())))
+        cost = estimate_tokens(line) + preview_cost
+        if included and used_tokens + cost > token_budget:
+            break
+        included.append(col)
+        summary_lines.append(line)
+        used_tokens += cost
+
+    def _render(n_cols: int) -> str:
+        n_truncated = len(ranked) - n_cols
+        note = ""
+        if n_truncated:
+            note = f"\n(+{n_truncated} more columns omitted to fit the context budget)"
+        csv_sample = preview[included[:n_cols]].to_csv(index=False)
+        return _render_prompt(
+            dataset_description, target_col, "\n".join(summary_lines[:n_cols]), csv_sample, note
+        )
+
+    # 4. Estimasi per kolom bersifat kasar, pangkas sisa kelebihan dari hasil render akhir
+    prompt = _render(len(included))
+    while len(included) > 1 and estimate_tokens(prompt) > token_budget:
+        included.pop()
+        prompt = _render(len(included))
+
+    truncated = [c for c in ranked if c not in set(included)]
+
+    return {
+        "prompt": prompt,
+        "estimated_tokens": estimate_tokens(prompt),
+        "columns_included": included,
+        "columns_truncated": truncated,
+    }
+
+
+def generate_feature_engineering_prompt(dataset_description: str, df: pd.DataFrame, target_col: str = None) -> str:
+    """
+    Membuat prompt terstruktur untuk LLM Agent dengan perlindungan Data Leakage.
+    """
+    return build_feature_engineering_prompt(dataset_description, df, target_col=target_col)["prompt"]
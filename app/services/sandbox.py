@@ -0,0 +1,139 @@
+import logging
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List
+
+import pandas as pd
+
+try:
+    import resource  # Hanya tersedia di Unix
+except ImportError:
+    resource = None
+
+from app.config import settings
+from app.services import worker_slots
+from app.services.shared_frame import close_shared, export_frame, import_frame
+
+logger = logging.getLogger(__name__)
+
+# Slot worker global (dibuat sekali, dipakai ulang antar request); worker yang
+# timeout / crash diganti sendirian, job tenant lain tidak ikut gagal
+_SLOTS = None
+_SLOTS_LOCK = threading.Lock()
+
+
+# ==========================================
+# WORKER SIDE
+# ==========================================
+def _init_worker(memory_limit_mb: int) -> None:
+    """
+    Initializer worker: pasang batas memori (RLIMIT_AS) dan pre-import stack
+    pandas/numpy + compiler fitur agar job pertama tidak membayar biaya import.
+    """
+    if resource is not None and memory_limit_mb:
+        limit = int(memory_limit_mb) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    # Pre-warm
+    from app.services import feature_compiler  # noqa: F401
+
+
+def _set_cpu_limit(cpu_seconds: int) -> None:
+    """
+    RLIMIT_CPU bersifat kumulatif per proses, jadi batas dihitung relatif
+    terhadap CPU time yang sudah dipakai worker ini.
+    """
+    if resource is None or not cpu_seconds:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime)
+    soft = used + int(cpu_seconds)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _worker_execute(meta: Dict[str, Any], cpu_seconds: int, plan_items: List[Dict], dry_run: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Job di worker: compile -> dry-run -> apply. Hanya kolom BARU yang dikirim balik.
+    """
+    from app.services.feature_compiler import compile_feature_plan, dry_run_feature_plan, apply_compiled_plan
+
+    _set_cpu_limit(cpu_seconds)
+    df, shm = import_frame(meta)
+    try:
+        compiled_plan = compile_feature_plan(plan_items)
+        verdicts = {}
+        if dry_run:
+            compiled_plan, verdicts = dry_run_feature_plan(df, compiled_plan, **dry_run)
+        result, report = apply_compiled_plan(df, compiled_plan)
+
+        success = [r["name"] for r in report if r["status"] == "Success"]
+        # Disalin: kolom baru bisa berupa view kolom lama di shared memory yang ditutup di bawah
+        new_columns = {name: result[name].to_numpy(copy=True) for name in success}
+        del result
+        return {"columns": new_columns, "report": report, "verdicts": verdicts}
+    finally:
+        del df
+        close_shared(shm)
+
+
+# ==========================================
+# API SIDE
+# ==========================================
+def _get_slots() -> worker_slots.WorkerSlots:
+    global _SLOTS
+    with _SLOTS_LOCK:
+        if _SLOTS is None:
+            _SLOTS = worker_slots.WorkerSlots(
+                "sandbox",
+                size=lambda: settings.FEATURE_SANDBOX_WORKERS,
+                initializer=_init_worker,
+                initargs=(settings.FEATURE_SANDBOX_MEMORY_MB,),
+            )
+        return _SLOTS
+
+
+def warm_up() -> None:
+    """
+    Start semua worker sekarang (bukan saat request pertama).
+    """
+    for f in _get_slots().submit_all(_init_worker, 0):
+        f.result()
+    logger.info(f"🧪 Sandbox pool siap: {settings.FEATURE_SANDBOX_WORKERS} worker.")
+
+
+def shutdown() -> None:
+    _get_slots().shutdown()
+
+
+def run_feature_plan(df: pd.DataFrame, plan_items: List[Dict], dry_run: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Menjalankan plan fitur LLM di worker sandbox (proses terpisah dengan rlimit).
+    Kegagalan worker (timeout, OOM, kena batas CPU) dikembalikan sebagai report
+    terstruktur, tidak pernah menjatuhkan proses API.
+
+    Returns:
+        Dictionary berisi 'columns' (nama -> array nilai kolom baru), 'report', 'verdicts'.
+    """
+    shm, meta = export_frame(df)
+    try:
+        # Hanya worker yang menjalankan job ini yang dimatikan jika timeout / crash
+        return _get_slots().run(
+            _worker_execute, meta, settings.FEATURE_SANDBOX_CPU_S, plan_items, dry_run,
+            timeout=settings.FEATURE_SANDBOX_TIMEOUT_S,
+        )
+    except (FutureTimeoutError, BrokenProcessPool) as e:
+        reason = "timeout" if isinstance(e, FutureTimeoutError) else "worker crash (CPU/memori limit)"
+        logger.error(f"❌ Sandbox gagal: {reason}")
+        report = [
+            {"name": item.get("name", "Unknown_Feature"), "status": "Failed", "error": f"Sandbox: {reason}"}
+            for item in plan_items
+        ]
+        return {"columns": {}, "report": report, "verdicts": {}}
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
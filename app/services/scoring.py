@@ -0,0 +1,303 @@
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.config import settings
+from app.services import artifacts, storage
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+# SCORING (PREDIKSI ONLINE)
+# ==========================================
+# Jalur 'compiled': model engine 'fast' dikompilasi saat training (lihat
+# compiled_inference) dan disimpan sebagai '{key}.compiled'. Jalur 'stock':
+# model.predict (engine fast) / predict_model PyCaret, dipakai jika model tidak
+# bisa dikompilasi. Request yang datang bersamaan untuk model yang sama digabung
+# per micro-batch (maks SCORING_MAX_BATCH baris / SCORING_MAX_WAIT_MS).
+
+COMPILED_SUFFIX = ".compiled"
+SAMPLE_ROWS = 20
+
+_SCORERS: Dict[str, "Scorer"] = {}
+_BATCHERS: Dict[str, "MicroBatcher"] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+# ==========================================
+# KOMPILASI SAAT TRAINING
+# ==========================================
+def compile_and_save(model: Any, task: str, key: str, X_sample: Optional[pd.DataFrame]) -> Dict[str, Any]:
+    """
+    Kompilasi model final lalu simpan di samping artifact model. Hasil kompilasi
+    harus identik dengan model asli pada X_sample (hold-out), jika tidak -> tidak disimpan.
+
+    Returns:
+        Dictionary {status: 'compiled' | 'skipped', reason?, compile_seconds?}.
+    """
+    from app.services import compiled_inference
+
+    if not settings.SCORING_COMPILE_ENABLED or X_sample is None:
+        return {"status": "skipped", "reason": "compile nonaktif / tanpa data verifikasi"}
+
+    start = time.perf_counter()
+    try:
+        compiled = compiled_inference.compile_model(model, task, max_batch=settings.SCORING_MAX_BATCH)
+        if not compiled_inference.verify(compiled, model, X_sample, task):
+            return {"status": "skipped", "reason": "prediksi hasil kompilasi tidak identik"}
+    except ValueError as e:
+        return {"status": "skipped", "reason": str(e)}
+
+    sample = json.loads(X_sample.head(SAMPLE_ROWS).to_json(orient="records", date_format="iso"))
+    artifacts.save_artifact(
+        compiled, key + COMPILED_SUFFIX,
+        extra_meta={"task": task, "sample_records": sample},
+    )
+    elapsed = round(time.perf_counter() - start, 3)
+    logger.info(f"⚡ Model {key} dikompilasi ({elapsed}s)")
+    return {"status": "compiled", "compile_seconds": elapsed}
+
+
+# ==========================================
+# SCORER
+# ==========================================
+def _records_frame(model: Any, records: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Records JSON -> DataFrame untuk jalur stock. Pipeline engine 'fast': kolom
+    datetime (di-expand oleh step 'datetime') di-parse ulang dari string ISO.
+    """
+    df = pd.DataFrame.from_records(records)
+    from app.services.fast_modeling import AveragingEnsemble
+
+    pipeline = model.models[0] if isinstance(model, AveragingEnsemble) else model
+    steps = getattr(pipeline, "named_steps", {})
+    if "datetime" in steps and "preprocess" in steps:
+        raw = list(steps["datetime"].feature_names_in_)
+        expanded = set(steps["preprocess"].feature_names_in_)
+        df = df.reindex(columns=raw)
+        for col in raw:
+            if col not in expanded and f"{col}_year" in expanded:
+                df[col] = pd.to_datetime(df[col], errors="coerce")
+    return df
+
+
+class Scorer:
+    """
+    Prediksi untuk satu artifact model. predict(records) -> (prediksi, probabilitas atau None).
+    Dipanggil serial (lock): buffer model terkompilasi dipakai ulang antar panggilan.
+    """
+
+    def __init__(self, key: str):
+        store = storage.model_store()
+        self.key = key
+        self.version = store.mtime(key)
+        self.meta = artifacts.read_meta(key) or {}
+        self.task = self.meta.get("task")
+        self.engine = self.meta.get("engine", "pycaret")
+        self.compiled = None
+        self.sample_records: List[Dict[str, Any]] = []
+        self._model = None
+        self._lock = threading.Lock()
+
+        compiled_key = key + COMPILED_SUFFIX
+        # Artifact compiled yang lebih lama dari model (model dilatih ulang tanpa kompilasi) diabaikan
+        if store.exists(compiled_key) and store.mtime(compiled_key) >= self.version:
+            self.compiled = artifacts.load_artifact(compiled_key)
+            compiled_meta = artifacts.read_meta(compiled_key) or {}
+            self.sample_records = compiled_meta.get("sample_records", [])
+
+    @property
+    def path(self) -> str:
+        return "compiled" if self.compiled is not None else "stock"
+
+    @property
+    def model(self) -> Any:
+        if self._model is None:
+            self._model = artifacts.load_artifact(self.key)
+        return self._model
+
+    def predict_compiled(self, records: List[Dict[str, Any]]) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        with self._lock:
+            pred, proba = self.compiled.predict_records(records)
+            # Salin keluar dari buffer sebelum lock dilepas
+            return np.array(pred), None if proba is None else np.array(proba)
+
+    def predict_stock(self, records: List[Dict[str, Any]]) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        model = self.model
+        if self.engine == "fast":
+            df = _records_frame(model, records)
+            pred = np.asarray(model.predict(df))
+            proba = model.predict_proba(df) if self.task == "classification" else None
+            return pred, proba
+
+        from app.services import lazy_imports
+        pc = lazy_imports.load(f"pycaret.{self.task or 'classification'}")
+        out = pc.predict_model(model, data=pd.DataFrame.from_records(records), verbose=False)
+        return out["prediction_label"].to_numpy(), None
+
+    def predict(self, records: List[Dict[str, Any]]) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        if self.compiled is not None:
+            return self.predict_compiled(records)
+        return self.predict_stock(records)
+
+
+def get_scorer(key: str) -> Scorer:
+    """
+    Scorer per model (di-cache per proses, dibuat ulang jika artifact model berubah).
+    """
+    store = storage.model_store()
+    if not store.exists(key):
+        raise FileNotFoundError(key)
+    version = store.mtime(key)
+    with _REGISTRY_LOCK:
+        scorer = _SCORERS.get(key)
+    if scorer is None or scorer.version != version:
+        scorer = Scorer(key)
+        with _REGISTRY_LOCK:
+            _SCORERS[key] = scorer
+    return scorer
+
+
+# ==========================================
+# MICRO-BATCHING
+# ==========================================
+class MicroBatcher:
+    """
+    Satu thread per model: request yang masuk selama max_wait_ms (atau sampai
+    max_batch baris) digabung menjadi satu panggilan Scorer.predict.
+    """
+
+    def __init__(self, key: str, max_batch: int, max_wait_ms: float):
+        self.key = key
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_ms / 1000
+        self._queue: "queue.Queue[Tuple[List[Dict[str, Any]], Future]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"scoring-{key}", daemon=True)
+        self._thread.start()
+
+    def submit(self, records: List[Dict[str, Any]]) -> Future:
+        future: Future = Future()
+        self._queue.put((records, future))
+        return future
+
+    def _collect(self) -> List[Tuple[List[Dict[str, Any]], Future]]:
+        batch = [self._queue.get()]
+        rows = len(batch[0][0])
+        deadline = time.perf_counter() + self.max_wait_s
+        while rows < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            rows += len(item[0])
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            records = [r for recs, _ in batch for r in recs]
+            try:
+                scorer = get_scorer(self.key)
+                pred, proba = scorer.predict(records)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            offset = 0
+            for recs, future in batch:
+                end = offset + len(recs)
+                future.set_result({
+                    "predictions": pred[offset:end],
+                    "probabilities": None if proba is None else proba[offset:end],
+                    "path": scorer.path,
+                    "batch_rows": len(records),
+                })
+                offset = end
+
+
+def _batcher(key: str) -> MicroBatcher:
+    with _REGISTRY_LOCK:
+        batcher = _BATCHERS.get(key)
+        if batcher is None:
+            batcher = MicroBatcher(key, settings.SCORING_MAX_BATCH, settings.SCORING_MAX_WAIT_MS)
+            _BATCHERS[key] = batcher
+        return batcher
+
+
+def predict(key: str, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Prediksi records lewat micro-batcher model `key`.
+
+    Returns:
+        Dictionary {predictions, probabilities, classes, path, batch_rows, latency_ms}.
+    """
+    start = time.perf_counter()
+    scorer = get_scorer(key)
+    result = _batcher(key).submit(records).result(timeout=settings.SCORING_TIMEOUT_S)
+
+    classes = None
+    if result["probabilities"] is not None and scorer.compiled is not None:
+        classes = scorer.compiled.classes.tolist()
+    elif result["probabilities"] is not None:
+        classes = np.asarray(scorer.model.classes_).tolist()
+    return {
+        "predictions": result["predictions"].tolist(),
+        "probabilities": None if result["probabilities"] is None else result["probabilities"].tolist(),
+        "classes": classes,
+        "path": result["path"],
+        "batch_rows": result["batch_rows"],
+        "latency_ms": round(1000 * (time.perf_counter() - start), 3),
+    }
+
+
+# ==========================================
+# BENCHMARK
+# ==========================================
+def _latency_stats(times: List[float]) -> Dict[str, float]:
+    ms = 1000 * np.asarray(times)
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+    }
+
+
+def benchmark(key: str, records: Optional[List[Dict[str, Any]]] = None, n: int = 200) -> Dict[str, Any]:
+    """
+    Latensi prediksi satu baris: jalur compiled vs stock (model.predict / predict_model).
+    records default: sampel hold-out yang disimpan saat kompilasi.
+    """
+    scorer = get_scorer(key)
+    records = records or scorer.sample_records
+    if not records:
+        raise ValueError("Tidak ada records untuk benchmark")
+
+    report = {"key": key, "engine": scorer.engine, "path": scorer.path, "n": n}
+    paths = [("stock", scorer.predict_stock)]
+    if scorer.compiled is not None:
+        paths.insert(0, ("compiled", scorer.predict_compiled))
+
+    for name, fn in paths:
+        fn(records[:1])  # Warm-up (load model, alokasi buffer)
+        times = []
+        for i in range(n):
+            row = [records[i % len(records)]]
+            start = time.perf_counter()
+            fn(row)
+            times.append(time.perf_counter() - start)
+        report[name] = _latency_stats(times)
+
+    if "compiled" in report:
+        report["speedup_p50"] = round(report["stock"]["p50_ms"] / max(report["compiled"]["p50_ms"], 1e-6), 1)
+    return report
@@ -1,17 +1,76 @@
 import pandas as pd
 import numpy as np
-from sklearn.feature_selection import VarianceThreshold
+from typing import Dict, List, Optional, Set, Union
 
-def select_features(df: pd.DataFrame, target: str, correlation_threshold: float = 0.95) -> pd.DataFrame:
+from app.services.frame_view import FrameView
+from app.services.statistics import DatasetStats, compute_stats
+
+# Batas-batas filter (dipakai juga oleh mode out-of-core)
+QUASI_CONSTANT_THRESHOLD = 0.99
+LOW_RELEVANCE_THRESHOLD = 0.01
+
+def find_quasi_constant_features(top_freq: Dict[str, float]) -> List[str]:
+    """
+    Kolom yang nilai terbanyaknya mendominasi > 99% data.
+    top_freq: proporsi nilai terbanyak per kolom.
+    """
+    return [col for col, freq in top_freq.items() if freq > QUASI_CONSTANT_THRESHOLD]
+
+def find_low_relevance_features(target_corr: pd.Series) -> List[str]:
+    """
+    Kolom yang korelasi absolutnya ke target < 0.01.
+    """
+    return target_corr[target_corr < LOW_RELEVANCE_THRESHOLD].index.tolist()
+
+def find_redundant_features(corr_matrix: pd.DataFrame, target_corr, correlation_threshold: float) -> Set[str]:
+    """
+    Smart Correlation Filter: dari pasangan fitur yang saling berkorelasi tinggi,
+    buang yang korelasinya ke target LEBIH KECIL.
+    corr_matrix: korelasi absolut antar fitur numerik.
+    """
+    upper = corr_matrix.where(np.triu(np.ones(corr_matrix.shape), k=1).astype(bool))
+    
+    to_drop = set()
+
+    # Iterasi setiap pasangan fitur yang korelasinya tinggi
+    for column in upper.columns:
+        for row in upper.index:
+            if upper.loc[row, column] > correlation_threshold:
+                # Ditemukan pasangan duplikat: Fitur A (row) dan Fitur B (column)
+                
+                # LOGIKA SMART: Bandingkan korelasi mereka terhadap Target
+                if len(target_corr) > 0:
+                    score_A = target_corr.get(row, 0)
+                    score_B = target_corr.get(column, 0)
+                    
+                    # Buang yang skor korelasinya ke target LEBIH KECIL
+                    if score_A < score_B:
+                        to_drop.add(row)    # Buang A, pertahankan B
+                    else:
+                        to_drop.add(column) # Buang B, pertahankan A
+                else:
+                    # Fallback jika target bukan numerik/tidak ada: Buang kolom kedua
+                    to_drop.add(column)
+
+    return to_drop
+
+def select_features(df: Union[pd.DataFrame, FrameView], target: str, correlation_threshold: float = 0.95,
+                    stats: Optional[DatasetStats] = None) -> Union[pd.DataFrame, FrameView]:
     """
     Melakukan seleksi fitur 'Smart' Best Practice:
     1. Quasi-Constant Filter: Hapus jika 1 nilai mendominasi > 99%.
     2. Relevance Filter: Hapus fitur yang korelasi ke targetnya sangat rendah (< 0.01).
     3. Smart Correlation Filter: Hapus fitur duplikat, tapi PERTAHANKAN yang 
        korelasinya lebih tinggi terhadap Target.
+
+    Frekuensi nilai dan matriks korelasi diambil dari statistics engine (satu pass).
+    `stats` bisa diberikan jika sudah dihitung untuk df yang sama.
+    Hanya daftar kolom yang berubah: hasilnya seleksi kolom dari df (DataFrame atau FrameView), bukan salinan.
     """
     print("🔍 Memulai Advanced Feature Selection...")
     initial_cols = len(df.columns)
+    if stats is None:
+        stats = compute_stats(df)
     
     # Pisahkan fitur dan target sementara
     if target in df.columns:
@@ -27,11 +86,8 @@ def select_features(df: pd.DataFrame, target: str, correlation_threshold: float
     # ==========================================
     # Menghapus kolom yang > 99% isinya sama. 
     # Contoh: Kolom 'Negara' isinya 'Indonesia' semua, cuma 1 baris 'Malaysia'. Ini noise.
-    constant_cols = []
-    for col in X.columns:
-        # Jika nilai terbanyak muncul > 99% dari total data
-        if X[col].value_counts(normalize=True).iloc[0] > 0.99:
-            constant_cols.append(col)
+    top_freq = {col: stats.columns[col].top.top_frequency() for col in X.columns}
+    constant_cols = find_quasi_constant_features(top_freq)
     
     if constant_cols:
         print(f"   - Drop Quasi-Constant Features (>99% sama): {constant_cols}")
@@ -43,15 +99,18 @@ def select_features(df: pd.DataFrame, target: str, correlation_threshold: float
     # Kita butuh data numerik untuk korelasi
     numeric_X = X.select_dtypes(include=[np.number])
     
+    # Matriks korelasi (pairwise) seluruh kolom numerik, dihitung sekali oleh engine
+    full_corr = stats.correlation().abs()
+
     # Hitung korelasi fitur ke TARGET (Relevansi)
     target_corr = {}
     if y is not None and pd.api.types.is_numeric_dtype(y):
-        # Ini menghitung korelasi setiap kolom di X terhadap y
-        target_corr = numeric_X.corrwith(y).abs()
+        # Korelasi setiap kolom di X terhadap y
+        target_corr = full_corr.loc[numeric_X.columns, target]
         
         # 2. RELEVANCE FILTER (Opsional tapi bagus)
         # Hapus fitur yang tidak ada hubungannya sama sekali dengan target
-        low_corr_features = target_corr[target_corr < 0.01].index.tolist()
+        low_corr_features = find_low_relevance_features(target_corr)
         if low_corr_features:
             print(f"   - Drop Low Relevance Features (Corr to Target < 0.01): {low_corr_features}")
             X = X.drop(columns=low_corr_features)
@@ -63,30 +122,8 @@ def select_features(df: pd.DataFrame, target: str, correlation_threshold: float
     # 3. SMART CORRELATION FILTER (Redundancy)
     # ==========================================
     # Hitung korelasi antar fitur (A vs B)
-    corr_matrix = numeric_X.corr().abs()
-    upper = corr_matrix.where(np.triu(np.ones(corr_matrix.shape), k=1).astype(bool))
-    
-    to_drop = set()
-
-    # Iterasi setiap pasangan fitur yang korelasinya tinggi
-    for column in upper.columns:
-        for row in upper.index:
-            if upper.loc[row, column] > correlation_threshold:
-                # Ditemukan pasangan duplikat: Fitur A (row) dan Fitur B (column)
-                
-                # LOGIKA SMART: Bandingkan korelasi mereka terhadap Target
-                if len(target_corr) > 0:
-                    score_A = target_corr.get(row, 0)
-                    score_B = target_corr.get(column, 0)
-                    
-                    # Buang yang skor korelasinya ke target LEBIH KECIL
-                    if score_A < score_B:
-                        to_drop.add(row)    # Buang A, pertahankan B
-                    else:
-                        to_drop.add(column) # Buang B, pertahankan A
-                else:
-                    # Fallback jika target bukan numerik/tidak ada: Buang kolom kedua
-                    to_drop.add(column)
+    corr_matrix = full_corr.loc[numeric_X.columns, numeric_X.columns]
+    to_drop = find_redundant_features(corr_matrix, target_corr, correlation_threshold)
 
     if to_drop:
         print(f"   - Drop Redundant Features (Smart Drop): {list(to_drop)}")
@@ -95,9 +132,9 @@ def select_features(df: pd.DataFrame, target: str, correlation_threshold: float
     # ==========================================
     # 4. FINISHING
     # ==========================================
-    # Gabungkan kembali dengan target
+    # Gabungkan kembali dengan target (seleksi kolom, urutan: fitur lalu target)
     if y is not None:
-        df_final = pd.concat([X, y], axis=1)
+        df_final = df[list(X.columns) + [target]]
     else:
         df_final = X
         
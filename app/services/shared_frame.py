@@ -0,0 +1,124 @@
+import gc
+import sys
+import weakref
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+# ==========================================
+# TRANSFER DATAFRAME ANTAR PROSES VIA SHARED MEMORY
+# ==========================================
+# Kolom numerik/datetime disalin sekali ke satu blok shared memory dan dibaca
+# worker tanpa pickling (zero-copy). Kolom lain (object/kategori) tetap di-pickle.
+
+# dtype kind yang bisa dikirim lewat shared memory tanpa pickling
+SHM_KINDS = "biufmM"
+
+# Jumlah referensi ke mmap blok milik SharedMemory sendiri, dicatat saat import_frame
+_OWN_REFS: "weakref.WeakKeyDictionary[shared_memory.SharedMemory, int]" = weakref.WeakKeyDictionary()
+# Blok yang belum bisa ditutup (masih ada view). Harus tetap direferensikan:
+# SharedMemory.__del__ memanggil close() (unmap) saat objeknya dibuang.
+_LINGERING: List[shared_memory.SharedMemory] = []
+
+
+def export_frame(df: pd.DataFrame) -> Tuple[Optional[shared_memory.SharedMemory], Dict[str, Any]]:
+    """
+    Salin kolom numerik/datetime ke satu blok shared memory.
+    Pemanggil wajib close() + unlink() blok setelah semua worker selesai.
+
+    Returns:
+        Tuple (SharedMemory atau None, metadata untuk import_frame).
+    """
+    columns = []
+    shm_arrays = []
+    offset = 0
+    for name in df.columns:
+        series = df[name]
+        arr = series.to_numpy()
+        if arr.dtype.kind in SHM_KINDS and series.dtype == arr.dtype:
+            # Alignment 8 byte per kolom
+            offset = (offset + 7) // 8 * 8
+            columns.append({"name": name, "kind": "shm", "dtype": arr.dtype.str, "offset": offset})
+            shm_arrays.append((offset, arr))
+            offset += arr.nbytes
+        else:
+            # .array menjaga dtype pandas (str, Int64, category), bukan array object
+            columns.append({"name": name, "kind": "pickle", "values": series.array})
+
+    shm = None
+    if shm_arrays:
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for col_offset, arr in shm_arrays:
+            dest = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf, offset=col_offset)
+            dest[:] = arr
+
+    meta = {
+        "shm_name": shm.name if shm is not None else None,
+        "n_rows": len(df),
+        "index": df.index,
+        "columns": columns,
+    }
+    return shm, meta
+
+
+def subset_meta(meta: Dict[str, Any], columns: List[str]) -> Dict[str, Any]:
+    """
+    Metadata hanya untuk sebagian kolom (kolom pickled lain tidak ikut dikirim),
+    dengan urutan kolom mengikuti `columns`.
+    """
+    by_name = {c["name"]: c for c in meta["columns"]}
+    subset = dict(meta)
+    subset["columns"] = [by_name[name] for name in columns if name in by_name]
+    return subset
+
+
+def import_frame(meta: Dict[str, Any]) -> Tuple[pd.DataFrame, Optional[shared_memory.SharedMemory]]:
+    """
+    Bangun ulang DataFrame di worker. Kolom dari shared memory bersifat read-only.
+    Pemanggil wajib menutup blok yang dikembalikan lewat close_shared (bukan unlink).
+    """
+    shm_cols = [c for c in meta["columns"] if c["kind"] == "shm"]
+    shm = shared_memory.SharedMemory(name=meta["shm_name"]) if shm_cols else None
+    if shm is not None:
+        _OWN_REFS[shm] = sys.getrefcount(shm._mmap)
+    data = {}
+    for col in meta["columns"]:
+        if col["kind"] == "shm":
+            arr = np.ndarray((meta["n_rows"],), dtype=np.dtype(col["dtype"]), buffer=shm.buf, offset=col["offset"])
+            arr.flags.writeable = False
+            data[col["name"]] = arr
+        else:
+            data[col["name"]] = col["values"]
+
+    # copy=False: konstruktor dict menyalin array secara default (pandas >= 3)
+    df = pd.DataFrame(data, index=meta["index"], copy=False)
+    df = df[[c["name"] for c in meta["columns"]]]
+    return df, shm
+
+
+def _has_views(shm: shared_memory.SharedMemory) -> bool:
+    return sys.getrefcount(shm._mmap) > _OWN_REFS.get(shm, sys.maxsize)
+
+
+def close_shared(shm: Optional[shared_memory.SharedMemory]) -> bool:
+    """
+    Tutup blok hasil import_frame hanya jika tidak ada lagi array yang memakainya.
+    Array numpy di atas shm.buf memegang mmap-nya (bukan export buffer), sehingga
+    close() tidak menolak dan array yang tersisa menunjuk memori yang sudah di-unmap
+    (segfault saat dibaca). False: masih ada view setelah gc, blok dibiarkan ter-map
+    dan dicoba ditutup lagi pada panggilan berikutnya.
+    """
+    for old in [b for b in _LINGERING if not _has_views(b)]:
+        _LINGERING.remove(old)
+        old.close()
+    if shm is None:
+        return True
+    if _has_views(shm):
+        # View di siklus referensi (mis. frame yang dipegang traceback)
+        gc.collect()
+        if _has_views(shm):
+            _LINGERING.append(shm)
+            return False
+    shm.close()
+    return True
@@ -0,0 +1,488 @@
+import math
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.services import content_store, parallel, storage
+from app.services.frame_view import FrameView
+
+# ==========================================
+# STATISTICS ENGINE (Streaming & Mergeable)
+# ==========================================
+# Satu pass data menghasilkan: jumlah null, mean/std, min/max, quantile (KLL),
+# nilai terbanyak / mode (Misra-Gries top-k), dan korelasi (co-moment).
+# Semua estimator bisa di-update per chunk dan di-merge antar chunk, sehingga
+# dipakai bersama oleh cleaning, selection, mode out-of-core, prompt LLM dan profile upload.
+
+# Quantile eksak selama jumlah nilai per kolom <= kapasitas ini
+DEFAULT_QUANTILE_CAPACITY = 4096
+# Mode/frekuensi eksak selama jumlah nilai unik per kolom <= k
+DEFAULT_TOP_K = 1000
+# Korelasi diakumulasi per blok baris: array sementara (n_blok x kolom numerik) tetap kecil
+CORRELATION_BLOCK_ROWS = 65536
+
+
+class QuantileSketch:
+    """
+    KLL sketch untuk estimasi quantile (median, Q1, Q3).
+    Eksak (sama dengan np.quantile) selama belum ada kompaksi.
+    Kompaksi deterministik (offset bergantian), jadi hasil tidak bergantung seed.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_QUANTILE_CAPACITY):
+        self.capacity = capacity
+        self.count = 0
+        self.levels: List[np.ndarray] = [np.empty(0, dtype=np.float64)]
+        self._offsets: List[int] = [0]
+
+    def _level_capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(2, int(math.ceil(self.capacity * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) > self._level_capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                    self._offsets.append(0)
+                items = np.sort(self.levels[level])
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                items = items[: len(items) - len(keep)]
+                # Setengah item naik ke level berikut dengan bobot 2x
+                promoted = items[self._offsets[level]::2]
+                self._offsets[level] ^= 1
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                self.levels[level] = keep
+                # Kapasitas level bawah berubah jika jumlah level bertambah
+                level = 0
+                continue
+            level += 1
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        merged = QuantileSketch(self.capacity)
+        n_levels = max(len(self.levels), len(other.levels))
+        merged.levels = [
+            np.concatenate([
+                self.levels[h] if h < len(self.levels) else np.empty(0),
+                other.levels[h] if h < len(other.levels) else np.empty(0),
+            ])
+            for h in range(n_levels)
+        ]
+        merged._offsets = [0] * n_levels
+        merged.count = self.count + other.count
+        merged._compress()
+        return merged
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return np.nan
+        if len(self.levels) == 1:
+            # Belum ada kompaksi -> eksak, interpolasi linear seperti pandas
+            return float(np.quantile(self.levels[0], q))
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(lvl), 2 ** h) for h, lvl in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cum = items[order], np.cumsum(weights[order])
+        idx = int(np.searchsorted(cum, q * cum[-1], side="left"))
+        return float(items[min(idx, len(items) - 1)])
+
+
+class HeavyHitters:
+    """
+    Misra-Gries top-k: estimasi nilai paling sering muncul (mode) dan frekuensinya.
+    Eksak selama jumlah nilai unik <= k.
+    """
+
+    def __init__(self, k: int = DEFAULT_TOP_K):
+        self.k = k
+        self.total = 0
+        self.counters: Dict[Any, int] = {}
+        self.exact = True
+
+    def _compress(self) -> None:
+        if len(self.counters) <= self.k:
+            return
+        self.exact = False
+        cutoff = sorted(self.counters.values(), reverse=True)[self.k]
+        self.counters = {v: c - cutoff for v, c in self.counters.items() if c > cutoff}
+
+    def update(self, values: pd.Series) -> None:
+        counts = values.value_counts()
+        self.total += int(counts.sum())
+        # Ringkas chunk lebih dulu (vektorisasi) agar loop dict maksimal k item
+        if len(counts) > self.k:
+            self.exact = False
+            cutoff = counts.iloc[self.k]
+            counts = counts[counts > cutoff] - cutoff
+        for value, count in counts.items():
+            self.counters[value] = self.counters.get(value, 0) + int(count)
+        self._compress()
+
+    def merge(self, other: "HeavyHitters") -> "HeavyHitters":
+        merged = HeavyHitters(self.k)
+        merged.total = self.total + other.total
+        merged.exact = self.exact and other.exact
+        merged.counters = dict(self.counters)
+        for value, count in other.counters.items():
+            merged.counters[value] = merged.counters.get(value, 0) + count
+        merged._compress()
+        return merged
+
+    def mode(self) -> Any:
+        if not self.counters:
+            return None
+        best = max(self.counters.values())
+        candidates = [v for v, c in self.counters.items() if c == best]
+        # Sama seperti Series.mode(): ambil nilai terkecil jika seri
+        try:
+            return sorted(candidates)[0]
+        except TypeError:
+            return candidates[0]
+
+    def top_frequency(self) -> float:
+        """
+        Proporsi nilai terbanyak terhadap nilai non-null (batas bawah jika tidak eksak).
+        """
+        if self.total == 0 or not self.counters:
+            return 0.0
+        return max(self.counters.values()) / self.total
+
+    def nunique(self) -> Optional[int]:
+        """
+        Jumlah nilai unik (None jika melebihi k, tidak diketahui eksak).
+        """
+        return len(self.counters) if self.exact else None
+
+
+class CoMoments:
+    """
+    Akumulator korelasi pairwise-complete (sama seperti DataFrame.corr()).
+    Menyimpan jumlah ter-shift per pasangan kolom: N (baris lengkap), L (sum x),
+    Q (sum x^2) dan P (sum x*y). Karena berupa penjumlahan, bisa di-merge antar chunk.
+    """
+
+    def __init__(self, columns: List[str]):
+        self.columns = list(columns)
+        p = len(self.columns)
+        self.shift: Optional[np.ndarray] = None
+        self.N = np.zeros((p, p))
+        self.L = np.zeros((p, p))
+        self.Q = np.zeros((p, p))
+        self.P = np.zeros((p, p))
+
+    def update(self, X: np.ndarray) -> None:
+        X = np.asarray(X, dtype=np.float64)
+        if len(X) == 0:
+            return
+        present = ~np.isnan(X)
+        if self.shift is None:
+            # Shift = mean chunk pertama (stabilitas numerik)
+            counts = present.sum(axis=0)
+            sums = np.where(present, X, 0.0).sum(axis=0)
+            self.shift = np.divide(sums, counts, out=np.zeros(X.shape[1]), where=counts > 0)
+        A = np.where(present, X - self.shift, 0.0)
+        M = present.astype(np.float64)
+        self.N += M.T @ M
+        self.L += A.T @ M
+        self.Q += (A * A).T @ M
+        self.P += A.T @ A
+
+    def _reshift(self, new_shift: np.ndarray) -> "CoMoments":
+        """
+        Konversi jumlah ke shift lain: sum(x - b) = sum(x - a) + (a - b) * n, dst.
+        """
+        out = CoMoments(self.columns)
+        out.shift = new_shift
+        if self.shift is None:
+            return out
+        d = self.shift - new_shift
+        out.N = self.N.copy()
+        out.L = self.L + d[:, None] * self.N
+        out.Q = self.Q + 2 * d[:, None] * self.L + (d ** 2)[:, None] * self.N
+        out.P = self.P + d[None, :] * self.L + d[:, None] * self.L.T + np.outer(d, d) * self.N
+        return out
+
+    def merge(self, other: "CoMoments") -> "CoMoments":
+        if self.shift is None:
+            return other
+        if other.shift is None:
+            return self
+        other = other._reshift(self.shift)
+        merged = CoMoments(self.columns)
+        merged.shift = self.shift
+        merged.N = self.N + other.N
+        merged.L = self.L + other.L
+        merged.Q = self.Q + other.Q
+        merged.P = self.P + other.P
+        return merged
+
+    def corr(self) -> pd.DataFrame:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            n = np.where(self.N > 1, self.N, np.nan)
+            cov = self.P - self.L * self.L.T / n
+            var_x = self.Q - self.L ** 2 / n
+            var_y = var_x.T
+            corr = cov / np.sqrt(var_x * var_y)
+        corr = np.clip(corr, -1.0, 1.0)
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+
+class ColumnStats:
+    """
+    Statistik streaming untuk satu kolom.
+    """
+
+    def __init__(self, dtype: str, is_numeric: bool, is_bool: bool = False):
+        self.dtype = dtype
+        self.is_numeric = is_numeric
+        self.is_bool = is_bool
+        self.count = 0
+        self.nulls = 0
+        # Jumlah nilai yang masuk ke mean/M2 (non-null numerik)
+        self._n_moment = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.quantiles = QuantileSketch()
+        self.top = HeavyHitters()
+
+    def update(self, series: pd.Series) -> None:
+        # Jika tipe berubah antar chunk (angka vs teks), perlakukan sebagai non-numerik
+        if self.is_numeric and not pd.api.types.is_numeric_dtype(series):
+            self.is_numeric = False
+            self.dtype = str(series.dtype)
+        clean = series.dropna()
+        self.count += len(series)
+        self.nulls += len(series) - len(clean)
+        self.top.update(clean)
+        if self.is_numeric and len(clean):
+            values = clean.to_numpy(dtype=np.float64)
+            self._merge_moments(len(values), float(values.mean()), float(((values - values.mean()) ** 2).sum()))
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+            self.quantiles.update(values)
+
+    def _merge_moments(self, n_b: int, mean_b: float, m2_b: float) -> None:
+        # Chan et al.: gabung mean/M2 dua kelompok data
+        n_a = self._n_moment
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta ** 2 * n_a * n_b / n
+        self._n_moment = n
+
+    @property
+    def non_null(self) -> int:
+        return self.count - self.nulls
+
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self._n_moment - 1)) if self._n_moment > 1 else np.nan
+
+    def merge(self, other: "ColumnStats") -> "ColumnStats":
+        merged = ColumnStats(self.dtype, self.is_numeric and other.is_numeric, self.is_bool and other.is_bool)
+        merged.count = self.count + other.count
+        merged.nulls = self.nulls + other.nulls
+        merged.mean, merged.m2, merged._n_moment = self.mean, self.m2, self._n_moment
+        if other._n_moment:
+            merged._merge_moments(other._n_moment, other.mean, other.m2)
+        merged.min = min(self.min, other.min)
+        merged.max = max(self.max, other.max)
+        merged.quantiles = self.quantiles.merge(other.quantiles)
+        merged.top = self.top.merge(other.top)
+        return merged
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Ringkasan JSON-friendly (dipakai profile upload & prompt LLM).
+        """
+        info: Dict[str, Any] = {
+            "dtype": self.dtype,
+            "null_pct": round(100.0 * self.nulls / self.count, 2) if self.count else 0.0,
+        }
+        if self.is_numeric and not self.is_bool and self.non_null:
+            info.update({
+                "min": self.min,
+                "mean": self.mean,
+                "std": self.std(),
+                "median": self.quantiles.quantile(0.5),
+                "max": self.max,
+            })
+        else:
+            nunique = self.top.nunique()
+            info["unique"] = nunique if nunique is not None else f">{self.top.k}"
+            mode = self.top.mode()
+            if mode is not None:
+                info["top"] = str(mode)[:30]
+        return info
+
+
+class DatasetStats:
+    """
+    Statistik seluruh kolom dataset + korelasi antar kolom numerik.
+    Di-update per chunk (streaming) dan bisa di-merge (chunk paralel).
+    """
+
+    def __init__(self):
+        self.n_rows = 0
+        self.columns: Dict[str, ColumnStats] = {}
+        self.comoments: Optional[CoMoments] = None
+
+    def update(self, chunk: pd.DataFrame, correlation: bool = True) -> None:
+        # chunk: DataFrame atau FrameView (kolom dibaca satu per satu)
+        self.n_rows += len(chunk)
+        for col in chunk.columns:
+            series = chunk[col]
+            if col not in self.columns:
+                self.columns[col] = ColumnStats(
+                    str(series.dtype),
+                    pd.api.types.is_numeric_dtype(series),
+                    pd.api.types.is_bool_dtype(series),
+                )
+            self.columns[col].update(series)
+        if correlation:
+            self._update_correlation(chunk)
+
+    def _update_correlation(self, chunk: pd.DataFrame) -> None:
+        # Korelasi: kolom numerik (termasuk bool, agar target bool tetap bisa dikorelasikan)
+        if self.comoments is None:
+            self.comoments = CoMoments([c for c, s in self.columns.items() if s.is_numeric])
+        if not self.comoments.columns:
+            return
+        numeric = [
+            (j, col) for j, col in enumerate(self.comoments.columns)
+            if col in chunk.columns and pd.api.types.is_numeric_dtype(chunk.dtypes[col])
+        ]
+        for start in range(0, len(chunk), CORRELATION_BLOCK_ROWS):
+            block = chunk.iloc[start:start + CORRELATION_BLOCK_ROWS]
+            # Kolom yang tidak numerik di chunk ini dianggap kosong (NaN)
+            X = np.full((len(block), len(self.comoments.columns)), np.nan)
+            for j, col in numeric:
+                X[:, j] = block[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            self.comoments.update(X)
+
+    def merge(self, other: "DatasetStats") -> "DatasetStats":
+        merged = DatasetStats()
+        merged.n_rows = self.n_rows + other.n_rows
+        for col in list(self.columns) + [c for c in other.columns if c not in self.columns]:
+            a, b = self.columns.get(col), other.columns.get(col)
+            merged.columns[col] = a.merge(b) if a is not None and b is not None else (a or b)
+        if self.comoments is None or other.comoments is None:
+            merged.comoments = self.comoments or other.comoments
+        else:
+            merged.comoments = self.comoments.merge(other.comoments)
+        return merged
+
+    def numeric_columns(self, include_bool: bool = True) -> List[str]:
+        return [c for c, s in self.columns.items() if s.is_numeric and (include_bool or not s.is_bool)]
+
+    def correlation(self) -> pd.DataFrame:
+        """
+        Matriks korelasi Pearson (pairwise-complete) antar kolom numerik.
+        """
+        if self.comoments is None:
+            return pd.DataFrame()
+        return self.comoments.corr()
+
+    def profile(self) -> Dict[str, Any]:
+        return {
+            "n_rows": self.n_rows,
+            "columns": {col: s.summary() for col, s in self.columns.items()},
+        }
+
+
+def _column_stats_partition(df: pd.DataFrame, columns: List[str]) -> Dict[str, ColumnStats]:
+    partial = DatasetStats()
+    # Per kolom: FrameView hanya memegang satu kolom termaterialisasi per worker
+    for col in columns:
+        partial.update(df[[col]], correlation=False)
+    return partial.columns
+
+
+def compute_stats(source: Any, chunk_rows: Optional[int] = None) -> DatasetStats:
+    """
+    Hitung DatasetStats dalam satu pass.
+    source: DataFrame / FrameView (opsional dipecah per chunk_rows) atau iterable chunk DataFrame.
+
+    DataFrame besar diproses paralel per blok kolom (lihat parallel). Korelasi tetap
+    dihitung sekali di proses utama (BLAS sudah multi-thread), sehingga hasil
+    identik dengan jalur serial.
+    """
+    if isinstance(source, (pd.DataFrame, FrameView)) and not chunk_rows and parallel.should_parallelize(source):
+        parts = parallel.partition_columns(source.columns, parallel.worker_count())
+        stats = DatasetStats()
+        stats.n_rows = len(source)
+        for columns in parallel.map_frame_partitions(_column_stats_partition, source, parts):
+            stats.columns.update(columns)
+        stats._update_correlation(source)
+        return stats
+
+    if isinstance(source, (pd.DataFrame, FrameView)):
+        if chunk_rows and len(source) > chunk_rows:
+            source = (source.iloc[i:i + chunk_rows] for i in range(0, len(source), chunk_rows))
+        else:
+            source = [source]
+
+    stats = DatasetStats()
+    for chunk in source:
+        stats.update(chunk)
+    return stats
+
+
+def merge_stats(partials: Iterable[DatasetStats]) -> DatasetStats:
+    """
+    Gabungkan hasil parsial (mis. dari chunk yang diproses paralel) secara berurutan.
+    """
+    merged = DatasetStats()
+    for part in partials:
+        merged = merged.merge(part)
+    return merged
+
+
+# ==========================================
+# PROFILE UPLOAD (disimpan di samping dataset)
+# ==========================================
+PROFILE_SUFFIX = ".profile.json"
+
+
+def _json_safe(value: Any) -> Any:
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, (np.floating, np.integer)):
+        return _json_safe(value.item())
+    return value
+
+
+def save_profile(filename: str, stats: DatasetStats) -> Dict[str, Any]:
+    """
+    Simpan profile dataset ke data storage (key = isi dataset + PROFILE_SUFFIX, lihat
+    content_store.resolve): upload ulang isi yang sama memakai profile yang sama.
+    """
+    profile = stats.profile()
+    profile["columns"] = {
+        col: {k: _json_safe(v) for k, v in info.items()} for col, info in profile["columns"].items()
+    }
+    key = content_store.resolve(filename)["cache_id"] + PROFILE_SUFFIX
+    storage.put_json(storage.data_store(), key, profile)
+    return profile
+
+
+def load_profile(filename: str) -> Optional[Dict[str, Any]]:
+    store = storage.data_store()
+    resolved = content_store.resolve(filename)
+    key = resolved["cache_id"] + PROFILE_SUFFIX
+    if not store.exists(key) or not store.exists(resolved["key"]):
+        return None
+    # Profile kadaluarsa jika dataset lebih baru dari profile-nya (file lama tanpa content-address)
+    if store.mtime(key) < store.mtime(resolved["key"]):
+        return None
+    return storage.get_json(store, key)
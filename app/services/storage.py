@@ -0,0 +1,340 @@
+import contextlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, BinaryIO, Dict, Iterator, Optional
+
+try:
+    import fcntl  # Hanya tersedia di Unix
+except ImportError:
+    fcntl = None
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+# STORAGE ABSTRACTION (Dataset & Model)
+# ==========================================
+# Semua tulisan bersifat atomik (tulis ke file sementara lalu rename / PUT utuh),
+# sehingga worker uvicorn lain tidak pernah membaca file setengah jadi.
+# Read-modify-write (mis. manifest augmented) dilindungi lock per key.
+
+LOCK_TIMEOUT_S = 30.0
+LOCK_POLL_S = 0.05
+# Lease lock S3: diperbarui pemegang tiap LOCK_LEASE_S / 3, basi jika tidak berubah selama LOCK_LEASE_S
+LOCK_LEASE_S = 10.0
+# Kode error conditional write yang berarti "lock sedang/sudah dipegang pihak lain"
+_LOCK_CONFLICT_CODES = ("PreconditionFailed", "ConditionalRequestConflict", "412", "NoSuchKey", "404")
+
+
+def safe_key(name: str) -> str:
+    """
+    Normalisasi nama file dari user menjadi key yang aman (tanpa path traversal).
+    """
+    key = os.path.basename(name.replace("\\", "/"))
+    if not key or key in (".", ".."):
+        raise ValueError(f"Nama file tidak valid: '{name}'")
+    return key
+
+
+class LocalStorage:
+    """
+    Backend default: filesystem lokal / shared volume (NFS) di bawah `root`.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        path = os.path.normpath(os.path.join(self.root, key))
+        if not path.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError(f"Key di luar storage: '{key}'")
+        return path
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def local_path(self, key: str) -> str:
+        """
+        Path lokal yang bisa dibaca pandas/PyCaret.
+        """
+        return self._path(key)
+
+    def put_file(self, key: str, source_path: str) -> None:
+        """
+        Pindahkan file lokal (sudah lengkap) ke key secara atomik.
+        """
+        dest = self._path(key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = f"{dest}.{uuid.uuid4().hex}.tmp"
+        shutil.copyfile(source_path, tmp)
+        os.replace(tmp, dest)
+
+    def put_stream(self, key: str, stream: BinaryIO) -> None:
+        dest = self._path(key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = f"{dest}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                shutil.copyfileobj(stream, f)
+            os.replace(tmp, dest)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        dest = self._path(key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = f"{dest}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, dest)
+
+    def get_bytes(self, key: str) -> bytes:
+        with open(self._path(key), "rb") as f:
+            return f.read()
+
+    def mtime(self, key: str) -> float:
+        return os.path.getmtime(self._path(key))
+
+    @contextlib.contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """
+        Lock eksklusif antar proses (flock) untuk read-modify-write satu key.
+        """
+        lock_dir = os.path.join(self.root, ".locks")
+        os.makedirs(lock_dir, exist_ok=True)
+        lock_path = os.path.join(lock_dir, key.replace("/", "__") + ".lock")
+
+        if fcntl is not None:
+            with open(lock_path, "a+") as handle:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            return
+
+        # Fallback (tanpa fcntl): lock file eksklusif O_EXCL
+        deadline = time.monotonic() + LOCK_TIMEOUT_S
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                break
+            except FileExistsError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Gagal mendapatkan lock untuk '{key}'")
+                time.sleep(LOCK_POLL_S)
+        try:
+            yield
+        finally:
+            os.remove(lock_path)
+
+
+class S3Storage:
+    """
+    Backend S3-compatible (AWS S3, MinIO, atau stand-in lokal seperti moto server
+    lewat S3_ENDPOINT_URL). File dibaca lewat cache lokal per node yang
+    divalidasi dengan ETag. PUT di S3 sudah atomik, lock memakai objek lock
+    dengan conditional write (If-None-Match / If-Match) dan lease yang diperbarui.
+    """
+
+    def __init__(self, bucket: str, prefix: str, cache_dir: str, client: Any = None):
+        if client is None:
+            import boto3  # Dependency opsional, hanya untuk STORAGE_BACKEND='s3'
+            client = boto3.client("s3", endpoint_url=settings.S3_ENDPOINT_URL)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._cache_lock = threading.Lock()
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def _head(self, key: str) -> Optional[Dict[str, Any]]:
+        from botocore.exceptions import ClientError
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def exists(self, key: str) -> bool:
+        return self._head(key) is not None
+
+    def local_path(self, key: str) -> str:
+        """
+        Download ke cache lokal jika belum ada / ETag berubah, lalu kembalikan path-nya.
+        """
+        head = self._head(key)
+        if head is None:
+            raise FileNotFoundError(f"Objek tidak ditemukan: {key}")
+        etag = head["ETag"].strip('"')
+        path = os.path.join(self.cache_dir, key)
+        etag_path = path + ".etag"
+
+        with self._cache_lock:
+            if os.path.exists(path) and os.path.exists(etag_path):
+                with open(etag_path, "r") as f:
+                    if f.read() == etag:
+                        return path
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+            self.client.download_file(self.bucket, self._object_key(key), tmp)
+            os.replace(tmp, path)
+            with open(etag_path, "w") as f:
+                f.write(etag)
+        return path
+
+    def put_file(self, key: str, source_path: str) -> None:
+        self.client.upload_file(source_path, self.bucket, self._object_key(key))
+
+    def put_stream(self, key: str, stream: BinaryIO) -> None:
+        self.client.upload_fileobj(stream, self.bucket, self._object_key(key))
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=self._object_key(key), Body=data)
+
+    def get_bytes(self, key: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))["Body"].read()
+
+    def mtime(self, key: str) -> float:
+        head = self._head(key)
+        if head is None:
+            raise FileNotFoundError(f"Objek tidak ditemukan: {key}")
+        return head["LastModified"].timestamp()
+
+    def _put_lease(self, lock_key: str, token: str, renewal: int, **condition) -> str:
+        # Isi berbeda tiap pembaruan -> ETag berubah (tanda pemegang masih hidup)
+        body = json.dumps({"owner": token, "renewal": renewal}).encode("utf-8")
+        return self.client.put_object(Bucket=self.bucket, Key=lock_key, Body=body, **condition)["ETag"]
+
+    @contextlib.contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """
+        Lease lock antar node. Objek lock dibuat dengan If-None-Match dan diperbarui
+        (If-Match) oleh thread pemegang selama lock dipegang. Lock dianggap basi hanya
+        jika ETag-nya tidak berubah selama LOCK_LEASE_S (pemegang crash); ambil alih
+        dan pelepasan memakai If-Match, sehingga lock pemegang yang masih hidup tidak
+        pernah terhapus.
+        """
+        from botocore.exceptions import ClientError
+        lock_name = f".locks/{key}"
+        lock_key = self._object_key(lock_name)
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + LOCK_TIMEOUT_S
+        seen_etag, seen_at = None, 0.0
+        while True:
+            try:
+                etag = self._put_lease(lock_key, token, 0, IfNoneMatch="*")
+                break
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") not in _LOCK_CONFLICT_CODES:
+                    raise
+            head = self._head(lock_name)
+            if head is not None:
+                if head["ETag"] != seen_etag:
+                    seen_etag, seen_at = head["ETag"], time.monotonic()
+                elif time.monotonic() - seen_at > LOCK_LEASE_S:
+                    # Lease tidak diperbarui: ambil alih hanya jika objeknya masih yang sama
+                    try:
+                        etag = self._put_lease(lock_key, token, 0, IfMatch=seen_etag)
+                        logger.warning(f"⚠️ Lock basi '{key}' diambil alih (lease tidak diperbarui).")
+                        break
+                    except ClientError as e:
+                        if e.response.get("Error", {}).get("Code") not in _LOCK_CONFLICT_CODES:
+                            raise
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Gagal mendapatkan lock untuk '{key}'")
+            time.sleep(LOCK_POLL_S)
+
+        lease = {"etag": etag}
+        stop = threading.Event()
+
+        def renew() -> None:
+            renewal = 0
+            while not stop.wait(LOCK_LEASE_S / 3):
+                renewal += 1
+                try:
+                    lease["etag"] = self._put_lease(lock_key, token, renewal, IfMatch=lease["etag"])
+                except ClientError:
+                    logger.warning(f"⚠️ Lease lock '{key}' hilang (diambil alih), berhenti memperbarui.")
+                    return
+
+        renewer = threading.Thread(target=renew, name=f"lease-{key}", daemon=True)
+        renewer.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            renewer.join()
+            try:
+                self.client.delete_object(Bucket=self.bucket, Key=lock_key, IfMatch=lease["etag"])
+            except ClientError as e:
+                # Lease sudah diambil alih node lain: lock itu bukan milik kita lagi
+                if e.response.get("Error", {}).get("Code") not in _LOCK_CONFLICT_CODES:
+                    raise
+
+
+# ==========================================
+# HELPER
+# ==========================================
+_STORES: Dict[str, Any] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def _build_store(namespace: str, local_root: str):
+    if settings.STORAGE_BACKEND == "s3":
+        prefix = "/".join(p for p in (settings.S3_PREFIX.strip("/"), namespace) if p)
+        cache_dir = os.path.join(settings.STORAGE_CACHE_DIR, namespace)
+        return S3Storage(settings.S3_BUCKET, prefix, cache_dir)
+    return LocalStorage(local_root)
+
+
+def data_store():
+    """Storage untuk dataset upload, kolom augmented, manifest dan profile."""
+    with _STORES_LOCK:
+        if "data" not in _STORES:
+            _STORES["data"] = _build_store("data", settings.DATA_DIR)
+        return _STORES["data"]
+
+
+def model_store():
+    """Storage untuk artifact model hasil training."""
+    with _STORES_LOCK:
+        if "models" not in _STORES:
+            _STORES["models"] = _build_store("models", settings.MODEL_DIR)
+        return _STORES["models"]
+
+
+def put_json(store, key: str, payload: Dict[str, Any]) -> None:
+    store.put_bytes(key, json.dumps(payload, indent=2, default=str).encode("utf-8"))
+
+
+def get_json(store, key: str) -> Dict[str, Any]:
+    return json.loads(store.get_bytes(key).decode("utf-8"))
+
+
+@contextlib.contextmanager
+def temp_path(suffix: str = "") -> Iterator[str]:
+    """
+    Path file sementara untuk library yang hanya bisa menulis ke path (pandas, PyCaret).
+    """
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    try:
+        yield path
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
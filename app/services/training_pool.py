@@ -0,0 +1,332 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource  # Hanya tersedia di Unix
+except ImportError:
+    resource = None
+
+from app.config import settings
+from app.services import worker_slots
+from app.services.frame_view import FrameView, materialize
+from app.services.shared_frame import close_shared, export_frame, import_frame, subset_meta
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+# POOL WORKER TRAINING (PRE-WARMED)
+# ==========================================
+# Worker proses berumur panjang yang sudah meng-import PyCaret + LightGBM.
+# Step 5-7 (train, ensemble, evaluate, simpan model) berjalan utuh di worker
+# karena state PyCaret (setup) bersifat global per proses. Satu worker per slot
+# (lihat worker_slots): worker didaur ulang setelah TRAINING_WORKER_MAX_JOBS job,
+# diganti sendirian jika RSS-nya melewati TRAINING_WORKER_MAX_RSS_MB, dan hanya
+# worker job yang timeout / crash yang dimatikan.
+
+_SLOTS = None
+_SLOTS_LOCK = threading.Lock()
+
+# Modul yang di-load saat worker start
+WARM_MODULES = ["sklearn.metrics", "pycaret.classification", "pycaret.regression"]
+
+
+# ==========================================
+# WORKER SIDE
+# ==========================================
+def _rss_mb() -> float:
+    """RSS proses saat ini (MB)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        if resource is None:
+            return 0.0
+        # Fallback: peak RSS (KB di Linux)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _init_worker() -> None:
+    """
+    Initializer worker: import stack modeling dan inisialisasi LightGBM
+    (thread pool OpenMP) sekali, sehingga job pertama tidak membayar biayanya.
+    """
+    from app.services import lazy_imports
+
+    start = time.perf_counter()
+    lazy_imports.warm_up(WARM_MODULES)
+    try:
+        import lightgbm
+        X = np.random.default_rng(0).random((64, 4))
+        lightgbm.LGBMRegressor(n_estimators=2, verbose=-1).fit(X, X[:, 0])
+    except Exception:
+        pass
+    logger.info(f"🏋️ Training worker {os.getpid()} siap ({time.perf_counter() - start:.2f}s)")
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def run_training_job(df: pd.DataFrame, target: str, dataset_filename: str,
+                     engine: str = "pycaret", cv_folds: Optional[int] = None,
+                     model_tag: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Step 5 (Modeling) -> 6 (Ensembling) -> 7 (Evaluation) -> simpan model.
+    Dipanggil di worker pool, atau langsung di proses API jika pool nonaktif.
+    engine: 'pycaret' atau 'fast' (sklearn/LightGBM langsung, lihat fast_modeling).
+    model_tag: pembeda nama artifact (multi-target: nama target), lihat modeling.model_key.
+
+    Returns:
+        Dictionary hasil training (status, task_type, metrics, model_filename, dll).
+    """
+    from app.services import modeling, ensembling, evaluation, fast_modeling, scoring
+
+    start = time.perf_counter()
+    # --- [Step 5] Modeling ---
+    if engine == "fast":
+        train_res = fast_modeling.train_fast_models(df, target=target, folds=cv_folds)
+    else:
+        train_res = modeling.train_diverse_models(df, target=target)
+    if train_res['status'] != 'success':
+        return {"status": "error", "message": f"Training failed: {train_res.get('message')}"}
+
+    models_list = train_res['models_list']
+    task_type = train_res['task']
+    best_single_model_name = train_res['metrics_report'][0]['model_id']
+
+    # --- [Step 6] Ensembling ---
+    ensemble_res = ensembling.ensemble_models(models_list, task_type, engine=engine)
+    final_model = ensemble_res['final_model']
+
+    # --- [Step 7] Evaluation ---
+    X_test, y_test = train_res.get('holdout', (None, None))
+    eval_report = evaluation.evaluate_model(final_model, task_type, X_test, y_test)
+
+    # Simpan model final ke model storage (shared antar worker)
+    model_filename = modeling.save_final_model(final_model, task_type, dataset_filename, engine=engine, tag=model_tag)
+    # Jalur scoring cepat (hanya engine 'fast'; pipeline PyCaret memakai predict_model)
+    compiled_scoring = {"status": "skipped", "reason": "engine pycaret"}
+    if engine == "fast":
+        compiled_scoring = scoring.compile_and_save(final_model, task_type, model_filename, X_test)
+
+    return {
+        "status": "success",
+        "task_type": task_type,
+        "metrics": eval_report.get('metrics', {}),
+        "confusion_matrix": eval_report.get('confusion_matrix'),
+        "prediction_sample": eval_report.get('prediction_sample'),
+        "best_model_name": "Ensemble (Voting)" if ensemble_res['status'] == 'success' else best_single_model_name,
+        "model_filename": model_filename,
+        "engine": engine,
+        "training_seconds": round(time.perf_counter() - start, 3),
+        "compiled_scoring": compiled_scoring,
+        # Ringkasan CV per model (fold terpakai, waktu yang dihemat adaptive CV)
+        "cv_report": [
+            {k: v for k, v in m.items() if k != "model_obj"} for m in train_res['metrics_report']
+        ],
+    }
+
+
+def _close_shm(shm) -> bool:
+    """
+    Lepas blok shared memory setelah semua view dibuang. False jika masih ada view
+    (mapping dibiarkan, worker diganti setelah job agar memorinya kembali).
+    """
+    if close_shared(shm):
+        return True
+    logger.warning(f"⚠️ Shared memory {shm.name} masih direferensikan, worker {os.getpid()} akan diganti.")
+    return False
+
+
+def _worker_result(result: Dict[str, Any], shm_released: bool) -> Dict[str, Any]:
+    result["worker"] = {"pid": os.getpid(), "rss_mb": round(_rss_mb(), 1), "retire": not shm_released}
+    return result
+
+
+def _worker_train(meta: Dict[str, Any], target: str, dataset_filename: str,
+                  engine: str, cv_folds: Optional[int], model_tag: Optional[str] = None) -> Dict[str, Any]:
+    df, shm = import_frame(meta)
+    released = True
+    try:
+        if engine != "fast":
+            # Salin ke memori worker: PyCaret memodifikasi data, array shared memory read-only
+            df = df.copy()
+            released = _close_shm(shm)
+            shm = None
+        # Engine fast tidak memodifikasi data: dilatih langsung dari shared memory (tanpa salinan)
+        result = run_training_job(df, target, dataset_filename, engine, cv_folds, model_tag)
+    except Exception as e:
+        # Dikembalikan sebagai hasil (bukan diteruskan): traceback memegang frame yang
+        # mereferensikan shared memory dan dibuang di akhir blok ini
+        logger.error(f"❌ Training '{target}' gagal di worker: {e}")
+        result = {"status": "error", "message": str(e)}
+    del df
+    return _worker_result(result, _close_shm(shm) and released)
+
+
+def _worker_incremental(meta: Dict[str, Any], model_key: str, dataset_filename: str,
+                        lineage: Dict[str, Any], row_hash: str) -> Dict[str, Any]:
+    from app.services import incremental
+
+    df, shm = import_frame(meta)
+    try:
+        # Baris baru hanya dibaca (cleaning menghasilkan frame baru): tanpa salinan
+        result = incremental.retrain(df, model_key, dataset_filename, lineage, row_hash)
+    except Exception as e:
+        logger.error(f"❌ Retrain incremental {model_key} gagal di worker: {e}")
+        result = {"status": "error", "message": str(e)}
+    del df
+    return _worker_result(result, _close_shm(shm))
+
+
+# ==========================================
+# API SIDE
+# ==========================================
+def _get_slots() -> worker_slots.WorkerSlots:
+    global _SLOTS
+    with _SLOTS_LOCK:
+        if _SLOTS is None:
+            _SLOTS = worker_slots.WorkerSlots(
+                "training",
+                size=lambda: settings.TRAINING_POOL_WORKERS,
+                initializer=_init_worker,
+                max_tasks_per_child=lambda: settings.TRAINING_WORKER_MAX_JOBS,
+            )
+        return _SLOTS
+
+
+def warm_up() -> None:
+    """
+    Start semua worker di background (tidak menunggu import PyCaret selesai).
+    """
+    _get_slots().submit_all(_ping)
+    logger.info(f"🏋️ Training pool dimulai: {settings.TRAINING_POOL_WORKERS} worker.")
+
+
+def shutdown() -> None:
+    _get_slots().shutdown()
+
+
+def run_training(df: Union[pd.DataFrame, FrameView], target: str, dataset_filename: str,
+                 engine: Optional[str] = None, cv_folds: Optional[int] = None,
+                 model_tag: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Jalankan Step 5-7 di worker training pre-warmed (atau in-process jika
+    TRAINING_POOL_ENABLED=False). Timeout / crash worker dikembalikan sebagai
+    status 'error'; hanya worker job ini yang dimatikan dan diganti.
+    df boleh berupa FrameView: kolom dimaterialisasi satu per satu langsung ke
+    shared memory (tidak ada salinan frame utuh di proses API).
+    model_tag: pembeda nama artifact (lihat modeling.model_key).
+    """
+    engine = engine or settings.TRAINING_ENGINE
+    if engine not in ("pycaret", "fast"):
+        return {"status": "error", "message": f"Engine '{engine}' tidak dikenal (pycaret / fast)"}
+
+    if not settings.TRAINING_POOL_ENABLED:
+        return run_training_job(materialize(df), target, dataset_filename, engine, cv_folds, model_tag)
+
+    return _run_in_pool(_worker_train, df, target, dataset_filename, engine, cv_folds, model_tag)
+
+
+def run_incremental(new_rows: pd.DataFrame, model_key: str, dataset_filename: str,
+                    lineage: Dict[str, Any], row_hash: str) -> Dict[str, Any]:
+    """
+    Retrain incremental (incremental.retrain) di worker training; hanya baris baru
+    yang dikirim ke worker.
+    """
+    from app.services import incremental
+
+    if not settings.TRAINING_POOL_ENABLED:
+        return incremental.retrain(new_rows, model_key, dataset_filename, lineage, row_hash)
+    return _run_in_pool(_worker_incremental, new_rows, model_key, dataset_filename, lineage, row_hash)
+
+
+def _should_retire(result: Dict[str, Any]) -> bool:
+    """Ganti worker setelah job jika RSS melewati batas atau mapping shared memory bocor."""
+    worker = result.get("worker", {})
+    limit = settings.TRAINING_WORKER_MAX_RSS_MB
+    if limit and worker.get("rss_mb", 0) > limit:
+        logger.warning(f"♻️ Worker {worker.get('pid')} RSS {worker['rss_mb']} MB > {limit} MB, diganti.")
+        return True
+    return bool(worker.get("retire"))
+
+
+def _run_job(worker_fn, meta: Dict[str, Any], *args, wait: Optional[float] = None) -> Dict[str, Any]:
+    label = args[0] if args else ""
+    try:
+        return _get_slots().run(
+            worker_fn, meta, *args,
+            timeout=settings.TRAINING_TIMEOUT_S, wait=wait, retire=_should_retire,
+        )
+    except (FutureTimeoutError, BrokenProcessPool) as e:
+        reason = "timeout" if isinstance(e, FutureTimeoutError) else "worker crash"
+        logger.error(f"❌ Training worker gagal ({label}): {reason}")
+        return {"status": "error", "message": f"Training worker: {reason}"}
+
+
+def _run_in_pool(worker_fn, df: Union[pd.DataFrame, FrameView], *args) -> Dict[str, Any]:
+    shm, meta = export_frame(df)
+    try:
+        return _run_job(worker_fn, meta, *args)
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+
+def run_training_batch(df: Union[pd.DataFrame, FrameView], feature_sets: Dict[str, List[str]],
+                       dataset_filename: str, engine: Optional[str] = None,
+                       cv_folds: Optional[int] = None,
+                       model_tags: Optional[Dict[str, str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Multi-target: df (frame bersih bersama) di-export ke shared memory SEKALI untuk
+    gabungan kolom semua target; tiap target dilatih paralel di worker pool dengan
+    subset kolomnya sendiri. Artifact diberi tag per target agar tidak saling menimpa.
+    feature_sets: {target: kolom terpilih (fitur + target)}.
+    model_tags: {target: tag artifact} (default: nama target).
+
+    Returns:
+        Dictionary {target: hasil run_training_job atau status 'error'}. Gagalnya satu
+        target tidak membatalkan target lain.
+    """
+    engine = engine or settings.TRAINING_ENGINE
+    if engine not in ("pycaret", "fast"):
+        message = f"Engine '{engine}' tidak dikenal (pycaret / fast)"
+        return {target: {"status": "error", "message": message} for target in feature_sets}
+
+    tags = {target: (model_tags or {}).get(target, target) for target in feature_sets}
+    if not settings.TRAINING_POOL_ENABLED:
+        return {
+            target: run_training_job(materialize(df[columns]), target, dataset_filename, engine, cv_folds, tags[target])
+            for target, columns in feature_sets.items()
+        }
+
+    wanted = set().union(*feature_sets.values())
+    shm, meta = export_frame(df[[c for c in df.columns if c in wanted]])
+    try:
+        # Job mengantre jika target > worker: batas tunggu slot = timeout per job x jumlah gelombang,
+        # tiap job tetap dibatasi TRAINING_TIMEOUT_S setelah mendapat worker
+        waves = -(-len(feature_sets) // max(1, settings.TRAINING_POOL_WORKERS))
+        deadline = time.monotonic() + settings.TRAINING_TIMEOUT_S * waves
+        with ThreadPoolExecutor(max_workers=max(1, len(feature_sets)), thread_name_prefix="train-batch") as threads:
+            futures = {
+                target: threads.submit(
+                    _run_job, _worker_train, subset_meta(meta, columns), target,
+                    dataset_filename, engine, cv_folds, tags[target], wait=deadline - time.monotonic(),
+                )
+                for target, columns in feature_sets.items()
+            }
+            return {target: future.result() for target, future in futures.items()}
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
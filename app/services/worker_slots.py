@@ -0,0 +1,141 @@
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+# SLOT WORKER (SATU PROSES PER SLOT)
+# ==========================================
+# Pool berisi N executor 1-proses. Job memegang satu slot sampai selesai, sehingga
+# worker yang timeout / crash bisa dimatikan dan diganti sendirian tanpa menyentuh
+# job lain (ProcessPoolExecutor biasa menjadi broken seluruhnya begitu satu worker
+# mati). Dipakai sandbox fitur dan training pool.
+
+
+class _Slot:
+    def __init__(self, executor: ProcessPoolExecutor, generation: int):
+        self.executor = executor
+        self.generation = generation
+
+
+class WorkerSlots:
+    def __init__(self, name: str, size: Callable[[], int], initializer: Optional[Callable] = None,
+                 initargs: tuple = (), max_tasks_per_child: Callable[[], Optional[int]] = lambda: None):
+        """size / max_tasks_per_child dibaca dari settings saat slot pertama dibuat."""
+        self.name = name
+        self._size = size
+        self._initializer = initializer
+        self._initargs = initargs
+        self._max_tasks_per_child = max_tasks_per_child
+        self._idle: "queue.Queue[_Slot]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._started = False
+
+    def _new(self) -> ProcessPoolExecutor:
+        # 'spawn': worker bersih, tidak mewarisi state/thread proses API (wajib untuk max_tasks_per_child)
+        return ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=self._initializer,
+            initargs=self._initargs,
+            max_tasks_per_child=self._max_tasks_per_child() or None,
+        )
+
+    def _ensure(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            for _ in range(max(1, self._size())):
+                self._idle.put(_Slot(self._new(), self._generation))
+
+    def acquire(self, timeout: float) -> _Slot:
+        """Ambil slot kosong; FutureTimeoutError jika semua sibuk sampai timeout."""
+        self._ensure()
+        try:
+            return self._idle.get(timeout=max(0.0, timeout))
+        except queue.Empty:
+            raise FutureTimeoutError(f"semua worker {self.name} sibuk")
+
+    def release(self, slot: _Slot, kill: bool = False, retire: bool = False) -> None:
+        """
+        Kembalikan slot. kill=True: worker dimatikan paksa (timeout / crash);
+        retire=True: worker diganti setelah job selesai (mis. RSS melewati batas).
+        """
+        with self._lock:
+            current = self._started and slot.generation == self._generation
+        if current and not (kill or retire):
+            self._idle.put(slot)
+            return
+        if kill:
+            logger.warning(f"🔪 Worker {self.name} dimatikan (timeout / crash), diganti worker baru.")
+            _kill(slot.executor)
+        slot.executor.shutdown(wait=False, cancel_futures=True)
+        if current:
+            self._idle.put(_Slot(self._new(), slot.generation))
+
+    def run(self, fn: Callable, *args, timeout: float, wait: Optional[float] = None,
+            retire: Callable[[Any], bool] = lambda result: False) -> Any:
+        """
+        Jalankan fn(*args) di satu slot. Timeout / crash hanya mematikan worker slot
+        ini (exception diteruskan ke pemanggil); retire(result) -> ganti worker.
+        wait=None: menunggu slot kosong ikut dihitung dalam timeout; selain itu batas
+        tunggu slot terpisah dan job mendapat timeout penuh setelah slot didapat.
+        """
+        if wait is None:
+            deadline = time.monotonic() + timeout
+            slot = self.acquire(timeout)
+        else:
+            slot = self.acquire(wait)
+            deadline = time.monotonic() + timeout
+        kill = replace = False
+        try:
+            result = slot.executor.submit(fn, *args).result(timeout=max(0.0, deadline - time.monotonic()))
+            replace = retire(result)
+            return result
+        except (FutureTimeoutError, BrokenProcessPool):
+            kill = True
+            raise
+        finally:
+            self.release(slot, kill=kill, retire=replace)
+
+    def submit_all(self, fn: Callable, *args) -> List[Any]:
+        """Submit fn ke setiap slot yang sedang kosong (warm up); mengembalikan futures."""
+        self._ensure()
+        slots = []
+        while True:
+            try:
+                slots.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        futures = [slot.executor.submit(fn, *args) for slot in slots]
+        for slot in slots:
+            self._idle.put(slot)
+        return futures
+
+    def shutdown(self) -> None:
+        """Matikan slot kosong; slot yang sedang dipakai dimatikan saat dikembalikan."""
+        with self._lock:
+            self._generation += 1
+            self._started = False
+        while True:
+            try:
+                slot = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            slot.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _kill(executor: ProcessPoolExecutor) -> None:
+    for proc in list((getattr(executor, "_processes", None) or {}).values()):
+        try:
+            proc.kill()
+        except Exception:
+            pass
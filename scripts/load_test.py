@@ -0,0 +1,421 @@
+import argparse
+import io
+import json
+import os
+import random
+import socket
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# LOAD TEST API (IN-PROCESS)
+# ==========================================
+# Menjalankan app FastAPI di proses ini (uvicorn, thread terpisah) dengan data &
+# model storage di direktori sementara, Gemini diganti fake server lokal dengan
+# latency yang bisa diatur, lalu mengirim traffic campuran /upload,
+# /features/suggest, /features/apply dan /train pada request rate target
+# (open loop: request dikirim sesuai jadwal, tidak menunggu respons sebelumnya).
+# Hasil per endpoint: throughput, latency p50/p95/p99 dan error rate.
+#
+#   python -m scripts.load_test --rate 2 --duration 60 --rows 20000   (dari root repo)
+#
+# Konfigurasi app diambil dari environment seperti biasa (ADMISSION_*, TRAINING_*, ...);
+# DATA_DIR / MODEL_DIR / GEMINI_* di-override sebelum app di-import, sehingga
+# modul ini harus dijalankan sebagai proses sendiri, bukan di-import dari API.
+
+ENDPOINTS = ("upload", "suggest", "apply", "train")
+DEFAULT_MIX = {"upload": 0.2, "suggest": 0.3, "apply": 0.3, "train": 0.2}
+TARGET = "y"
+
+# Balasan fake Gemini: fitur dari kolom dataset sintetis (synthetic_frame)
+FAKE_PLAN = [
+    {"name": "f0_x_f1", "expression": "df['f0'] * df['f1']", "rationale": "Interaksi f0 dan f1"},
+    {"name": "f1_minus_f2", "expression": "df['f1'] - df['f2']", "rationale": "Selisih f1 dan f2"},
+]
+
+
+# ==========================================
+# FAKE GEMINI
+# ==========================================
+class FakeGemini:
+    """
+    Server HTTP lokal yang meniru generateContent Gemini (transport REST).
+    latency_s +- jitter_s per request; error_rate = proporsi balasan 500.
+    """
+
+    def __init__(self, latency_s: float = 1.0, jitter_s: float = 0.2, error_rate: float = 0.0,
+                 plan: Optional[List[Dict[str, Any]]] = None):
+        self.latency_s = latency_s
+        self.jitter_s = jitter_s
+        self.error_rate = error_rate
+        self.plan = plan or FAKE_PLAN
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-gemini", daemon=True)
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                with fake._lock:
+                    fake.calls += 1
+                time.sleep(max(0.0, random.uniform(fake.latency_s - fake.jitter_s, fake.latency_s + fake.jitter_s)))
+                if random.random() < fake.error_rate:
+                    return self._reply(500, {"error": {"code": 500, "message": "fake error", "status": "INTERNAL"}})
+                self._reply(200, {"candidates": [{
+                    "content": {"parts": [{"text": json.dumps(fake.plan)}], "role": "model"},
+                    "finishReason": 1,
+                    "index": 0,
+                }]})
+
+            def _reply(self, status: int, body: Dict[str, Any]):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeGemini":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# ==========================================
+# APP IN-PROCESS
+# ==========================================
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class AppServer:
+    """app.main dijalankan uvicorn di thread background (startup/shutdown hook ikut jalan)."""
+
+    def __init__(self, port: Optional[int] = None):
+        import uvicorn
+        from app.main import app
+
+        self.port = port or _free_port()
+        self._server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, name="load-test-api", daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout: float = 60.0) -> "AppServer":
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("API tidak berhasil start")
+            time.sleep(0.05)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=60)
+
+
+# ==========================================
+# HTTP CLIENT
+# ==========================================
+def _request(url: str, body: bytes, content_type: str, timeout: float) -> int:
+    request = urllib.request.Request(url, data=body, method="POST", headers={"Content-Type": content_type})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def _get_json(url: str) -> Dict[str, Any]:
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def _multipart(filename: str, content: bytes):
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        "Content-Type: text/csv\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+# ==========================================
+# TRAFFIC
+# ==========================================
+def synthetic_frame(n_rows: int, n_numeric: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Dataset uji: kolom numerik (sebagian dengan nilai kosong), satu kolom kategori
+    dan target numerik 'y' yang berkorelasi dengan semua fitur.
+    """
+    rng = np.random.default_rng(seed)
+    cols = {f"f{i}": rng.normal(size=n_rows) for i in range(n_numeric)}
+    y = sum(w * cols[f"f{i}"] for i, w in enumerate(rng.uniform(0.5, 1.5, size=n_numeric)))
+    for i in range(max(1, n_numeric // 4)):
+        cols[f"f{i}"][rng.random(n_rows) < 0.02] = np.nan
+    cols["cat"] = pd.array(rng.choice(["a", "b", "c"], n_rows))
+    cols["y"] = y + rng.normal(size=n_rows)
+    return pd.DataFrame(cols)
+
+
+def dataset_csv(n_rows: int, n_numeric: int, seed: int) -> bytes:
+    buffer = io.StringIO()
+    synthetic_frame(n_rows, n_numeric, seed=seed).to_csv(buffer, index=False)
+    return buffer.getvalue().encode()
+
+
+class LoadTest:
+    """
+    Traffic campuran ke API yang sudah jalan di base_url. Dataset hasil upload
+    (setup + traffic /upload) menjadi pool untuk request suggest / apply / train.
+    """
+
+    def __init__(self, base_url: str, rate: float, duration_s: float, mix: Dict[str, float],
+                 n_rows: int = 5000, n_numeric: int = 8, datasets: int = 3, engine: str = "fast",
+                 cv_folds: Optional[int] = 3, concurrency: int = 32, timeout_s: float = 600.0, seed: int = 0):
+        self.base_url = base_url
+        self.rate = rate
+        self.duration_s = duration_s
+        self.mix = {k: v for k, v in mix.items() if v > 0}
+        self.n_rows = n_rows
+        self.n_numeric = n_numeric
+        self.datasets = datasets
+        self.engine = engine
+        self.cv_folds = cv_folds
+        self.concurrency = concurrency
+        self.timeout_s = timeout_s
+        self.random = random.Random(seed)
+        self.filenames: List[str] = []
+        self.samples: List[Dict[str, Any]] = []
+        self._seed = seed
+        self._lock = threading.Lock()
+
+    def _next_seed(self) -> int:
+        with self._lock:
+            self._seed += 1
+            return self._seed
+
+    def _pick_dataset(self) -> str:
+        with self._lock:
+            return self.random.choice(self.filenames)
+
+    def _upload(self) -> int:
+        seed = self._next_seed()
+        body, content_type = _multipart(f"load_{seed}.csv", dataset_csv(self.n_rows, self.n_numeric, seed))
+        status = _request(f"{self.base_url}/upload", body, content_type, self.timeout_s)
+        if status == 200:
+            with self._lock:
+                self.filenames.append(f"load_{seed}.csv")
+        return status
+
+    def _payload(self, endpoint: str, i: int) -> Dict[str, Any]:
+        filename = self._pick_dataset()
+        if endpoint == "suggest":
+            # Deskripsi unik: saran LLM tidak diambil dari cache hasil
+            return {"filename": filename, "description": f"Load test request {i}"}
+        if endpoint == "apply":
+            return {"filename": filename, "plan": FAKE_PLAN}
+        return {"filename": filename, "target_column": TARGET, "engine": self.engine, "cv_folds": self.cv_folds}
+
+    def setup(self) -> None:
+        print(f"📦 Upload {self.datasets} dataset sintetis ({self.n_rows} baris x {self.n_numeric + 2} kolom)...")
+        for _ in range(self.datasets):
+            status = self._upload()
+            if status != 200:
+                raise RuntimeError(f"Upload setup gagal (HTTP {status})")
+
+    def _send(self, endpoint: str, i: int, scheduled: float) -> None:
+        start = time.perf_counter()
+        try:
+            if endpoint == "upload":
+                status = self._upload()
+            else:
+                path = {"suggest": "/features/suggest", "apply": "/features/apply", "train": "/train"}[endpoint]
+                status = _request(self.base_url + path, json.dumps(self._payload(endpoint, i)).encode(),
+                                  "application/json", self.timeout_s)
+            error = None
+        except Exception as e:
+            status, error = None, type(e).__name__
+        end = time.perf_counter()
+        with self._lock:
+            self.samples.append({
+                "endpoint": endpoint, "status": status, "error": error,
+                "latency_s": end - start, "send_lag_s": start - scheduled, "end": end,
+            })
+
+    def run(self) -> Dict[str, Any]:
+        """Kirim request dengan jarak antar kedatangan eksponensial (Poisson) selama duration_s."""
+        names, weights = list(self.mix), list(self.mix.values())
+        print(f"🚦 Traffic {self.rate} req/s selama {self.duration_s}s, mix {self.mix}...")
+        start = time.perf_counter()
+        scheduled, i = start, 0
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="load-test") as executor:
+            while True:
+                scheduled += self.random.expovariate(self.rate)
+                if scheduled - start > self.duration_s:
+                    break
+                time.sleep(max(0.0, scheduled - time.perf_counter()))
+                executor.submit(self._send, self.random.choices(names, weights)[0], i, scheduled)
+                i += 1
+        return report(self.samples, start, time.perf_counter())
+
+
+# ==========================================
+# REPORT
+# ==========================================
+def _summary(samples: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    latencies = np.array([s["latency_s"] for s in samples])
+    ok = [s for s in samples if s["status"] is not None and s["status"] < 400]
+    statuses: Dict[str, int] = {}
+    for s in samples:
+        code = str(s["status"]) if s["status"] is not None else s["error"]
+        statuses[code] = statuses.get(code, 0) + 1
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0.0, 0.0, 0.0)
+    return {
+        "requests": len(samples),
+        "ok": len(ok),
+        "error_rate": round(1 - len(ok) / len(samples), 4) if samples else 0.0,
+        "throughput_rps": round(len(ok) / elapsed, 3) if elapsed > 0 else 0.0,
+        "p50_s": round(float(p50), 3),
+        "p95_s": round(float(p95), 3),
+        "p99_s": round(float(p99), 3),
+        "max_send_lag_s": round(max((s["send_lag_s"] for s in samples), default=0.0), 3),
+        "status_codes": statuses,
+    }
+
+
+def report(samples: List[Dict[str, Any]], start: float, end: float) -> Dict[str, Any]:
+    """
+    Ringkasan per endpoint + total. Durasi throughput = sampai respons terakhir selesai
+    (request yang masih jalan saat jadwal habis tetap dihitung).
+    """
+    end = max([end] + [s["end"] for s in samples])
+    elapsed = end - start
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "endpoints": {name: _summary([s for s in samples if s["endpoint"] == name], elapsed)
+                      for name in ENDPOINTS if any(s["endpoint"] == name for s in samples)},
+        "total": _summary(samples, elapsed),
+    }
+
+
+def print_report(result: Dict[str, Any]) -> None:
+    print(f"\n📊 Hasil load test ({result['elapsed_s']}s)")
+    print(f"{'endpoint':<10}{'req':>6}{'ok':>6}{'err%':>8}{'rps':>8}{'p50':>9}{'p95':>9}{'p99':>9}  status")
+    rows = {**result["endpoints"], "total": result["total"]}
+    for name, s in rows.items():
+        print(f"{name:<10}{s['requests']:>6}{s['ok']:>6}{s['error_rate'] * 100:>7.1f}%{s['throughput_rps']:>8.2f}"
+              f"{s['p50_s']:>8.2f}s{s['p95_s']:>8.2f}s{s['p99_s']:>8.2f}s  {s['status_codes']}")
+    if result["total"]["max_send_lag_s"] > 1.0:
+        print(f"⚠️ Request terlambat dikirim hingga {result['total']['max_send_lag_s']}s: "
+              "naikkan --concurrency, rate target belum tercapai.")
+
+
+# ==========================================
+# CLI
+# ==========================================
+def _parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Endpoint '{name}' tidak dikenal (pilihan: {', '.join(ENDPOINTS)})")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Load test API AutoML in-process dengan fake Gemini.")
+    parser.add_argument("--rate", type=float, default=1.0, help="Request per detik (rata-rata, kedatangan Poisson)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Lama pengiriman traffic (detik)")
+    parser.add_argument("--mix", type=_parse_mix, default=DEFAULT_MIX,
+                        help="Bobot endpoint, mis. upload=0.2,suggest=0.3,apply=0.3,train=0.2")
+    parser.add_argument("--rows", type=int, default=5000, help="Baris per dataset sintetis")
+    parser.add_argument("--numeric", type=int, default=8, help="Kolom numerik per dataset sintetis")
+    parser.add_argument("--datasets", type=int, default=3, help="Dataset yang di-upload sebelum traffic")
+    parser.add_argument("--engine", default="fast", help="Training engine untuk /train")
+    parser.add_argument("--cv-folds", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=32, help="Maks request in-flight dari client")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Timeout per request (detik)")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Latency fake Gemini (detik)")
+    parser.add_argument("--llm-jitter", type=float, default=0.2)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", default=None, help="Direktori data/model (default: direktori sementara)")
+    parser.add_argument("--output", default=None, help="Simpan hasil sebagai JSON")
+    args = parser.parse_args(argv)
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="automl_load_test_")
+    fake = FakeGemini(args.llm_latency, args.llm_jitter, args.llm_error_rate).start()
+    # Harus sebelum app di-import: settings dan worker training (spawn) membaca environment
+    os.environ.update({
+        "DATA_DIR": os.path.join(work_dir, "data"),
+        "MODEL_DIR": os.path.join(work_dir, "models"),
+        "STORAGE_BACKEND": "local",
+        "GEMINI_API_KEY": "load-test",
+        "GEMINI_API_ENDPOINT": fake.endpoint,
+    })
+    print(f"🧪 Work dir {work_dir}, fake Gemini {fake.endpoint} (latency {args.llm_latency}s)")
+
+    server = AppServer().start()
+    try:
+        test = LoadTest(
+            server.url, args.rate, args.duration, args.mix, n_rows=args.rows, n_numeric=args.numeric,
+            datasets=args.datasets, engine=args.engine, cv_folds=args.cv_folds,
+            concurrency=args.concurrency, timeout_s=args.timeout, seed=args.seed,
+        )
+        test.setup()
+        result = test.run()
+        try:
+            result["admission"] = _get_json(f"{server.url}/admission")
+        except Exception:
+            pass
+    finally:
+        server.stop()
+        fake.stop()
+
+    result["config"] = {**vars(args), "work_dir": work_dir, "llm_calls": fake.calls}
+    print_report(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2, default=str)
+        print(f"💾 Hasil disimpan ke {args.output}")
+    return result
+
+
+if __name__ == "__main__":
+    main()
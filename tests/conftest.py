@@ -0,0 +1,14 @@
+import os
+import tempfile
+
+# Data & model storage test di direktori sementara; harus di-set sebelum app.config di-import
+_WORK_DIR = tempfile.mkdtemp(prefix="automl_tests_")
+os.environ.update({
+    "DATA_DIR": os.path.join(_WORK_DIR, "data"),
+    "MODEL_DIR": os.path.join(_WORK_DIR, "models"),
+    "STORAGE_BACKEND": "local",
+    "STORAGE_CACHE_DIR": os.path.join(_WORK_DIR, "storage_cache"),
+})
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DATA_DIR = os.path.join(REPO_DIR, "data")
@@ -0,0 +1,127 @@
+import math
+import threading
+import time
+
+import pytest
+
+from app import main
+from app.config import settings
+from app.services import admission
+
+
+def _cost(seconds: float, slots: int = 1, memory_mb: float = 100.0, key: str = "test") -> dict:
+    return {"kind": "train", "calibration_key": key, "units": 1.0, "cpu_slots": slots,
+            "memory_mb": memory_mb, "est_seconds": seconds}
+
+
+@pytest.fixture(autouse=True)
+def budget(monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_CPU_SLOTS", 2)
+    monkeypatch.setattr(settings, "ADMISSION_MEMORY_MB", 1000)
+    monkeypatch.setattr(settings, "ADMISSION_MAX_WAIT_S", 5.0)
+    monkeypatch.setattr(settings, "ADMISSION_MAX_QUEUE", 8)
+    monkeypatch.setattr(settings, "ADMISSION_AGING", 1.0)
+    monkeypatch.setattr(admission, "_CALIBRATION", {})
+    monkeypatch.setattr(admission, "CALIBRATION_KEY", "admission/test_calibration.json")
+    monkeypatch.setattr(admission, "_RUNNING", [])
+    monkeypatch.setattr(admission, "_QUEUE", [])
+
+
+def _wait_queued(n: int) -> None:
+    deadline = time.monotonic() + 5
+    while len(admission.status()["queued"]) < n:
+        assert time.monotonic() < deadline, "request tidak masuk antrean"
+        time.sleep(0.01)
+
+
+def test_fitting_request_is_admitted_immediately():
+    first = admission.acquire(_cost(1.0, memory_mb=400))
+    second = admission.acquire(_cost(1.0, memory_mb=400))
+
+    assert len(admission.status()["running"]) == 2
+    admission.release(first, succeeded=True)
+    admission.release(second, succeeded=False)
+    assert admission.status()["running"] == []
+    # Hanya request yang berhasil dicatat untuk kalibrasi
+    assert admission.status()["calibration_samples"] == {"test": 1}
+
+
+def test_over_budget_request_is_queued_then_admitted():
+    blocker = admission.acquire(_cost(1.0, slots=2))
+    admitted = threading.Event()
+
+    def waiter():
+        admission.release(admission.acquire(_cost(1.0, memory_mb=50)), succeeded=False)
+        admitted.set()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    _wait_queued(1)
+    assert not admitted.is_set()
+
+    admission.release(blocker, succeeded=False)
+    thread.join(timeout=5)
+    assert admitted.is_set()
+    assert admission.status()["queued"] == []
+
+
+def test_shortest_job_first_with_aging():
+    now = time.monotonic()
+    long_job, short_job = admission._Ticket(_cost(10.0)), admission._Ticket(_cost(1.0))
+    assert short_job.priority(now) < long_job.priority(now)
+    # Setelah menunggu cukup lama, job besar tidak lagi kalah dari job pendek baru
+    long_job.enqueued -= 20
+    assert long_job.priority(now) < short_job.priority(now)
+
+
+def test_queue_admits_shortest_job_first():
+    blocker = admission.acquire(_cost(0.5, slots=2))
+    order = []
+
+    def run(seconds):
+        ticket = admission.acquire(_cost(seconds, slots=2))
+        order.append(seconds)
+        admission.release(ticket, succeeded=False)
+
+    threads = [threading.Thread(target=run, args=(3.0,))]
+    threads[0].start()
+    _wait_queued(1)
+    threads.append(threading.Thread(target=run, args=(1.0,)))
+    threads[1].start()
+    _wait_queued(2)
+
+    admission.release(blocker, succeeded=False)
+    for thread in threads:
+        thread.join(timeout=5)
+    # Job pendek yang datang belakangan tetap jalan lebih dulu
+    assert order == [1.0, 3.0]
+
+
+def test_rejects_when_expected_wait_exceeds_limit():
+    blocker = admission.acquire(_cost(30.0, slots=2))
+    try:
+        with pytest.raises(admission.AdmissionRejected) as info:
+            admission.acquire(_cost(1.0))
+    finally:
+        admission.release(blocker, succeeded=False)
+
+    # Tunggu = sisa estimasi job yang berjalan
+    assert 29.0 < info.value.expected_wait_s <= 30.0
+    assert admission.status()["queued"] == []
+
+    response = main.admission_rejected(None, info.value)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == str(math.ceil(info.value.expected_wait_s))
+
+
+def test_calibration_replaces_prior_after_min_samples():
+    key = "train:fast:regression"
+    # Belum ada data: prior prefix 'train:fast' (2 + 3 x unit)
+    assert admission.predict_seconds(key, 2.0) == pytest.approx(8.0)
+
+    for units in (1.0, 2.0, 4.0, 8.0):
+        admission.record(key, units, 0.5 + 1.5 * units)
+
+    assert admission.predict_seconds(key, 10.0) == pytest.approx(15.5)
+    assert admission.estimate_train({"rows": 1000, "cols": 10, "memory_mb": 1.0, "columns": {}},
+                                    "y", "fast")["est_seconds"] == pytest.approx(0.5 + 1.5 * 0.03, abs=0.01)
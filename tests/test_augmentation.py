@@ -0,0 +1,106 @@
+import io
+
+import pandas as pd
+import pytest
+
+from app.services import augmentation, content_store, ingestion, storage
+
+
+def _upload(filename: str, df: pd.DataFrame) -> None:
+    if filename.endswith(".csv"):
+        payload = df.to_csv(index=False).encode()
+    else:
+        buffer = io.BytesIO()
+        df.to_excel(buffer, index=False)
+        payload = buffer.getvalue()
+    content_store.put_upload(filename, io.BytesIO(payload))
+
+
+def _augment(filename: str, name: str, factor: float) -> str:
+    df = ingestion.load_dataset(filename)
+    df[name] = df["a"] * factor
+    return augmentation.save_augmented(filename, df, [name], [{"name": name, "expression": f"df['a'] * {factor}"}])
+
+
+def _load(manifest: str) -> pd.DataFrame:
+    return ingestion.load_dataset(manifest, storage.data_store().local_path(manifest))
+
+
+def test_reupload_does_not_change_augmented_dataset():
+    _upload("aug_base.csv", pd.DataFrame({"a": [1.0, 2.0, 3.0], "y": [0, 1, 0]}))
+    manifest = _augment("aug_base.csv", "a2", 2)
+
+    _upload("aug_base.csv", pd.DataFrame({"a": [10.0, 20.0], "y": [1, 1]}))
+
+    df = _load(manifest)
+    assert df["a"].tolist() == [1.0, 2.0, 3.0]
+    assert df["a2"].tolist() == [2.0, 4.0, 6.0]
+
+
+def test_reapplying_to_base_keeps_earlier_columns():
+    _upload("aug_twice.csv", pd.DataFrame({"a": [1.0, 2.0], "y": [0, 1]}))
+    first = _augment("aug_twice.csv", "a2", 2)
+    second = _augment("aug_twice.csv", "a3", 3)
+
+    assert first == second
+    assert list(_load(second).columns) == ["a", "y", "a2", "a3"]
+
+
+def test_csv_and_excel_bases_do_not_share_manifest():
+    _upload("aug_same.csv", pd.DataFrame({"a": [1.0, 2.0], "y": [0, 1]}))
+    _upload("aug_same.xlsx", pd.DataFrame({"a": [5.0, 6.0], "y": [1, 0]}))
+
+    csv_manifest = _augment("aug_same.csv", "a2", 2)
+    xlsx_manifest = _augment("aug_same.xlsx", "a2", 2)
+
+    assert csv_manifest != xlsx_manifest
+    assert _load(csv_manifest)["a2"].tolist() == [2.0, 4.0]
+    assert _load(xlsx_manifest)["a2"].tolist() == [10.0, 12.0]
+
+
+def test_delta_columns_round_trip_without_pickle():
+    _upload("aug_types.csv", pd.DataFrame({"a": [1.0, 2.0, 3.0], "c": ["x", "y", None]}))
+    df = ingestion.load_dataset("aug_types.csv")
+    df["ratio"] = df["a"] / 2
+    df["label"] = df["c"].str.upper()
+    df["flag"] = df["a"] > 1
+    manifest = augmentation.save_augmented("aug_types.csv", df, ["ratio", "label", "flag"])
+
+    files = [c["file"] for c in storage.get_json(storage.data_store(), manifest)["columns"]]
+    assert all(f.endswith((".npy", ".json")) for f in files)
+    pd.testing.assert_frame_equal(_load(manifest), df)
+
+
+@pytest.mark.parametrize("column_file", [
+    "blobs/evil.pkl",
+    "columns/../blobs/evil.npy",
+    "columns/x/evil.pkl",
+    "/etc/passwd.npy",
+])
+def test_manifest_column_outside_columns_dir_is_rejected(column_file):
+    _upload("aug_evil.csv", pd.DataFrame({"a": [1.0, 2.0]}))
+    manifest = "augmented_aug_evil_csv.json"
+    storage.put_json(storage.data_store(), manifest, {
+        "version": augmentation.MANIFEST_VERSION,
+        "base": "aug_evil.csv",
+        "columns": [{"name": "evil", "file": column_file}],
+    })
+    with pytest.raises(ValueError, match="File kolom tidak valid"):
+        _load(manifest)
+
+
+def test_uploaded_json_is_not_a_manifest():
+    main = pytest.importorskip("app.main")
+    from fastapi.testclient import TestClient
+
+    payload = b'{"version": 1, "base": "x.csv", "columns": []}'
+    response = TestClient(main.app).post(
+        "/upload", files={"file": ("augmented_x_csv.json", io.BytesIO(payload), "application/json")}
+    )
+    assert response.status_code == 400
+    assert not content_store.read_ref("augmented_x_csv.json")
+
+    # Blob .json lama (sebelum upload .json ditolak) juga tidak dibaca sebagai manifest
+    content_store.put_upload("legacy.json", io.BytesIO(payload))
+    with pytest.raises(ValueError, match="tidak didukung"):
+        ingestion.load_dataset("legacy.json")
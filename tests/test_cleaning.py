@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import cleaning, ingestion
+from app.services.frame_view import FrameView
+from conftest import REPO_DATA_DIR
+
+
+def _reference_auto_clean(df: pd.DataFrame) -> pd.DataFrame:
+    """Cleaning versi awal (dropna -> median/mode -> filter IQR berurutan per kolom)."""
+    df = df.dropna(thresh=int(0.5 * len(df.columns)))
+    for col in df.columns:
+        if df[col].isnull().sum() > 0:
+            if pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = df[col].fillna(df[col].median())
+            elif len(df[col].mode()) > 0:
+                df[col] = df[col].fillna(df[col].mode()[0])
+            else:
+                df[col] = df[col].fillna("Unknown")
+    for col in df.select_dtypes(include=[np.number]).columns:
+        if df[col].nunique() < 10:
+            continue
+        q1 = df[col].quantile(0.25)
+        q3 = df[col].quantile(0.75)
+        iqr = q3 - q1
+        df = df[(df[col] >= q1 - 1.5 * iqr) & (df[col] <= q3 + 1.5 * iqr)]
+    return df
+
+
+@pytest.mark.parametrize("filename, shape", [
+    ("HousingData.csv", (243, 14)),
+    ("dataset_merged.csv", (4199, 39)),
+    ("avocado_ripeness_dataset.csv", (250, 9)),
+])
+def test_auto_clean_matches_reference_on_repo_datasets(filename, shape):
+    raw = ingestion.load_data(os.path.join(REPO_DATA_DIR, filename))
+    expected = _reference_auto_clean(raw.copy())
+
+    from_view = cleaning.auto_clean(FrameView(raw)).materialize()
+    from_frame, plan = cleaning.auto_clean_with_plan(raw)
+
+    assert expected.shape == shape
+    pd.testing.assert_frame_equal(from_view, expected)
+    pd.testing.assert_frame_equal(from_frame, expected)
+    # Plan exact yang dipakai (mis. untuk baris baru incremental) memberi hasil yang sama
+    pd.testing.assert_frame_equal(cleaning.clean_chunk(raw, plan), expected)
+
+
+def test_outlier_filter_is_sequential():
+    # Quantile kolom b dihitung dari baris yang lolos filter kolom a
+    a = np.r_[np.arange(20, dtype=float), [1000.0] * 5]
+    b = np.r_[np.arange(20, dtype=float), [-500.0] * 5]
+    df = pd.DataFrame({"a": a, "b": b})
+    cleaned = cleaning.auto_clean(df)
+
+    pd.testing.assert_frame_equal(cleaned, _reference_auto_clean(df))
+    assert len(cleaned) == 20
+
+
+def test_outlier_skip_uses_unique_count_after_earlier_filters():
+    # Nilai b = 9 (dan -50) hanya ada di baris outlier a: setelah filter a, nunique b < 10
+    a = np.r_[np.arange(40, dtype=float), [1000.0] * 2]
+    b = np.r_[np.arange(40) % 9, [9, -50]].astype(float)
+    df = pd.DataFrame({"a": a, "b": b})
+    cleaned, plan = cleaning.auto_clean_with_plan(df)
+
+    pd.testing.assert_frame_equal(cleaned, _reference_auto_clean(df))
+    assert list(plan["bounds"]) == ["a"]
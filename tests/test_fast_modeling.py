@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import adaptive_cv, fast_modeling
+
+
+def _frame(n_rows: int = 300) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"a": rng.normal(size=n_rows), "b": rng.normal(size=n_rows),
+                       "city": rng.choice(["x", "y"], n_rows)})
+    df["label"] = np.where(df["a"] + rng.normal(scale=0.5, size=n_rows) > 0, "yes", "no")
+    return df
+
+
+@pytest.mark.parametrize("pipeline", [True, False])
+def test_lightgbm_early_stopping_does_not_use_scored_fold(monkeypatch, pipeline):
+    df = _frame()
+    X, y = df.drop(columns=["label"]), df["label"]
+    if not pipeline:
+        X = pd.get_dummies(X, dtype=float)
+    seen = []
+    fit_estimator = fast_modeling.fit_estimator
+
+    def recording_fit(estimator, model_id, X_train, y_train, X_valid=None, y_valid=None, rounds=0):
+        seen.append((y_train.index, None if y_valid is None else y_valid.index))
+        return fit_estimator(estimator, model_id, X_train, y_train, X_valid, y_valid, rounds)
+
+    monkeypatch.setattr(fast_modeling, "fit_estimator", recording_fit)
+    fit_and_score = fast_modeling.fold_scorer("classification", X, y, early_stopping_rounds=5, pipeline=pipeline)
+    train_idx, valid_idx = next(iter(adaptive_cv.cv_splits("classification", y, 3, fast_modeling.RANDOM_STATE)))
+
+    score, best_iteration = fit_and_score("lightgbm", train_idx, valid_idx)
+
+    fit_rows, stop_rows = seen[0]
+    scored_rows = y.index[valid_idx]
+    assert best_iteration is not None and 0 <= score <= 1
+    # Early stopping hanya dari fold train; fold validasi murni untuk skor
+    assert stop_rows.intersection(scored_rows).empty
+    assert fit_rows.intersection(stop_rows).empty
+    assert set(fit_rows).union(stop_rows) == set(y.index[train_idx])
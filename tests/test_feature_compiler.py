@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.feature_compiler import apply_compiled_plan, compile_expression, compile_feature_plan
+
+
+@pytest.mark.parametrize("expression", [
+    "df['a'] / (df['b'] + 1e-6)",
+    "np.log1p(df['a'].abs())",
+    "df['a'].agg('mean')",
+    "df.groupby('c')['a'].transform('mean')",
+    "df['c'].map({'x': 'y'})",
+    "df['c'].str.lower().str.len()",
+    "df['a'].apply(lambda x: x * 2)",
+    "df['a'].apply(lambda x: df['b'].max() - x)",
+    "df['a'].apply(lambda x: df['b'].apply(lambda y: x + y).sum())",
+    "df['a'].rolling(3).mean()",
+    "df.a * 2",
+])
+def test_allowed_expressions(expression):
+    compile_expression(expression)
+
+
+@pytest.mark.parametrize("expression", [
+    # Nama method sebagai string melewati pengecekan atribut
+    "df['a'].apply('to_json', path_or_buf='x.json')",
+    "df['a'].agg(['mean', 'to_json'])",
+    "df.agg({'a': 'to_pickle'})",
+    "df.apply(func='to_csv')",
+    "df['a'].transform('__class__')",
+    # Method I/O / di luar whitelist
+    "df['a'].to_json('x.json')",
+    "df.to_records()",
+    "df['a'].explode()",
+    "df['a'].apply(lambda x: x.to_json())",
+    # Parameter lambda hanya berlaku di body lambda-nya
+    "df['a'].apply(lambda x: x) + x",
+    "df['a'].apply(lambda x: x) + df['b'].apply(lambda y: x + y)",
+    "df['a'].apply(lambda x, f=x: f)",
+    # Private / builtins / import
+    "df.__class__",
+    "open('x.json', 'w')",
+    "__import__('os').system('true')",
+    "pd.read_csv('x.csv')",
+    "np.save('x.npy', df['a'])",
+])
+def test_rejected_expressions(expression):
+    with pytest.raises(ValueError):
+        compile_expression(expression)
+
+
+def test_string_function_escape_writes_nothing(tmp_path):
+    target = tmp_path / "leak.json"
+    df = pd.DataFrame({"a": np.arange(5.0), "b": np.ones(5)})
+    plan = [
+        {"name": "leak", "expression": f"df['a'].apply('to_json', path_or_buf={str(target)!r})"},
+        {"name": "ratio", "expression": "df['a'] / df['b']"},
+    ]
+
+    result, report = apply_compiled_plan(df, compile_feature_plan(plan))
+
+    assert not target.exists()
+    statuses = {r["name"]: r["status"] for r in report}
+    assert statuses == {"leak": "Failed", "ratio": "Success"}
+    assert "ditolak" in report[0]["error"]
+    assert list(result.columns) == ["a", "b", "ratio"]
@@ -0,0 +1,144 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression, LogisticRegression
+
+from app import main
+from app.config import settings
+from app.schemas import IncrementalTrainRequest, TrainRequest
+from app.services import cleaning, content_store, fast_modeling, incremental, storage
+
+
+def _classification_frame(n_rows: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 4))
+    logits = X @ np.array([1.5, -1.0, 0.5, 0.0]) + 0.3
+    df = pd.DataFrame(X, columns=["a", "b", "c", "d"])
+    df["city"] = rng.choice(["x", "y", "z"], n_rows)
+    df["label"] = np.where(rng.random(n_rows) < 1 / (1 + np.exp(-logits)), "yes", "no")
+    return df
+
+
+def _fitted_lr(task: str, X: pd.DataFrame, y: pd.Series):
+    model = fast_modeling.build_pipeline("lr", task, X)
+    model.fit(X, y)
+    fast_modeling.attach_incremental_state(model, "lr", task, X, y)
+    return model
+
+
+def test_logistic_incremental_matches_full_refit():
+    old, new = _classification_frame(600, 0), _classification_frame(200, 1)
+    X_old, y_old = old.drop(columns=["label"]), old["label"]
+    X_new, y_new = new.drop(columns=["label"]), new["label"]
+    model = _fitted_lr("classification", X_old, y_old)
+
+    report = incremental._update_member(model, X_new, y_new, len(X_old))
+
+    # Sampel replay memuat semua baris lama: objective sama dengan fit ulang lama + baru
+    head = model[:-1]
+    Xt_old, Xt_new = head.transform(X_old), head.transform(X_new)
+    full = LogisticRegression(max_iter=1000, random_state=fast_modeling.RANDOM_STATE).fit(
+        np.vstack([Xt_old, Xt_new]), pd.concat([y_old, y_new])
+    )
+    estimator = model.named_steps["model"]
+    assert report["method"] == "warm_start_replay"
+    assert report["rows_total"] == 800
+    # Kolom one-hot saling kolinear: bandingkan probabilitas, bukan koefisien
+    np.testing.assert_allclose(estimator.predict_proba(Xt_new), full.predict_proba(Xt_new), atol=2e-3)
+
+    # Fit pada baris baru saja (perilaku lama) jauh lebih berbeda dari fit ulang penuh
+    only_new = LogisticRegression(max_iter=1000, random_state=fast_modeling.RANDOM_STATE).fit(Xt_new, y_new)
+    assert np.abs(only_new.predict_proba(Xt_old) - full.predict_proba(Xt_old)).max() > \
+        np.abs(estimator.predict_proba(Xt_old) - full.predict_proba(Xt_old)).max()
+
+
+def test_logistic_replay_sample_is_bounded(monkeypatch):
+    monkeypatch.setattr(settings, "INCREMENTAL_REPLAY_ROWS", 100)
+    old, new = _classification_frame(600, 0), _classification_frame(300, 1)
+    model = _fitted_lr("classification", old.drop(columns=["label"]), old["label"])
+    assert len(model.named_steps["model"].replay_sample_["y"]) == 100
+
+    incremental._update_member(model, new.drop(columns=["label"]), new["label"], 600)
+    sample = model.named_steps["model"].replay_sample_
+    assert len(sample["y"]) == 100 and sample["n"] == 900
+    # Porsi sampel sebanding jumlah baris yang diwakili (600 lama : 300 baru)
+    assert sample["X"].shape == (100, model.named_steps["model"].coef_.shape[1])
+
+
+def test_logistic_without_replay_sample_is_left_unchanged():
+    old, new = _classification_frame(300, 0), _classification_frame(100, 1)
+    model = _fitted_lr("classification", old.drop(columns=["label"]), old["label"])
+    del model.named_steps["model"].replay_sample_
+    coef = model.named_steps["model"].coef_.copy()
+
+    report = incremental._update_member(model, new.drop(columns=["label"]), new["label"], 300)
+
+    assert report["method"] == "unchanged"
+    np.testing.assert_array_equal(model.named_steps["model"].coef_, coef)
+
+
+def test_linear_regression_incremental_matches_full_refit():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(500, 3)), columns=["a", "b", "c"])
+    y = X @ np.array([2.0, -1.0, 0.5]) + rng.normal(scale=0.1, size=500)
+    model = _fitted_lr("regression", X.iloc[:400], y.iloc[:400])
+
+    incremental._update_member(model, X.iloc[400:], y.iloc[400:], 400)
+
+    full = LinearRegression().fit(model[:-1].transform(X), y)
+    np.testing.assert_allclose(model.named_steps["model"].coef_, full.coef_, atol=1e-8)
+
+
+def test_lineage_is_json_and_keeps_exact_clean_plan():
+    rng = np.random.default_rng(2)
+    raw = pd.DataFrame({
+        "a": np.r_[rng.normal(size=60), [np.nan, 40.0]],
+        "when": pd.to_datetime(["2024-01-01", None] * 31),
+        "city": ["x", "y", None] + ["x"] * 59,
+        "empty": np.nan,
+    })
+    cleaned, plan = cleaning.auto_clean_with_plan(raw)
+    lineage = incremental.build_lineage("lineage.csv", raw, plan, ["a", "city"], "a", "regression", tag="t")
+
+    incremental.save_lineage("lineage_model.pkl", lineage)
+    stored = storage.get_json(storage.model_store(), "lineage_model.pkl" + incremental.LINEAGE_SUFFIX)
+    loaded = incremental.read_lineage("lineage_model.pkl")
+
+    assert stored["n_rows"] == 62 and "clean_stats" not in stored
+    assert loaded["clean_plan"]["fill_values"]["when"] == pd.Timestamp("2024-01-01")
+    assert loaded["clean_plan"]["fill_values"]["city"] == "x"
+    assert "empty" not in loaded["clean_plan"]["fill_values"]
+    # Plan yang dibaca ulang membersihkan baris sama persis dengan training penuh
+    pd.testing.assert_frame_equal(cleaning.clean_chunk(raw, loaded["clean_plan"]), cleaned)
+
+
+@pytest.fixture
+def in_process(monkeypatch):
+    monkeypatch.setattr(settings, "TRAINING_POOL_ENABLED", False)
+
+
+def _upload(df: pd.DataFrame) -> None:
+    content_store.put_upload("incremental_cls.csv", io.BytesIO(df.to_csv(index=False).encode()))
+
+
+def test_incremental_endpoint_keeps_cached_full_model(in_process):
+    base = _classification_frame(800, 0)
+    _upload(base)
+    first = main.train_pipeline(TrainRequest(filename="incremental_cls.csv", target_column="label", engine="fast"))
+    first_mtime = storage.model_store().mtime(first["model_filename"])
+
+    _upload(pd.concat([base, _classification_frame(300, 1)], ignore_index=True))
+    updated = main.train_incremental(IncrementalTrainRequest(
+        filename="incremental_cls.csv", model_filename=first["model_filename"], full_retrain_fallback=False,
+    ))
+
+    assert updated["model_filename"] != first["model_filename"]
+    assert storage.model_store().mtime(first["model_filename"]) == first_mtime
+    assert incremental.read_lineage(updated["model_filename"])["n_rows"] == 1100
+
+    _upload(base)
+    again = main.train_pipeline(TrainRequest(filename="incremental_cls.csv", target_column="label", engine="fast"))
+    assert "cache" in again["message"]
+    assert again["model_filename"] == first["model_filename"]
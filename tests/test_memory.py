@@ -0,0 +1,102 @@
+import gc
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# ==========================================
+# REGRESI MEMORI PIPELINE (PEAK RSS)
+# ==========================================
+# clean -> select -> export ke shared memory dijalankan di proses terpisah (spawn,
+# bebas dari sisa alokasi proses test) dan peak RSS dibandingkan dengan ukuran
+# input. Salinan frame perantara antar stage langsung terlihat sebagai rasio yang naik.
+
+STATUS_PATH = "/proc/self/status"
+CLEAR_REFS_PATH = "/proc/self/clear_refs"
+MAX_PEAK_RATIO = 2.5
+N_ROWS = 300000
+N_NUMERIC = 16
+
+
+def _status_mb(field: str) -> float:
+    with open(STATUS_PATH) as f:
+        for line in f:
+            if line.startswith(field):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _reset_peak() -> None:
+    # '5' = reset VmHWM ke RSS saat ini
+    with open(CLEAR_REFS_PATH, "w") as f:
+        f.write("5")
+
+
+def synthetic_frame(n_rows: int, n_numeric: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Kolom numerik independen (sebagian dengan nilai kosong & outlier), satu kolom
+    kategori, dan target 'y' = kombinasi linear semua fitur: seleksi fitur harus
+    mempertahankan semua kolom, sehingga yang diukur adalah pipeline penuh.
+    """
+    rng = np.random.default_rng(seed)
+    cols = {f"f{i}": rng.normal(size=n_rows) for i in range(n_numeric)}
+    weights = rng.uniform(0.5, 1.5, size=n_numeric)
+    y = sum(w * cols[f"f{i}"] for i, w in enumerate(weights)) + rng.normal(size=n_rows)
+    for i in range(max(1, n_numeric // 4)):
+        cols[f"f{i}"][rng.random(n_rows) < 0.02] = np.nan
+        cols[f"f{i}"][rng.random(n_rows) < 0.001] = 50.0
+    cols["cat"] = pd.array(rng.choice(["a", "b", "c"], n_rows))
+    cols["y"] = y
+    return pd.DataFrame(cols)
+
+
+def _pipeline(df: pd.DataFrame):
+    from app.services import cleaning, selection
+    from app.services.frame_view import FrameView
+    from app.services.shared_frame import export_frame
+
+    view = selection.select_features(cleaning.auto_clean(FrameView(df)), target="y")
+    shm, _ = export_frame(view)
+    if shm is not None:
+        shm.close()
+        shm.unlink()
+    return view
+
+
+def _measure(n_rows: int, n_numeric: int) -> dict:
+    # Import + jalur kode dipanaskan dulu agar tidak ikut terhitung sebagai peak
+    _pipeline(synthetic_frame(2000, n_numeric, seed=1))
+    df = synthetic_frame(n_rows, n_numeric)
+    input_mb = df.memory_usage(deep=True).sum() / 2**20
+    gc.collect()
+    base_mb = _status_mb("VmRSS")
+    _reset_peak()
+
+    start = time.perf_counter()
+    view = _pipeline(df)
+    peak_mb = _status_mb("VmHWM") - base_mb
+    return {
+        "columns": list(view.columns),
+        "input_mb": float(input_mb),
+        "peak_mb": peak_mb,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def test_pipeline_peak_rss_stays_below_ratio_of_input():
+    try:
+        open(CLEAR_REFS_PATH, "w").close()
+    except OSError:
+        pytest.skip("Pengukuran peak RSS butuh /proc (Linux)")
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        result = pool.submit(_measure, N_ROWS, N_NUMERIC).result()
+
+    # Semua fitur relevan ke target: tidak ada kolom yang dibuang seleksi
+    assert {f"f{i}" for i in range(N_NUMERIC)} | {"y"} <= set(result["columns"])
+    ratio = result["peak_mb"] / result["input_mb"]
+    print(f"Peak RSS {result['peak_mb']:.1f} MB = {ratio:.2f}x input ({result['seconds']:.2f}s)")
+    assert ratio <= MAX_PEAK_RATIO
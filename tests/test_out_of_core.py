@@ -0,0 +1,40 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from app.services import content_store, ingestion, out_of_core, storage
+
+
+def test_excel_out_of_core_reads_selected_sheet():
+    rng = np.random.default_rng(0)
+    first = pd.DataFrame({"a": rng.normal(size=60), "y": rng.normal(size=60)})
+    second = pd.DataFrame({"b": rng.normal(size=80), "c": rng.normal(size=80)})
+    second["y"] = second["b"] * 2 + rng.normal(scale=0.1, size=80)
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer) as writer:
+        first.to_excel(writer, sheet_name="first", index=False)
+        second.to_excel(writer, sheet_name="second", index=False)
+    buffer.seek(0)
+    content_store.put_upload("ooc_sheets.xlsx", buffer, sheet="second")
+
+    resolved = content_store.resolve("ooc_sheets.xlsx")
+    file_path = storage.data_store().local_path(resolved["key"])
+    sample, stats = out_of_core.prepare_clean_sample(file_path, resolved["sheet"])
+
+    assert set(sample.columns) == {"b", "c", "y"}
+    assert stats.n_rows == len(sample) > 60
+    assert "b" in out_of_core.prepare_training_frame(file_path, "y", sheet=resolved["sheet"]).columns
+
+
+def test_csv_chunks_fall_back_to_latin1_after_first_chunk(tmp_path):
+    # Byte non-UTF-8 ('é' Latin-1) baru muncul jauh setelah chunk pertama
+    rows = [f"{i},kota" for i in range(500)] + ["500,caf\xe9"]
+    path = tmp_path / "latin1.csv"
+    path.write_bytes(("a,b\n" + "\n".join(rows) + "\n").encode("latin1"))
+
+    chunks = list(ingestion.iter_chunks(str(path), chunk_rows=100))
+
+    assert ingestion.csv_encoding(str(path)) == "latin1"
+    assert sum(len(c) for c in chunks) == 501
+    assert chunks[-1]["b"].iloc[-1] == "caf\xe9"
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.config import settings
+from app.services import cleaning, parallel, selection, statistics
+from app.services.frame_view import FrameView
+
+# Ambang paralel sebenarnya (fixture di bawah menurunkannya ke 1)
+DEFAULT_MIN_CELLS = settings.PARALLEL_MIN_CELLS
+
+
+def _frame(n_rows: int = 3000) -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({f"x{i}": rng.normal(size=n_rows) for i in range(8)})
+    df["dup"] = df["x0"] * 2 + rng.normal(scale=0.01, size=n_rows)
+    df["flag"] = rng.integers(0, 2, size=n_rows)
+    df["city"] = rng.choice(["a", "b", "c", None], size=n_rows)
+    df["y"] = df["x0"] + df["x1"] * 0.5 + rng.normal(scale=0.1, size=n_rows)
+    df.loc[rng.choice(n_rows, 200, replace=False), "x2"] = np.nan
+    df.loc[rng.choice(n_rows, 20, replace=False), "x3"] = 50.0
+    return df
+
+
+def _stats_snapshot(stats: statistics.DatasetStats):
+    columns = {}
+    for col, s in stats.columns.items():
+        columns[col] = (s.count, s.nulls, s.mean, s.m2, s.min, s.max, s.top.mode(), s.top.nunique(),
+                        [s.quantiles.quantile(q) for q in (0.25, 0.5, 0.75)] if s.is_numeric else None)
+    return stats.n_rows, columns
+
+
+@pytest.fixture(params=["thread", "process"])
+def parallel_settings(request, monkeypatch):
+    parallel.shutdown()
+    monkeypatch.setattr(settings, "PARALLEL_WORKERS", 3)
+    monkeypatch.setattr(settings, "PARALLEL_MIN_CELLS", 1)
+    monkeypatch.setattr(settings, "PARALLEL_BACKEND", request.param)
+    yield request.param
+    parallel.shutdown()
+
+
+def _serial(fn, monkeypatch):
+    with monkeypatch.context() as m:
+        m.setattr(settings, "PARALLEL_WORKERS", 1)
+        return fn()
+
+
+def test_compute_stats_parallel_matches_serial(parallel_settings, monkeypatch):
+    df = _frame()
+    serial = _serial(lambda: statistics.compute_stats(df), monkeypatch)
+    assert parallel.should_parallelize(df)
+    par = statistics.compute_stats(df)
+
+    assert _stats_snapshot(par) == _stats_snapshot(serial)
+    pd.testing.assert_frame_equal(par.correlation(), serial.correlation())
+
+
+def test_selection_and_chunk_cleaning_parallel_match_serial(parallel_settings, monkeypatch):
+    df = _frame()
+    plan = cleaning.build_clean_plan(statistics.compute_stats(df))
+
+    serial_clean = _serial(lambda: cleaning.clean_chunk(df, plan), monkeypatch)
+    serial_selected = _serial(lambda: list(selection.select_features(FrameView(df), target="y").columns), monkeypatch)
+
+    pd.testing.assert_frame_equal(cleaning.clean_chunk(df, plan), serial_clean)
+    assert list(selection.select_features(FrameView(df), target="y").columns) == serial_selected
+
+
+def test_exact_auto_clean_parallel_matches_serial(parallel_settings, monkeypatch):
+    monkeypatch.setattr(settings, "PARALLEL_MIN_CELLS", DEFAULT_MIN_CELLS)
+    rng = np.random.default_rng(5)
+    base = _frame(DEFAULT_MIN_CELLS // len(_frame().columns) + 1)
+    # Outlier di beberapa kolom: filter berurutan membuang baris di lebih dari satu batch
+    for i, col in enumerate(["x1", "x4", "x5", "x7"]):
+        base.loc[rng.choice(len(base), 50 * (i + 1), replace=False), col] = 40.0 + i
+    base.loc[rng.choice(len(base), 5000, replace=False), "x6"] = np.nan
+    assert parallel.should_parallelize(base)
+
+    serial, serial_plan = _serial(lambda: cleaning.auto_clean_with_plan(base), monkeypatch)
+    par, par_plan = cleaning.auto_clean_with_plan(base)
+    view, view_plan = cleaning.auto_clean_with_plan(FrameView(base))
+
+    pd.testing.assert_frame_equal(par, serial)
+    pd.testing.assert_frame_equal(view.materialize(), serial)
+    assert par_plan == serial_plan == view_plan
+    assert len(serial_plan["bounds"]) >= 8 and len(serial) < len(base)
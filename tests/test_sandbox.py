@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+
+from app.services import sandbox
+
+
+def test_run_feature_plan_returns_new_columns_only():
+    df = pd.DataFrame({"a": np.arange(10.0), "b": np.arange(10.0) + 1})
+    plan = [
+        {"name": "ratio", "expression": "df['a'] / df['b']"},
+        {"name": "leak", "expression": "df['a'].apply('to_pickle', path='x.pkl')"},
+    ]
+    try:
+        result = sandbox.run_feature_plan(df, plan)
+    finally:
+        sandbox.shutdown()
+
+    assert list(result["columns"]) == ["ratio"]
+    np.testing.assert_allclose(result["columns"]["ratio"], df["a"] / df["b"])
+    assert {r["name"]: r["status"] for r in result["report"]} == {"leak": "Failed", "ratio": "Success"}
@@ -0,0 +1,49 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from app.services import cleaning, ingestion, scoring, selection, training_pool
+from conftest import REPO_DATA_DIR
+
+
+@pytest.fixture(scope="module", params=[
+    ("HousingData.csv", "MEDV"),
+    ("avocado_ripeness_dataset.csv", "ripeness"),
+])
+def trained(request):
+    filename, target = request.param
+    raw = ingestion.load_data(os.path.join(REPO_DATA_DIR, filename))
+    df = selection.select_features(cleaning.auto_clean(raw), target=target)
+    result = training_pool.run_training_job(df, target, f"scoring_{filename}", engine="fast")
+    assert result["status"] == "success"
+    assert result["compiled_scoring"]["status"] == "compiled"
+    return raw.drop(columns=[target]), result
+
+
+def _records(features):
+    # Baris asli (termasuk nilai kosong) + kategori tak dikenal + kolom hilang
+    records = json.loads(features.head(80).to_json(orient="records"))
+    edge = dict(records[0])
+    for col, value in edge.items():
+        if isinstance(value, str):
+            edge[col] = "tidak-dikenal"
+    missing = {k: v for k, v in records[1].items() if k != next(iter(records[1]))}
+    return records + [edge, missing]
+
+
+def test_compiled_scoring_matches_stock(trained):
+    features, result = trained
+    scorer = scoring.get_scorer(result["model_filename"])
+    assert scorer.path == "compiled"
+
+    records = _records(features)
+    pred, proba = scorer.predict_compiled(records)
+    stock_pred, stock_proba = scorer.predict_stock(records)
+
+    if result["task_type"] == "classification":
+        np.testing.assert_array_equal(pred.astype(str), stock_pred.astype(str))
+        np.testing.assert_allclose(proba, stock_proba, rtol=1e-6, atol=1e-9)
+    else:
+        np.testing.assert_allclose(pred, stock_pred.astype(np.float64), rtol=1e-6, atol=1e-8)
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+from app.services.shared_frame import close_shared, export_frame, import_frame
+
+
+def test_close_shared_keeps_mapping_while_views_alive():
+    shm, meta = export_frame(pd.DataFrame({"a": np.arange(10.0), "b": np.arange(10)}))
+    try:
+        df, worker_shm = import_frame(meta)
+        kept = df["a"].to_numpy()
+        del df
+        assert close_shared(worker_shm) is False
+        # Mapping belum di-unmap: view masih bisa dibaca
+        assert kept.sum() == 45.0
+
+        del kept
+        df, other = import_frame(meta)
+        del df
+        assert close_shared(other) is True
+        assert worker_shm._buf is None  # blok yang tertunda ikut ditutup
+    finally:
+        shm.close()
+        shm.unlink()
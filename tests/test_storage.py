@@ -0,0 +1,107 @@
+import io
+import threading
+import time
+
+import pytest
+
+from app.services import storage
+
+boto3 = pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+
+BUCKET = "automl-test"
+
+
+@pytest.fixture
+def s3(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "LOCK_LEASE_S", 0.3)
+    monkeypatch.setattr(storage, "LOCK_TIMEOUT_S", 10.0)
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield storage.S3Storage(BUCKET, "data", str(tmp_path / "cache"), client=client)
+
+
+def test_put_get_exists(s3, tmp_path):
+    assert not s3.exists("a.csv")
+    s3.put_bytes("a.csv", b"x,y\n1,2\n")
+    s3.put_stream("b.csv", io.BytesIO(b"stream"))
+    source = tmp_path / "c.bin"
+    source.write_bytes(b"file")
+    s3.put_file("c.bin", str(source))
+
+    assert s3.exists("a.csv")
+    assert s3.get_bytes("a.csv") == b"x,y\n1,2\n"
+    assert s3.get_bytes("b.csv") == b"stream"
+    assert s3.get_bytes("c.bin") == b"file"
+    assert s3.mtime("a.csv") > 0
+    assert s3.client.head_object(Bucket=BUCKET, Key="data/a.csv")
+    with pytest.raises(FileNotFoundError):
+        s3.local_path("missing.csv")
+
+
+def test_local_path_cache_is_validated_by_etag(s3):
+    downloads = []
+    download_file = s3.client.download_file
+    s3.client.download_file = lambda *args: (downloads.append(args[1]), download_file(*args))[1]
+
+    s3.put_bytes("a.csv", b"v1")
+    path = s3.local_path("a.csv")
+    assert s3.local_path("a.csv") == path
+    assert len(downloads) == 1
+
+    s3.put_bytes("a.csv", b"v2")
+    with open(s3.local_path("a.csv"), "rb") as f:
+        assert f.read() == b"v2"
+    assert len(downloads) == 2
+
+
+def test_lock_serializes_read_modify_write(s3):
+    storage.put_json(s3, "counter.json", {"n": 0})
+
+    def bump():
+        for _ in range(5):
+            with s3.lock("counter.json"):
+                payload = storage.get_json(s3, "counter.json")
+                payload["n"] += 1
+                storage.put_json(s3, "counter.json", payload)
+
+    threads = [threading.Thread(target=bump) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert storage.get_json(s3, "counter.json")["n"] == 20
+    assert not s3.exists(".locks/counter.json")
+
+
+def test_live_holder_keeps_lock_past_lease(s3):
+    events = []
+    held = threading.Event()
+
+    def holder():
+        with s3.lock("manifest.json"):
+            held.set()
+            # Jauh lebih lama dari lease: lease diperbarui, lock tidak boleh diambil alih
+            time.sleep(storage.LOCK_LEASE_S * 4)
+            events.append("holder-release")
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    held.wait()
+    with s3.lock("manifest.json"):
+        events.append("waiter-acquire")
+    thread.join()
+
+    assert events == ["holder-release", "waiter-acquire"]
+
+
+def test_stale_lock_is_taken_over(s3):
+    # Pemegang crash: objek lock ada tapi lease-nya tidak pernah diperbarui
+    s3.client.put_object(Bucket=BUCKET, Key="data/.locks/manifest.json", Body=b"crashed")
+    start = time.monotonic()
+    with s3.lock("manifest.json"):
+        waited = time.monotonic() - start
+    assert waited >= storage.LOCK_LEASE_S
+    assert not s3.exists(".locks/manifest.json")
@@ -0,0 +1,58 @@
+import io
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from app import main
+from app.config import settings
+from app.schemas import TrainRequest
+from app.services import content_store, incremental, storage
+from conftest import REPO_DATA_DIR
+
+
+@pytest.fixture
+def housing(monkeypatch):
+    monkeypatch.setattr(settings, "TRAINING_POOL_ENABLED", False)
+    raw = pd.read_csv(os.path.join(REPO_DATA_DIR, "HousingData.csv"))
+
+    def upload(df):
+        content_store.put_upload("cache_housing.csv", io.BytesIO(df.to_csv(index=False).encode()))
+
+    upload(raw)
+    return raw, upload
+
+
+def _train(target):
+    return main.train_pipeline(TrainRequest(filename="cache_housing.csv", target_column=target, engine="fast"))
+
+
+def test_targets_and_reuploads_get_their_own_artifact(housing):
+    raw, upload = housing
+    medv = _train("MEDV")
+    lstat = _train("LSTAT")
+    assert medv["model_filename"] != lstat["model_filename"]
+
+    again = _train("MEDV")
+    assert "cache" in again["message"]
+    assert again["model_filename"] == medv["model_filename"]
+    assert incremental.read_lineage(medv["model_filename"])["target"] == "MEDV"
+
+    medv_mtime = storage.model_store().mtime(medv["model_filename"])
+    upload(raw.head(300))
+    reuploaded = _train("MEDV")
+    assert reuploaded["model_filename"] != medv["model_filename"]
+    assert storage.model_store().mtime(medv["model_filename"]) == medv_mtime
+
+
+def test_overwritten_artifact_is_not_served_from_cache(housing):
+    first = _train("MEDV")
+    key = first["model_filename"]
+
+    time.sleep(0.01)
+    store = storage.model_store()
+    store.put_bytes(key, store.get_bytes(key))
+
+    cache_key = main._train_cache_key("cache_housing.csv", "MEDV", "fast", None)
+    assert main._cached_training(cache_key) is None
@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.config import settings
+from app.services import training_pool
+from app.services.shared_frame import export_frame, import_frame
+from app.services.worker_slots import WorkerSlots
+
+_KEPT = []
+
+
+def _fake_job(meta, label, seconds=0.0, rss_mb=0.0):
+    df, shm = import_frame(meta)
+    rows = len(df)
+    del df
+    time.sleep(seconds)
+    training_pool._close_shm(shm)
+    return {"status": "success", "rows": rows, "worker": {"pid": os.getpid(), "rss_mb": rss_mb}}
+
+
+def _fake_train(meta, target, dataset_filename, engine, cv_folds, tag):
+    return _fake_job(meta, target, 30 if target == "hang" else 0.2)
+
+
+@pytest.fixture
+def slots(monkeypatch):
+    pool = WorkerSlots("test-training", size=lambda: 2)
+    monkeypatch.setattr(training_pool, "_SLOTS", pool)
+    monkeypatch.setattr(settings, "TRAINING_POOL_ENABLED", True)
+    monkeypatch.setattr(settings, "TRAINING_POOL_WORKERS", 2)
+    # Worker dipanaskan dulu agar waktu spawn tidak ikut timeout
+    pids = {f.result(timeout=60) for f in pool.submit_all(training_pool._ping)}
+    yield pids
+    pool.shutdown()
+
+
+def _frame():
+    return pd.DataFrame({"a": np.arange(100.0), "y": np.arange(100.0) * 2})
+
+
+def test_timeout_does_not_break_other_jobs(slots, monkeypatch):
+    monkeypatch.setattr(settings, "TRAINING_TIMEOUT_S", 2.0)
+    results = {}
+
+    def other_tenant():
+        time.sleep(1.0)
+        results["other"] = training_pool._run_in_pool(_fake_job, _frame(), "other", 1.5)
+
+    thread = threading.Thread(target=other_tenant)
+    thread.start()
+    hung = training_pool._run_in_pool(_fake_job, _frame(), "hang", 30)
+    thread.join()
+
+    assert hung == {"status": "error", "message": "Training worker: timeout"}
+    # Worker job lain tidak ikut dimatikan saat job 'hang' timeout
+    assert results["other"]["status"] == "success"
+    assert results["other"]["worker"]["pid"] in slots
+
+
+def test_batch_timeout_is_per_target(slots, monkeypatch):
+    monkeypatch.setattr(settings, "TRAINING_TIMEOUT_S", 2.0)
+    monkeypatch.setattr(training_pool, "_worker_train", _fake_train)
+    feature_sets = {"hang": ["a"], "y": ["a", "y"], "a": ["a"]}
+
+    results = training_pool.run_training_batch(_frame(), feature_sets, "data.csv", engine="fast")
+
+    assert results["hang"]["message"] == "Training worker: timeout"
+    assert results["y"]["status"] == results["a"]["status"] == "success"
+    assert results["y"]["rows"] == 100
+
+
+def test_worker_over_rss_is_retired(slots, monkeypatch):
+    monkeypatch.setattr(settings, "TRAINING_TIMEOUT_S", 60.0)
+    monkeypatch.setattr(settings, "TRAINING_WORKER_MAX_RSS_MB", 100)
+    first = training_pool._run_in_pool(_fake_job, _frame(), "big", 0, 500.0)["worker"]["pid"]
+    seen = {training_pool._run_in_pool(_fake_job, _frame(), "small")["worker"]["pid"] for _ in range(4)}
+    assert first not in seen
+
+
+def _raise_with_frame(df, *args):
+    raise ValueError(f"gagal dengan {len(df)} baris")
+
+
+def _keep_frame(df, *args):
+    _KEPT.append(df)
+    return {"status": "success"}
+
+
+@pytest.mark.parametrize("job, status, retire", [
+    (_raise_with_frame, "error", False),
+    (_keep_frame, "success", True),
+])
+def test_worker_releases_shared_memory(monkeypatch, job, status, retire):
+    monkeypatch.setattr(training_pool, "run_training_job", job)
+    shm, meta = export_frame(_frame())
+    try:
+        result = training_pool._worker_train(meta, "y", "data.csv", "fast", None)
+    finally:
+        _KEPT.clear()
+        shm.close()
+        shm.unlink()
+
+    assert result["status"] == status
+    # Exception tidak menahan mapping; view yang masih dipegang -> worker diganti
+    assert result["worker"]["retire"] is retire
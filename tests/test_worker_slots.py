@@ -0,0 +1,59 @@
+import os
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+from app.services.worker_slots import WorkerSlots
+
+
+def _sleep(seconds: float) -> int:
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def _crash() -> None:
+    os._exit(1)
+
+
+@pytest.fixture
+def slots():
+    pool = WorkerSlots("test", size=lambda: 2)
+    yield pool
+    pool.shutdown()
+
+
+def test_timeout_only_kills_its_own_worker(slots):
+    # Worker dipanaskan dulu agar waktu spawn tidak ikut timeout
+    pids = {f.result() for f in slots.submit_all(_sleep, 0)}
+    results = {}
+
+    def other_tenant():
+        results["other"] = slots.run(_sleep, 1.5, timeout=30)
+
+    thread = threading.Thread(target=other_tenant)
+    thread.start()
+    time.sleep(0.2)
+    with pytest.raises(FutureTimeoutError):
+        slots.run(_sleep, 30, timeout=0.5)
+    thread.join()
+
+    # Job tenant lain selesai di worker lama yang tidak ikut dimatikan
+    assert results["other"] in pids
+    # Worker yang dimatikan sudah diganti: dua job paralel tetap jalan
+    assert len({f.result(timeout=60) for f in slots.submit_all(_sleep, 0.5)}) == 2
+
+
+def test_crash_replaces_worker(slots):
+    from concurrent.futures.process import BrokenProcessPool
+
+    with pytest.raises(BrokenProcessPool):
+        slots.run(_crash, timeout=30)
+    assert slots.run(_sleep, 0, timeout=60) > 0
+
+
+def test_retire_replaces_worker_after_job(slots):
+    first = slots.run(_sleep, 0, timeout=60, retire=lambda pid: True)
+    seen = {slots.run(_sleep, 0, timeout=60) for _ in range(4)}
+    assert first not in seen